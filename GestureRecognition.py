@@ -1,8 +1,20 @@
-import cv2
-import mediapipe as mp
+import importlib
 from math import dist
 import time
 
+# OpenCV and MediaPipe are loaded by the first HandGestureRecognition, so runs without a camera never import them
+cv2 = None
+mp = None
+
+def load_dependencies():
+    """
+    Imports OpenCV and MediaPipe on first use.
+    """
+    global cv2, mp
+    if cv2 is None:
+        cv2 = importlib.import_module("cv2")
+        mp = importlib.import_module("mediapipe")
+
 class HandGestureRecognition:
 
     def __init__(self):
@@ -13,9 +25,12 @@ class HandGestureRecognition:
             cap (cv2.VideoCapture): Video capture object to read frames from the camera.
             robot (object, optional): Robot object to handle gesture-based actions. Defaults to None.
         """
+        load_dependencies()
         self.cap = cv2.VideoCapture(0)
         self.mypoints = []
         self.results = None
+        self.hands = None
+        self.stopped = False
 
     def orientation(self, coordinate_landmark_0, coordinate_landmark_9):
         """
@@ -173,42 +188,70 @@ class HandGestureRecognition:
         It captures frames from the camera, processes them using MediaPipe to detect hand landmarks,
         and performs gesture recognition. Detected gestures are sent to robot.
         """
-        with mp.solutions.hands.Hands(min_detection_confidence=0.5, min_tracking_confidence=0.5) as hands:
-            while self.cap.isOpened():
-                success, img = self.cap.read()
-                if not success:
-                    print("Ignoring empty camera frame.")
-                    continue
-
-                image = cv2.cvtColor(cv2.flip(img, 1), cv2.COLOR_BGR2RGB)
-                image.flags.writeable = False
-                results = hands.process(image)
-                self.results = results
-
-                image.flags.writeable = True
-                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        mp.solutions.drawing_utils.draw_landmarks(
-                            image, hand_landmarks, mp.solutions.hands.HAND_CONNECTIONS)
-
-                    # Analyze gestures based on the landmarks
-                gesture = self.analyze_gestures(results, image)
-                if gesture:
-                    print("Gesture: ",gesture)
-                    q.put(gesture)
-
-                cv2.imshow('MediaPipe Hands', image)
-                if cv2.waitKey(5) & 0xFF == 27:  # Press 'ESC' to exit
-                    break
-                
-                time.sleep(0.1)
+        self.open()
+        while not self.stopped:
+            gesture = self.process_frame()
+            if gesture:
+                q.put(gesture)
+            time.sleep(0.1)
+
+    def open(self):
+        """
+        Creates the MediaPipe hand tracker used by process_frame.
+        """
+        if self.hands is None:
+            self.hands = mp.solutions.hands.Hands(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+    def process_frame(self):
+        """
+        Captures and processes a single camera frame: detects hand landmarks, recognizes the gesture and shows the
+        annotated frame. This call blocks on the camera and on MediaPipe, so an event loop should run it in an
+        executor, always on the same thread since it also drives the OpenCV window.
+
+        Sets 'stopped' once the camera is closed or 'ESC' is pressed in the window.
+
+        Returns:
+            str: The recognized gesture, or None if there is none.
+        """
+        if not self.cap.isOpened():
+            self.stopped = True
+            return None
+        success, img = self.cap.read()
+        if not success:
+            print("Ignoring empty camera frame.")
+            return None
+
+        image = cv2.cvtColor(cv2.flip(img, 1), cv2.COLOR_BGR2RGB)
+        image.flags.writeable = False
+        results = self.hands.process(image)
+        self.results = results
+
+        image.flags.writeable = True
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        if results.multi_hand_landmarks:
+            for hand_landmarks in results.multi_hand_landmarks:
+                mp.solutions.drawing_utils.draw_landmarks(
+                    image, hand_landmarks, mp.solutions.hands.HAND_CONNECTIONS)
+
+            # Analyze gestures based on the landmarks
+        gesture = self.analyze_gestures(results, image)
+        if gesture:
+            print("Gesture: ",gesture)
+
+        cv2.imshow('MediaPipe Hands', image)
+        if cv2.waitKey(5) & 0xFF == 27:  # Press 'ESC' to exit
+            self.stopped = True
+        return gesture
 
     def stop(self):
         """
         Stops the hand tracking and gesture recognition process and frees resources.
         """
+        self.stopped = True
         self.cap.release()
+        if self.hands is not None:
+            self.hands.close()
+            self.hands = None
 
     def analyze_gestures(self, results, image):
         """
@@ -0,0 +1,85 @@
+"""
+Import-time check of the robot package's compute path.
+
+Each module is imported in a fresh interpreter, several times, and the median wall time is reported next to the
+time of importing numpy alone, which every module needs. The check fails if a compute module pulls in a rendering
+or camera dependency (matplotlib, cv2, mediapipe): those must only load when a robot is drawn or a camera is used.
+
+Usage:
+    python -m benchmarks.import_time [--repeat 5] [--limit-ms 250]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import numpy as np
+
+MODULES = (
+    "numpy",
+    "robot.robot",
+    "robot.LidarEmulator",
+    "robot.RobotBatch",
+    "robot.Simulation.HeadlessRunner",
+    "robot.Simulation.SweepRunner",
+    "robot.Simulation.Visualizer",
+    "GestureRecognition",
+)
+FORBIDDEN = ("matplotlib", "cv2", "mediapipe")
+REPEAT = 5
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in the child interpreter: time the import and list the forbidden packages it loaded
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = sorted({{name.split('.')[0] for name in sys.modules}} & set({forbidden!r}))
+print(elapsed, ','.join(loaded))
+"""
+
+def import_time(module, repeat=REPEAT):
+    """
+    Measures the time to import a module in fresh interpreters.
+
+    Parameters:
+        module (str): The module to import.
+        repeat (int): The number of interpreters to start.
+
+    Returns:
+        tuple: The median import time in milliseconds, and the forbidden packages the import loaded.
+    """
+    times = []
+    loaded = ""
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", PROBE.format(module=module, forbidden=FORBIDDEN)],
+                                cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+        times.append(float(output[0]) * 1000)
+        loaded = output[1] if len(output) > 1 else ""
+    return float(np.median(times)), loaded
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the import time of the robot package's compute path.")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="interpreters started per module")
+    parser.add_argument("--limit-ms", type=float, default=None,
+                        help="fail if a module takes longer than this to import, on top of numpy")
+    args = parser.parse_args()
+
+    failed = False
+    baseline = 0
+    print(f"{'module':<34} {'import ms':>10} {'over numpy':>11}  heavy dependencies loaded")
+    for module in MODULES:
+        elapsed, loaded = import_time(module, args.repeat)
+        if module == "numpy":
+            baseline = elapsed
+        over = elapsed - baseline
+        print(f"{module:<34} {elapsed:10.1f} {over:11.1f}  {loaded or '-'}")
+        if loaded or (args.limit_ms is not None and over > args.limit_ms):
+            failed = True
+    if failed:
+        print("FAIL: the compute path imports rendering or camera dependencies, or is over the time limit")
+        sys.exit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+Microbenchmark suite of the simulation hot paths, with regression checks against a stored baseline.
+
+Each case times single calls of one operation and reports throughput, median and 99th percentile latency, and the
+peak memory a call allocates (traced in a separate, shorter pass). Results are written as JSON; when a baseline
+exists, every case is compared with it and the run fails if a median latency grew by more than the tolerance.
+
+Cases:
+    lidar/<rays>r/<obstacles>o  LidarEmulator.update at several ray and obstacle counts
+    lidar/720r/<layout>         LidarEmulator.update in a 200 m generated maze or warehouse
+    lidar_sdf/720r/<obstacles>o LidarEmulator.update sphere-tracing the distance field
+    lidar/720r/moving           LidarEmulator.update among obstacles of which 3% move every tick
+    environment_step            Environment.step moving those obstacles, with an occupancy grid to update
+    collision/<obstacles>o      Environment.footprint_collisions on the 50 poses of a candidate motion
+    gap_detector                GapDetector.preprocess_lidar followed by GapDetector.update
+    robot_update                Robot.update, along the default scenario
+    state_machine               StateMachine.is_state
+    render_draw                 RenderSystem.draw on a non-interactive Agg figure
+    render_raster               RasterRenderSystem.draw into a 640x640 NumPy image
+
+Usage:
+    python -m benchmarks.run [--output results.json] [--filter lidar] [--update-baseline]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from robot.robot import Robot
+from robot.LidarEmulator import LidarEmulator
+from robot.Simulation.HeadlessRunner import setup_default_scenario
+from robot.Systems.RasterRenderSystem import RasterRenderSystem
+from robot.Environment.Environment import Environment
+from robot.Environment.WorldGenerator import WorldGenerator
+from robot.Environment.MovingObstacle import MovingObstacle
+from benchmarks.spatial_index import build_world
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+RAY_COUNTS = (180, 720, 2880)
+OBSTACLE_COUNTS = (1, 100, 10000)
+LAYOUTS = ("maze", "warehouse")
+WORLD_SIZE = 200.0      # Side of the generated layouts, in meters
+MOVING_COUNT = 300      # Moving obstacles added to the 10000 obstacle world, around the robot
+MIN_TIME = 0.5          # Seconds of timed calls per case
+MIN_CALLS = 20
+MAX_CALLS = 100000
+COLLISION_POSES = 50    # Poses along the candidate motion of the collision cases
+ALLOCATION_CALLS = 20
+TOLERANCE = 0.25        # Allowed relative growth of the median latency
+
+def default_robot():
+    """
+    Builds a robot set up with the default scenario, silencing the state change messages.
+
+    Returns:
+        Robot: The robot.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        robot = Robot()
+        setup_default_scenario(robot)
+    return robot
+
+def lidar_case(num_rays, num_obstacles, method="exact"):
+    """
+    Builds the LidarEmulator.update case: a robot turning on the spot in a random world, so the spatial-index
+    candidates are reused as on a real drive. The "sdf" method traces the rays in the world's distance field.
+    """
+    environment, _ = build_world(num_obstacles)
+    if method == "sdf":
+        environment.build_distance_field()
+    lidar = LidarEmulator(num_rays, method=method)
+    pose = [0.0, 0.0, 0.0]
+
+    def prepare():
+        pose[2] += 0.01
+
+    return lambda: lidar.update(pose, environment), prepare
+
+def world_case(layout):
+    """
+    Builds the LidarEmulator.update case in a generated world, turning on the spot at its origin.
+    """
+    environment = Environment()
+    WorldGenerator(0).populate(environment, layout, WORLD_SIZE, keep_clear=[(0, 0)])
+    lidar = LidarEmulator(720)
+    pose = [0.0, 0.0, 0.0]
+
+    def prepare():
+        pose[2] += 0.01
+
+    return lambda: lidar.update(pose, environment), prepare
+
+def moving_world():
+    """
+    Builds the 10000 obstacle world with MOVING_COUNT obstacles walking around the origin, and its occupancy grid.
+
+    Returns:
+        Environment: The environment.
+    """
+    environment, _ = build_world(10000)
+    rng = np.random.default_rng(0)
+    for (x, y), (vx, vy) in zip(rng.uniform(-20, 20, (MOVING_COUNT, 2)), rng.uniform(-1.5, 1.5, (MOVING_COUNT, 2))):
+        environment.add_obstacle(MovingObstacle(x, y, 0.5, 0.5, vx, vy, area=(-20, -20, 20, 20)))
+    environment.build_occupancy_grid()
+    return environment
+
+def moving_lidar_case():
+    """
+    Builds the LidarEmulator.update case among moving obstacles; the obstacles move untimed before each scan.
+    """
+    environment = moving_world()
+    lidar = LidarEmulator(720)
+    pose = [0.0, 0.0, 0.0]
+
+    def prepare():
+        environment.step(0.1)
+        pose[2] += 0.01
+
+    return lambda: lidar.update(pose, environment), prepare
+
+def environment_step_case():
+    """
+    Builds the Environment.step case among moving obstacles.
+    """
+    environment = moving_world()
+    return lambda: environment.step(0.1), None
+
+def collision_case(num_obstacles):
+    """
+    Builds the Environment.footprint_collisions case: a 5 meter arc of robot footprints, turned before each call.
+    """
+    environment, _ = build_world(num_obstacles)
+    steps = np.linspace(0, 5, COLLISION_POSES)
+    heading = [0.0]
+    poses = np.zeros((COLLISION_POSES, 3))
+
+    def prepare():
+        heading[0] += 0.01
+        theta = heading[0] + 0.2 * steps
+        poses[:, 0] = steps * np.cos(theta)
+        poses[:, 1] = steps * np.sin(theta)
+        poses[:, 2] = theta
+
+    return lambda: environment.footprint_collisions(poses, 0.2, 0.2), prepare
+
+def gap_detector_case():
+    """
+    Builds the gap detection case on scans recorded along the default scenario.
+    """
+    robot = default_robot()
+    lidar = LidarEmulator()
+    scans, poses = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(400):
+            robot.sense(lidar)
+            scans.append(lidar.get_data().copy())
+            poses.append(list(robot.odometer.get_pose()))
+            robot.update(0.1)
+    gap_detector = robot.gap_detector
+    tick = [0]
+
+    def prepare():
+        tick[0] = (tick[0] + 1) % len(scans)
+
+    def call():
+        gap_detector.preprocess_lidar(scans[tick[0]])
+        gap_detector.update(poses[tick[0]])
+
+    return call, prepare
+
+def robot_update_case():
+    """
+    Builds the Robot.update case: sensing runs untimed before each update, and the scenario restarts whenever the
+    robot reaches its goals.
+    """
+    state = {"robot": default_robot()}
+    lidar = LidarEmulator()
+
+    def prepare():
+        robot = state["robot"]
+        if robot.state_machine.is_state("Idle"):
+            robot = state["robot"] = default_robot()
+        robot.sense(lidar)
+
+    return lambda: state["robot"].update(0.1), prepare
+
+def state_machine_case():
+    """
+    Builds the StateMachine.is_state case.
+    """
+    state_machine = default_robot().state_machine
+    return lambda: state_machine.is_state("Idle"), None
+
+def render_case():
+    """
+    Builds the RenderSystem.draw case on a non-interactive figure, without pausing.
+    """
+    from matplotlib.figure import Figure
+    robot = default_robot()
+    lidar = LidarEmulator()
+    robot.sense(lidar)
+    robot.render.pause = None
+    ax = Figure().add_subplot()
+    return lambda: robot.draw(ax), None
+
+def raster_case():
+    """
+    Builds the RasterRenderSystem.draw case.
+    """
+    robot = default_robot()
+    lidar = LidarEmulator()
+    robot.sense(lidar)
+    raster = RasterRenderSystem(robot)
+    return raster.draw, None
+
+def cases():
+    """
+    Lists the benchmark cases.
+
+    Returns:
+        list: (name, builder) pairs; a builder returns the timed call and an optional untimed preparation step.
+    """
+    listed = [(f"lidar/{rays}r/{obstacles}o", lambda rays=rays, obstacles=obstacles: lidar_case(rays, obstacles))
+              for obstacles in OBSTACLE_COUNTS for rays in RAY_COUNTS]
+    listed += [(f"lidar/720r/{layout}", lambda layout=layout: world_case(layout)) for layout in LAYOUTS]
+    listed += [("lidar/720r/moving", moving_lidar_case), ("environment_step", environment_step_case)]
+    listed += [(f"lidar_sdf/720r/{obstacles}o", lambda obstacles=obstacles: lidar_case(720, obstacles, "sdf"))
+               for obstacles in OBSTACLE_COUNTS]
+    listed += [(f"collision/{obstacles}o", lambda obstacles=obstacles: collision_case(obstacles))
+               for obstacles in OBSTACLE_COUNTS]
+    listed += [
+        ("gap_detector", gap_detector_case),
+        ("robot_update", robot_update_case),
+        ("state_machine", state_machine_case),
+        ("render_draw", render_case),
+        ("render_raster", raster_case),
+    ]
+    return listed
+
+def measure(call, prepare=None, min_time=MIN_TIME):
+    """
+    Times single calls until 'min_time' seconds of calls are collected, then traces the memory of a few more.
+
+    Parameters:
+        call (callable): The timed operation.
+        prepare (callable): An untimed step run before every call, or None.
+        min_time (float): The timed duration to collect, in seconds.
+
+    Returns:
+        dict: The number of calls, ops/sec, p50 and p99 latencies in microseconds, and the largest peak allocation
+            of a call in bytes.
+    """
+    for _ in range(3):
+        if prepare is not None:
+            prepare()
+        call()
+
+    latencies = []
+    total = 0
+    clock = time.perf_counter_ns
+    while (total < min_time * 1e9 or len(latencies) < MIN_CALLS) and len(latencies) < MAX_CALLS:
+        if prepare is not None:
+            prepare()
+        start = clock()
+        call()
+        elapsed = clock() - start
+        latencies.append(elapsed)
+        total += elapsed
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(ALLOCATION_CALLS):
+            if prepare is not None:
+                prepare()
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            call()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - start)
+    finally:
+        tracemalloc.stop()
+
+    latencies = np.array(latencies) / 1000
+    return {
+        "calls": len(latencies),
+        "ops_per_sec": len(latencies) / (total / 1e9),
+        "p50_us": float(np.percentile(latencies, 50)),
+        "p99_us": float(np.percentile(latencies, 99)),
+        "alloc_peak_bytes": int(peak),
+    }
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    Compares results with a baseline.
+
+    Parameters:
+        results (dict): The measured cases, by name.
+        baseline (dict): The baseline cases, by name.
+        tolerance (float): The allowed relative growth of the median latency.
+
+    Returns:
+        list: The names of the cases whose median latency regressed beyond the tolerance.
+    """
+    regressions = []
+    print(f"{'case':<24} {'p50 us':>10} {'base us':>10} {'ratio':>7} {'alloc B':>9} {'base B':>9}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<24} {result['p50_us']:10.2f} {'-':>10} {'-':>7} {result['alloc_peak_bytes']:9d} {'-':>9}")
+            continue
+        base = baseline[name]
+        ratio = result["p50_us"] / base["p50_us"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  SLOWER"
+            regressions.append(name)
+        print(f"{name:<24} {result['p50_us']:10.2f} {base['p50_us']:10.2f} {ratio:7.2f} "
+              f"{result['alloc_peak_bytes']:9d} {base['alloc_peak_bytes']:9d}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the hot path microbenchmarks and compare with the baseline.")
+    parser.add_argument("--output", default=None, help="JSON file receiving the results")
+    parser.add_argument("--baseline", default=BASELINE, help=f"baseline JSON file (default: {BASELINE})")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--filter", default="", help="only run the cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="timed seconds per case")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed relative p50 growth")
+    args = parser.parse_args()
+
+    results = {}
+    for name, builder in cases():
+        if args.filter in name:
+            # Robots print their state changes; keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                call, prepare = builder()
+                results[name] = measure(call, prepare, args.min_time)
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(dict(report, results=dict(baseline, **results)), file, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif regressions:
+        print(f"FAIL: {len(regressions)} case(s) slower than the baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Allocation check for the sensing hot path: LidarEmulator.update followed by GapDetector.preprocess_lidar.
+
+After a warm-up tick, which sizes every buffer, further ticks must not allocate any array memory. The check traces
+allocations with tracemalloc over a short drive and fails if the peak traced memory of a tick exceeds a few
+hundred bytes (small Python objects such as tuples and array views), far below the size of a single scan buffer.
+
+Usage:
+    python -m benchmarks.sensing_allocations
+"""
+import sys
+import tracemalloc
+import numpy as np
+from robot.Components.GapDetector import GapDetector
+from robot.Environment.Environment import Environment
+from robot.Environment.EnvironmentCreater import EnvironmentCreator
+from robot.LidarEmulator import LidarEmulator
+
+TICKS = 200
+LIMIT = 1024  # Bytes; a 720-ray float64 scan alone is 5760 bytes
+
+def sensing_peaks(num_rays=720, ticks=TICKS):
+    """
+    Runs the sensing pipeline along a short straight drive and records the peak traced memory of each tick.
+
+    Parameters:
+        num_rays (int): The number of LIDAR rays.
+        ticks (int): The number of measured ticks.
+
+    Returns:
+        numpy.ndarray: The peak memory allocated during each tick, in bytes.
+    """
+    environment = Environment()
+    creator = EnvironmentCreator(environment)
+    creator.setup_default_environment()
+    creator.add_rectangle_obstacle(1, -2, 1, 3)
+    lidar = LidarEmulator(num_rays)
+    gap_detector = GapDetector()
+
+    pose = [0.0, -1.0, np.pi / 2]
+    lidar.update(pose, environment)
+    gap_detector.preprocess_lidar(lidar.get_data())
+
+    peaks = np.zeros(ticks)
+    tracemalloc.start()
+    try:
+        for tick in range(ticks):
+            # Stay inside one spatial-index neighbourhood so the candidate set is reused
+            pose[1] = -1.0 + 0.001 * tick
+            pose[2] = np.pi / 2 + 0.001 * tick
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            lidar.update(pose, environment)
+            gap_detector.preprocess_lidar(lidar.get_data())
+            peaks[tick] = tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+def main():
+    failed = False
+    # The peak must not grow with the scan size, or some buffer is being allocated per tick
+    for num_rays in (720, 2880):
+        peaks = sensing_peaks(num_rays)
+        print(f"{num_rays} rays: per-tick peak allocation max {peaks.max():.0f} B, "
+              f"median {np.median(peaks):.0f} B (limit {LIMIT} B)")
+        failed = failed or peaks.max() > LIMIT
+    if failed:
+        print("FAIL: the sensing hot path allocates array memory")
+        sys.exit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    main()
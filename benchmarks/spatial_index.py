@@ -0,0 +1,89 @@
+"""
+Benchmark of obstacle queries with and without the Environment spatial index.
+
+Worlds are generated at a constant obstacle density, so the map area grows with the obstacle count. With the
+spatial index, sensing cost should follow the local density and stay roughly flat; the linear scan grows with
+the total number of obstacles. The world is also saved to a map file and loaded back in bulk, which should take
+milliseconds even at 100k obstacles.
+
+Usage:
+    python -m benchmarks.spatial_index
+"""
+import os
+import tempfile
+import time
+import numpy as np
+from robot.Environment.Environment import Environment
+from robot.Environment.MapFile import MapFile, save_map
+from robot.Environment.WorldGenerator import WorldGenerator
+from robot.LidarEmulator import LidarEmulator
+
+SIZES = (10, 1000, 100000, 1000000)
+DENSITY = 0.25          # Obstacles per square meter
+LINEAR_LIMIT = 10000    # Largest world still scanned linearly (rays x obstacles array must fit in memory)
+
+def build_world(num_obstacles, seed=0):
+    """
+    Builds an environment with randomly placed rectangles at a constant density, with the "clutter" layout of
+    WorldGenerator.
+
+    Parameters:
+        num_obstacles (int): The number of obstacles to place.
+        seed (int): The random seed.
+
+    Returns:
+        tuple: The environment and the side length of the square map.
+    """
+    side = np.sqrt(num_obstacles / DENSITY)
+    environment = Environment()
+    WorldGenerator(seed).populate(environment, "clutter", side, DENSITY)
+    return environment, side
+
+def time_call(func, repeat):
+    """
+    Measures the mean wall time of a call.
+
+    Parameters:
+        func (callable): The function to call without arguments.
+        repeat (int): The number of calls to average over.
+
+    Returns:
+        float: The mean time per call in milliseconds.
+    """
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    lidar = LidarEmulator()
+    print(f"{'obstacles':>10} {'build s':>9} {'load ms':>9} {'lidar idx ms':>13} {'lidar lin ms':>13} "
+          f"{'point idx us':>13} {'point lin us':>13}")
+    for size in SIZES:
+        start = time.perf_counter()
+        environment, side = build_world(size)
+        build = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "world.map")
+            save_map(path, environment)
+            start = time.perf_counter()
+            MapFile(path).load()
+            load = (time.perf_counter() - start) * 1000
+
+        pose = [0.0, 0.0, 0.0]
+        points = np.random.default_rng(1).uniform(-side / 2, side / 2, size=(1000, 2))
+        obstacles = environment.obstacles
+
+        lidar_idx = time_call(lambda: lidar.update(pose, environment), 20)
+        point_idx = time_call(lambda: [environment.point_in_obstacle(p) for p in points], 5)
+        if size <= LINEAR_LIMIT:
+            lidar_lin = f"{time_call(lambda: lidar.update(pose, obstacles), 5):13.3f}"
+            point_lin = f"{time_call(lambda: [any(o.contains_point(p) for o in obstacles) for p in points], 1):13.3f}"
+        else:
+            lidar_lin = point_lin = f"{'skipped':>13}"
+        print(f"{size:>10} {build:9.3f} {load:9.3f} {lidar_idx:13.3f} {lidar_lin} {point_idx:13.3f} {point_lin}")
+
+if __name__ == "__main__":
+    main()
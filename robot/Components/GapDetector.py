@@ -9,7 +9,7 @@ class GapDetector:
             _best_gap (tuple): The start and end indices of the largest detected gap.
             _gap_goal (list): The global position of the center of the largest gap.
             _gaps (list): List of tuples representing the start and end indices of detected gaps.
-            processed_lidar_data (list): The LIDAR data processed to focus on a 180-degree field in front of the robot.
+            processed_lidar_data (numpy.ndarray): The LIDAR data processed to focus on a 180-degree field in front of the robot.
             angular_resolution (float): The angular resolution of LIDAR data processing.
             threshold_distance (float): The minimum radius in which consider intercepting object as an obstacle.
     """
@@ -24,6 +24,7 @@ class GapDetector:
         self._gap_goal = []
         self._gaps = []
         self.processed_lidar_data = []
+        self._processed = np.empty(0)
         self.angular_resolution = angular_resolution
         self.threshold_distance = 0
 
@@ -32,32 +33,80 @@ class GapDetector:
         Preprocesses the LIDAR data by segmenting it into angular segments and calculating the mean distance in each segment.
         The processed data provides a simplified representation of the environment, focusing on a 180-degree field in front of the robot.
 
+        When each front quarter splits into whole segments, the segment means are computed on strided views of the
+        scan and written into a buffer owned by the detector, so no memory is allocated per scan. The buffer is
+        overwritten by the next call; copy 'processed_lidar_data' to keep it.
+
         Parameters:
-            lidar_data (list): The raw LIDAR data as a list of distances.
+            lidar_data (list or numpy.ndarray): The raw LIDAR data as a sequence of distances.
             min_distance (float): The minimum distance to consider for an object to be an obstacle.
             max_distance (float): The maximum distance to consider for an object to be an obstacle.
         """
         total_points = len(lidar_data)
         points_per_segment = int(self.angular_resolution * total_points / 360)
-        
-        # Initialize a list to store the mean values of the segments
-        segment_means = []
-
-        # Process the front right quarter
-        for i in range(3 * total_points // 4, total_points, points_per_segment):
-            segment = lidar_data[i:i + points_per_segment]
-            segment_mean = sum(segment) / len(segment)
-            segment_means.append(segment_mean)
-        
-        # Process the front left quarter
-        for i in range(0, total_points // 4, points_per_segment):
-            segment = lidar_data[i:i + points_per_segment]
-            segment_mean = sum(segment) / len(segment)  
-            segment_means.append(segment_mean)
-
-        self.processed_lidar_data = segment_means
-        self.processed_lidar_data = np.clip(segment_means, min_distance, max_distance)
-        self.threshold_distance = min(min(self.processed_lidar_data) + 0.4, max(self.processed_lidar_data))
+        quarter = total_points // 4
+
+        if total_points % 4 == 0 and quarter % points_per_segment == 0:
+            lidar_data = np.asarray(lidar_data, dtype=float)
+            segments = quarter // points_per_segment
+            processed = self._processed_buffer(2 * segments)
+            right = processed[:segments]
+            left = processed[segments:]
+
+            # Front right quarter, then front left quarter. Segment sums are built from strided views of the scan,
+            # one offset within the segment at a time, which matches the summation order of the slicing fallback.
+            np.copyto(right, lidar_data[3 * quarter::points_per_segment])
+            np.copyto(left, lidar_data[:quarter:points_per_segment])
+            for offset in range(1, points_per_segment):
+                right += lidar_data[3 * quarter + offset::points_per_segment]
+                left += lidar_data[offset:quarter:points_per_segment]
+            if points_per_segment > 1:
+                processed /= points_per_segment
+        else:
+            # Segments straddle the quarter boundaries, so fall back to slicing them one by one
+            segment_means = []
+            for i in range(3 * total_points // 4, total_points, points_per_segment):
+                segment = lidar_data[i:i + points_per_segment]
+                segment_means.append(sum(segment) / len(segment))
+            for i in range(0, total_points // 4, points_per_segment):
+                segment = lidar_data[i:i + points_per_segment]
+                segment_means.append(sum(segment) / len(segment))
+            processed = np.array(segment_means, dtype=float)
+
+        np.maximum(processed, min_distance, out=processed)
+        np.minimum(processed, max_distance, out=processed)
+        self.processed_lidar_data = processed
+        # Indexing by argmin/argmax avoids the reduction buffers that min()/max() set up on every call
+        self.threshold_distance = min(processed[processed.argmin()] + 0.4, processed[processed.argmax()])
+
+    def get_num_segments(self, num_rays):
+        """
+        Computes the number of segments preprocess_lidar produces from scans of a given size.
+
+        Parameters:
+            num_rays (int): The number of distances in a scan.
+
+        Returns:
+            int: The number of segments of the processed LIDAR data.
+        """
+        points_per_segment = int(self.angular_resolution * num_rays / 360)
+        return (len(range(3 * num_rays // 4, num_rays, points_per_segment))
+                + len(range(0, num_rays // 4, points_per_segment)))
+
+    def _processed_buffer(self, size):
+        """
+        Internal method to retrieve the reusable buffer for processed LIDAR data, reallocating it only when the
+        number of segments changes.
+
+        Parameters:
+            size (int): The number of segments.
+
+        Returns:
+            numpy.ndarray: The buffer of shape (size,).
+        """
+        if self._processed.shape[0] != size:
+            self._processed = np.empty(size)
+        return self._processed
 
     def update(self, robot_pose):
         """
@@ -75,40 +124,91 @@ class GapDetector:
         self.calculate_weighted_target_point()
         self.calculate_global_target(robot_pose)
 
+    def process_scans(self, scans, robot_poses, min_distance = 0.1, max_distance = 2):
+        """
+        Runs preprocessing and gap detection on a stack of scans at once, for example one scan per robot of a fleet or
+        every scan of a recorded log. The detector's own state is left untouched, and each row gives the same
+        processed data, best gap and gap goal as preprocess_lidar followed by update.
+
+        Parameters:
+            scans (numpy.ndarray): The raw LIDAR scans, shape (B, num_rays).
+            robot_poses (numpy.ndarray): The pose of the robot for each scan, shape (B, 3).
+            min_distance (float): The minimum distance to consider for an object to be an obstacle.
+            max_distance (float): The maximum distance to consider for an object to be an obstacle.
+
+        Returns:
+            tuple: The processed data of shape (B, num_segments), the threshold distances of shape (B,), the best gaps
+                of shape (B, 2) as (start, end) indices with -1 where no gap was found, and the global gap goals of
+                shape (B, 2) with NaN where no gap was found.
+        """
+        scans = np.asarray(scans, dtype=float)
+        robot_poses = np.asarray(robot_poses, dtype=float).reshape(-1, 3)
+        num_scans, total_points = scans.shape
+        points_per_segment = int(self.angular_resolution * total_points / 360)
+        quarter = total_points // 4
+
+        if total_points % 4 == 0 and quarter % points_per_segment == 0:
+            right = scans[:, 3 * quarter::points_per_segment].copy()
+            left = scans[:, :quarter:points_per_segment].copy()
+            for offset in range(1, points_per_segment):
+                right += scans[:, 3 * quarter + offset::points_per_segment]
+                left += scans[:, offset:quarter:points_per_segment]
+            processed = np.concatenate([right, left], axis=1)
+            if points_per_segment > 1:
+                processed /= points_per_segment
+        else:
+            # Segments straddle the quarter boundaries, so fall back to preprocessing the scans one by one
+            detector = GapDetector(self.angular_resolution)
+            rows = []
+            for scan in scans:
+                detector.preprocess_lidar(scan, min_distance, max_distance)
+                rows.append(detector.processed_lidar_data.copy())
+            processed = np.array(rows)
+        np.clip(processed, min_distance, max_distance, out=processed)
+        thresholds = np.minimum(processed.min(axis=1) + 0.4, processed.max(axis=1))
+
+        # Best gap per scan: widest first, ties to the earliest start
+        best_gaps = np.full((num_scans, 2), -1, dtype=np.intp)
+        gap_goals = np.full((num_scans, 2), np.nan)
+        rows, starts, ends = gap_boundaries(processed > thresholds[:, None])
+        if len(rows):
+            order = np.lexsort((starts, starts - ends, rows))
+            first = order[np.unique(rows[order], return_index=True)[1]]
+            rows, starts, ends = rows[first], starts[first], ends[first]
+            best_gaps[rows, 0] = starts
+            best_gaps[rows, 1] = ends
+
+            # Same arithmetic as calculate_weighted_target_point and calculate_global_target
+            center = (ends + starts) // 2
+            target_distance = processed[rows, center]
+            global_angle = robot_poses[rows, 2] + np.radians(center * self.angular_resolution - 90)
+            global_angle = np.arctan2(np.sin(global_angle), np.cos(global_angle))
+            gap_goals[rows, 0] = robot_poses[rows, 0] + target_distance * np.cos(global_angle)
+            gap_goals[rows, 1] = robot_poses[rows, 1] + target_distance * np.sin(global_angle)
+
+        return processed, thresholds, best_gaps, gap_goals
+
     def find_gaps(self):
         """
         Identifies gaps in the processed LIDAR data. A gap is defined as a contiguous set of points where no obstacle is detected.
-        This method updates the '_gaps' attribute with the start and end indices of each detected gap.
+        This method updates the '_gaps' attribute with the start and end indices of each detected gap, where the end index
+        is the first point after the gap. A gap still open at the last segment is closed at the end of the data.
         """
-        gaps = []
-        in_gap = False
-        lidar_data = self.processed_lidar_data
-        for i, distance in enumerate(lidar_data):
-            if distance > self.threshold_distance and not in_gap:
-                # Start of a new gap
-                start_index = i
-                in_gap = True
-            elif distance <= self.threshold_distance and in_gap:
-                # End of the current gap
-                end_index = i
-                gaps.append((start_index, end_index))
-                in_gap = False
-        self._gaps = gaps
-    
+        above = np.asarray(self.processed_lidar_data) > self.threshold_distance
+        _, starts, ends = gap_boundaries(above[None])
+        self._gaps = list(zip(starts.tolist(), ends.tolist()))
+
     def find_largest_gap(self):
         """
-        Finds the largest gap among the detected gaps. The largest gap is determined based on its width.
-        Updates the '_best_gap' attribute with the start and end indices of the largest gap.
+        Finds the largest gap among the detected gaps. The largest gap is determined based on its width, with ties going
+        to the first gap. Updates the '_best_gap' attribute with the start and end indices of the largest gap.
         """
         gaps = self._gaps
-        max_width = -1
-        largest_gap = None
-        for start_index, end_index in gaps:
-            width = end_index - start_index
-            if width > max_width:
-                max_width = width
-                largest_gap = (start_index, end_index)
-        self._best_gap = largest_gap
+        if not gaps:
+            self._best_gap = None
+            return
+        widths = [end_index - start_index for start_index, end_index in gaps]
+        self._best_gap = gaps[int(np.argmax(widths))]
 
     def calculate_weighted_target_point(self):
         """
@@ -148,4 +248,23 @@ class GapDetector:
         Returns:
             list: The global coordinates (x, y) of the target point within the largest gap.
         """
-        return self._gap_goal
\ No newline at end of file
+        return self._gap_goal
+
+def gap_boundaries(above):
+    """
+    Finds the runs of True values along the last axis of a boolean array.
+
+    Parameters:
+        above (numpy.ndarray): A boolean array of shape (B, num_segments), True where a segment is free.
+
+    Returns:
+        tuple: The row, start index and end index of every run, in row-major order. End indices are exclusive, so a
+            run reaching the last segment ends at num_segments.
+    """
+    edges = np.zeros((above.shape[0], above.shape[1] + 1), dtype=np.int8)
+    edges[:, 1:] = above
+    edges[:, :-1] -= above
+    # edges[:, i] = above[:, i - 1] - above[:, i]: -1 where a run starts at i, +1 where one ends before i
+    rows, starts = np.nonzero(edges == -1)
+    _, ends = np.nonzero(edges == 1)
+    return rows, starts, ends
@@ -0,0 +1,226 @@
+from contextlib import nullcontext
+from time import perf_counter_ns
+import numpy as np
+
+# Returned by Profiler.section while the profiler is disabled; a no-op context manager that can be reused
+_UNTIMED = nullcontext()
+
+class SectionTimes:
+    """
+    The timings of one profiled section: a rolling window of the most recent durations plus running totals.
+
+    Attributes:
+        samples (numpy.ndarray): The ring buffer of recent durations, in nanoseconds.
+        count (int): The number of durations recorded since the last reset.
+        total (int): The sum of all durations recorded since the last reset, in nanoseconds.
+        max (int): The longest duration recorded since the last reset, in nanoseconds.
+    """
+    def __init__(self, window):
+        """
+        Initializes empty SectionTimes.
+
+        Parameters:
+            window (int): The number of recent durations kept.
+        """
+        self.samples = np.zeros(window)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, elapsed):
+        """
+        Records one duration.
+
+        Parameters:
+            elapsed (int): The duration, in nanoseconds.
+        """
+        self.samples[self.count % len(self.samples)] = elapsed
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def recent(self):
+        """
+        Retrieves the durations of the rolling window.
+
+        Returns:
+            numpy.ndarray: The recent durations, in nanoseconds.
+        """
+        return self.samples[:min(self.count, len(self.samples))]
+
+class Section:
+    """
+    A context manager timing one section of code into a Profiler, created by Profiler.section.
+
+    Attributes:
+        profiler (Profiler): The profiler receiving the duration.
+        name (str): The name of the section.
+        start (int): The clock reading when the section was entered.
+    """
+    def __init__(self, profiler, name):
+        """
+        Initializes the Section.
+
+        Parameters:
+            profiler (Profiler): The profiler receiving the duration.
+            name (str): The name of the section.
+        """
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = self.profiler.clock()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start)
+
+class Profiler:
+    """
+    An opt-in timer of the robot's systems. Instrumented code wraps each section in a 'with' block; the clock is
+    only read while the profiler is enabled, so a disabled profiler costs one no-op context per instrumented call:
+
+        with self.profiler.section("section"):
+            ...
+
+    Attributes:
+        enabled (bool): Whether sections are timed.
+        window (int): The number of recent durations kept per section.
+        summary_every (int): Print a summary every this many ticks, or 0 to never print one.
+        output (callable): The function receiving periodic summaries, defaults to print.
+        ticks (int): The number of ticks counted since the last reset.
+        sections (dict): The SectionTimes of each section, by name, in first-recorded order.
+        clock (callable): The clock used for timing, returning nanoseconds.
+    """
+    def __init__(self, enabled=False, window=1000, summary_every=0, output=print):
+        """
+        Initializes the Profiler.
+
+        Parameters:
+            enabled (bool): Whether sections are timed, defaults to False.
+            window (int): The number of recent durations kept per section, defaults to 1000.
+            summary_every (int): Print a summary every this many ticks, defaults to never.
+            output (callable): The function receiving periodic summaries, defaults to print.
+        """
+        self.enabled = enabled
+        self.window = window
+        self.summary_every = summary_every
+        self.output = output
+        self.ticks = 0
+        self.sections = {}
+        self.clock = perf_counter_ns
+
+    def enable(self, summary_every=None):
+        """
+        Starts timing sections.
+
+        Parameters:
+            summary_every (int): Print a summary every this many ticks; keeps the current setting if None.
+        """
+        if summary_every is not None:
+            self.summary_every = summary_every
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stops timing sections. The recorded timings are kept.
+        """
+        self.enabled = False
+
+    def reset(self):
+        """
+        Clears all recorded timings.
+        """
+        self.ticks = 0
+        self.sections = {}
+
+    def section(self, name):
+        """
+        Times a section of code as a context manager, recording its duration when the block exits.
+
+        Parameters:
+            name (str): The name of the section.
+
+        Returns:
+            object: A context manager; one that records nothing while the profiler is disabled.
+        """
+        if self.enabled:
+            return Section(self, name)
+        return _UNTIMED
+
+    def record(self, name, start):
+        """
+        Records the time elapsed since 'start' for a section.
+
+        Parameters:
+            name (str): The name of the section.
+            start (int): The clock reading when the section started.
+        """
+        elapsed = self.clock() - start
+        times = self.sections.get(name)
+        if times is None:
+            times = self.sections[name] = SectionTimes(self.window)
+        times.add(elapsed)
+
+    def tick(self):
+        """
+        Counts one tick, printing a summary when one is due.
+        """
+        self.ticks += 1
+        if self.summary_every and self.ticks % self.summary_every == 0:
+            self.output(self.summary())
+
+    def stats(self):
+        """
+        Computes statistics of every section. Percentiles are taken over the rolling window, totals over all ticks
+        since the last reset.
+
+        Returns:
+            dict: For each section, a dictionary with count, total_ms, mean_us, p50_us, p99_us and max_us.
+        """
+        stats = {}
+        for name, times in self.sections.items():
+            recent = times.recent() / 1000
+            p50, p99 = np.percentile(recent, (50, 99))
+            stats[name] = {
+                "count": times.count,
+                "total_ms": times.total / 1e6,
+                "mean_us": times.total / times.count / 1000,
+                "p50_us": float(p50),
+                "p99_us": float(p99),
+                "max_us": times.max / 1000,
+            }
+        return stats
+
+    def histogram(self, name, bins=20):
+        """
+        Builds a histogram of a section's recent durations over logarithmic bins.
+
+        Parameters:
+            name (str): The name of the section.
+            bins (int): The number of bins.
+
+        Returns:
+            tuple: The counts of each bin and the bin edges in microseconds.
+        """
+        recent = self.sections[name].recent() / 1000
+        low, high = max(recent.min(), 1e-3), max(recent.max(), 1e-3)
+        edges = np.geomspace(low, high * 1.000001, bins + 1)
+        counts, _ = np.histogram(recent, edges)
+        return counts, edges
+
+    def summary(self):
+        """
+        Formats the statistics of every section as a table.
+
+        Returns:
+            str: The summary.
+        """
+        lines = [f"Profile after {self.ticks} ticks",
+                 f"{'section':<22} {'count':>8} {'mean us':>10} {'p50 us':>10} {'p99 us':>10} {'max us':>10}"]
+        for name, stat in self.stats().items():
+            lines.append(f"{name:<22} {stat['count']:>8} {stat['mean_us']:10.1f} {stat['p50_us']:10.1f} "
+                         f"{stat['p99_us']:10.1f} {stat['max_us']:10.1f}")
+        return "\n".join(lines)
@@ -0,0 +1,197 @@
+import asyncio
+import time
+from .Profiler import SectionTimes
+
+class RateScheduler:
+    """
+    Runs a control loop at a fixed rate. Each call to wait sleeps until the next period starts and returns the time
+    actually elapsed since the previous cycle started, to be passed as dt to Robot.update. The scheduler records
+    deadline misses, overruns and wake-up jitter, and can shed optional work such as rendering when a cycle has no
+    time left for it.
+
+        scheduler = RateScheduler(freq)
+        while True:
+            dt = scheduler.wait()
+            robot.sense(lidar)
+            robot.update(dt)
+            scheduler.optional(robot.draw, ax)
+
+    When the loop falls more than a period behind, the missed periods are skipped instead of run back to back. In a
+    coroutine, use 'await scheduler.wait_async()' to yield to the event loop instead of sleeping.
+
+    Attributes:
+        freq (float): The loop rate, in Hz.
+        period (int): The loop period, in nanoseconds.
+        tolerance (int): How late a cycle may start before it counts as a deadline miss, in nanoseconds.
+        max_dt (float): The largest dt returned, in seconds, so a stall does not feed a huge step to the controllers.
+        max_shed (int): Optional work is run at least once every this many cycles, even when late.
+        ticks (int): The number of cycles started.
+        misses (int): The number of cycles that started later than their deadline plus the tolerance.
+        overruns (int): The number of cycles whose work took longer than a period.
+        skipped (int): The number of periods skipped to catch up after falling behind.
+        shed (int): The number of times optional work was skipped.
+        jitter (SectionTimes): How late each cycle started relative to its deadline, in nanoseconds.
+        work (SectionTimes): How long each cycle's work took, in nanoseconds.
+        clock (callable): The monotonic clock, returning nanoseconds.
+        sleep (callable): The sleep function, taking seconds.
+        _deadline (int): The scheduled start of the current cycle.
+        _start (int): The actual start of the current cycle, None before the first cycle.
+        _late (bool): Whether the current cycle started later than the tolerance.
+        _optional_cost (float): A moving average of the duration of optional work, in nanoseconds.
+        _shed_run (int): The number of consecutive cycles that shed optional work.
+    """
+    def __init__(self, freq=20, tolerance=0.1, max_dt=None, max_shed=None, window=1000):
+        """
+        Initializes the RateScheduler.
+
+        Parameters:
+            freq (float): The loop rate in Hz, defaults to 20.
+            tolerance (float): The lateness counted as a deadline miss, as a fraction of the period; defaults to 0.1.
+            max_dt (float): The largest dt returned in seconds, defaults to 5 periods.
+            max_shed (int): Run optional work at least once every this many cycles, defaults to once per second.
+            window (int): The number of recent cycles kept for jitter and work statistics.
+        """
+        self.freq = freq
+        self.period = int(1e9 / freq)
+        self.tolerance = int(tolerance * self.period)
+        self.max_dt = max_dt if max_dt is not None else 5 / freq
+        self.max_shed = max_shed if max_shed is not None else max(int(freq), 1)
+        self.ticks = 0
+        self.misses = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.shed = 0
+        self.jitter = SectionTimes(window)
+        self.work = SectionTimes(window)
+        self.clock = time.perf_counter_ns
+        self.sleep = time.sleep
+        self._deadline = 0
+        self._start = None
+        self._late = False
+        self._optional_cost = 0
+        self._shed_run = 0
+
+    def wait(self):
+        """
+        Ends the current cycle and sleeps until the next one is due.
+
+        Returns:
+            float: The time elapsed since the previous cycle started, in seconds and at most 'max_dt'. The first
+                cycle returns one period.
+        """
+        delay = self._end_cycle()
+        if delay > 0:
+            self.sleep(delay)
+        return self._start_cycle()
+
+    async def wait_async(self):
+        """
+        Ends the current cycle and yields to the event loop until the next one is due.
+
+        Returns:
+            float: The time elapsed since the previous cycle started, as returned by wait.
+        """
+        delay = self._end_cycle()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._start_cycle()
+
+    def _end_cycle(self):
+        """
+        Internal method to account for the work of the cycle that just ended.
+
+        Returns:
+            float: The time left until the next cycle is due, in seconds.
+        """
+        now = self.clock()
+        self.ticks += 1
+        if self._start is None:
+            return 0
+        work = now - self._start
+        self.work.add(work)
+        if work > self.period:
+            self.overruns += 1
+        return (self._deadline + self.period - now) / 1e9
+
+    def _start_cycle(self):
+        """
+        Internal method to start a new cycle, measuring how late it starts.
+
+        Returns:
+            float: The time elapsed since the previous cycle started, in seconds and at most 'max_dt'.
+        """
+        now = self.clock()
+        if self._start is None:
+            self._deadline = now
+            self._start = now
+            return self.period / 1e9
+
+        deadline = self._deadline + self.period
+        lateness = now - deadline
+        self.jitter.add(lateness)
+        self._late = lateness > self.tolerance
+        if self._late:
+            self.misses += 1
+        if lateness >= self.period:
+            behind = lateness // self.period
+            self.skipped += behind
+            deadline += behind * self.period
+
+        dt = (now - self._start) / 1e9
+        self._deadline = deadline
+        self._start = now
+        return min(dt, self.max_dt)
+
+    def remaining(self):
+        """
+        Computes the time left before the next cycle is due.
+
+        Returns:
+            float: The remaining time in seconds, negative when the cycle is already late.
+        """
+        return (self._deadline + self.period - self.clock()) / 1e9
+
+    def optional(self, func, *args):
+        """
+        Runs optional work if the current cycle can afford it: the cycle started on time and the time left exceeds
+        the usual duration of the work. Shed work still runs once every 'max_shed' cycles.
+
+        Parameters:
+            func (callable): The optional work, such as robot.draw.
+            *args: The arguments passed to func.
+
+        Returns:
+            bool: True if the work ran, False if it was shed.
+        """
+        start = self.clock()
+        remaining = self._deadline + self.period - start
+        if (self._late or remaining < self._optional_cost) and self._shed_run < self.max_shed:
+            self.shed += 1
+            self._shed_run += 1
+            return False
+        func(*args)
+        cost = self.clock() - start
+        self._optional_cost = cost if not self._optional_cost else 0.8 * self._optional_cost + 0.2 * cost
+        self._shed_run = 0
+        return True
+
+    def stats(self):
+        """
+        Summarizes the loop timing. Jitter and work statistics cover the recent window.
+
+        Returns:
+            dict: The counters, and the mean and maximum jitter and work durations in milliseconds.
+        """
+        jitter = self.jitter.recent()
+        work = self.work.recent()
+        return {
+            "ticks": self.ticks,
+            "misses": self.misses,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "shed": self.shed,
+            "jitter_mean_ms": float(jitter.mean()) / 1e6 if len(jitter) else 0.0,
+            "jitter_max_ms": float(jitter.max()) / 1e6 if len(jitter) else 0.0,
+            "work_mean_ms": float(work.mean()) / 1e6 if len(work) else 0.0,
+            "work_max_ms": float(work.max()) / 1e6 if len(work) else 0.0,
+        }
@@ -0,0 +1,228 @@
+import math
+import numpy as np
+from .OccupancyGrid import OccupancyGrid
+
+class DistanceField:
+    """
+    A signed distance field precomputed over a grid, for constant-time clearance queries and sphere-traced LIDAR
+    rays. It uses the cell layout of OccupancyGrid: cell [i, j] covers
+    [x_min + i * resolution, x_min + (i + 1) * resolution) x [y_min + j * resolution, y_min + (j + 1) * resolution).
+
+    Each value is the distance from a cell's center to the nearest occupied cell, negated inside occupied cells
+    (the distance to the nearest free cell). Occupied cells cover every obstacle, so the clearance of a point p is
+    at least the value of any cell minus the distance from p to that cell's center. Queries use that bound, which
+    is never more than half a cell diagonal below the value at p's own cell. Answers are conservative: occupied
+    cells overhang the obstacles by up to a cell, so they lose at most one and a half cell diagonals against the
+    exact clearance. Outside the grid the environment is free.
+
+    Attributes:
+        resolution (float): The side length of a cell.
+        x_min (float): The x-coordinate of the grid's lower-left corner.
+        y_min (float): The y-coordinate of the grid's lower-left corner.
+        max_distance (float): The largest distance stored; farther distances are clipped to it.
+        values (numpy.ndarray): The signed distance at each cell center, shape (nx, ny).
+    """
+    def __init__(self, values, resolution, origin=(0, 0), max_distance=np.inf):
+        """
+        Initializes a DistanceField from precomputed values; use from_occupancy_grid or from_bounds to compute them.
+
+        Parameters:
+            values (numpy.ndarray): The signed distance at each cell center, shape (nx, ny).
+            resolution (float): The side length of a cell.
+            origin (tuple): The (x, y) coordinates of the lower-left corner of cell [0, 0].
+            max_distance (float): The distance the values were clipped to.
+        """
+        self.values = values
+        self.resolution = resolution
+        self.x_min = origin[0]
+        self.y_min = origin[1]
+        self.max_distance = max_distance
+
+    @classmethod
+    def from_occupancy_grid(cls, grid, max_distance=np.inf):
+        """
+        Computes the distance field of an occupancy grid, e.g. one built from real scans.
+
+        Parameters:
+            grid (OccupancyGrid): The occupancy grid.
+            max_distance (float): Clip distances to this value, which also bounds the precomputation; defaults to no
+                clipping.
+
+        Returns:
+            DistanceField: The field, on the grid's cells.
+        """
+        occupied = grid.get_occupied()
+        res = grid.resolution
+        # Everything outside the grid is free: a ring of free cells bounds the distances inside obstacles
+        free = np.pad(~occupied, 1, constant_values=True)
+        values = np.where(occupied, -distance_to(free, res, max_distance)[1:-1, 1:-1],
+                          distance_to(occupied, res, max_distance))
+        return cls(values.astype(np.float32), res, (grid.x_min, grid.y_min), max_distance)
+
+    @classmethod
+    def from_bounds(cls, bounds, region, resolution=0.05, max_distance=np.inf):
+        """
+        Computes the distance field of rectangular obstacles over a region.
+
+        Parameters:
+            bounds (numpy.ndarray): The obstacle bounds, shape (num_obstacles, 4) as (x_min, y_min, x_max, y_max).
+            region (tuple): The area covered as (x_min, y_min, x_max, y_max).
+            resolution (float): The side length of a cell, defaults to 5 centimeters.
+            max_distance (float): Clip distances to this value, defaults to no clipping.
+
+        Returns:
+            DistanceField: The field.
+        """
+        grid = OccupancyGrid(*region, resolution=resolution)
+        grid.rasterize(bounds)
+        return cls.from_occupancy_grid(grid, max_distance)
+
+    def get_region(self):
+        """
+        Retrieves the area covered by the field.
+
+        Returns:
+            tuple: The region as (x_min, y_min, x_max, y_max).
+        """
+        nx, ny = self.values.shape
+        return (self.x_min, self.y_min, self.x_min + nx * self.resolution, self.y_min + ny * self.resolution)
+
+    def lower_bound(self, x, y):
+        """
+        Computes a lower bound of the signed clearance of points, from the value of the nearest cell. Outside the
+        grid the bound also accounts for the grid being at least as far as its border.
+
+        Parameters:
+            x (float or numpy.ndarray): The x-coordinate(s) of the points.
+            y (float or numpy.ndarray): The y-coordinate(s) of the points.
+
+        Returns:
+            numpy.ndarray: The clearance bound of each point, negative inside occupied cells.
+        """
+        res = self.resolution
+        nx, ny = self.values.shape
+        u = (np.asarray(x, dtype=float) - self.x_min) / res
+        v = (np.asarray(y, dtype=float) - self.y_min) / res
+        i = np.clip(np.floor(u), 0, nx - 1).astype(np.intp)
+        j = np.clip(np.floor(v), 0, ny - 1).astype(np.intp)
+        bound = self.values[i, j] - res * np.hypot(u - i - 0.5, v - j - 0.5)
+        # Nothing lies outside the grid, so a point is at least as clear as its distance to the grid
+        outside = res * np.hypot(np.maximum(np.maximum(-u, u - nx), 0), np.maximum(np.maximum(-v, v - ny), 0))
+        return np.maximum(bound, outside)
+
+    def clearance(self, point):
+        """
+        Computes in constant time a lower bound of the distance from a point to the nearest obstacle, the scalar
+        version of lower_bound.
+
+        Parameters:
+            point (tuple): The point, represented as (x, y).
+
+        Returns:
+            float: The clearance bound, negative when the point may be inside an obstacle.
+        """
+        res = self.resolution
+        nx, ny = self.values.shape
+        u = (point[0] - self.x_min) / res
+        v = (point[1] - self.y_min) / res
+        i = min(max(math.floor(u), 0), nx - 1)
+        j = min(max(math.floor(v), 0), ny - 1)
+        bound = float(self.values[i, j]) - res * math.hypot(u - i - 0.5, v - j - 0.5)
+        outside = res * math.hypot(max(-u, u - nx, 0), max(-v, v - ny, 0))
+        return max(bound, outside)
+
+    def cast_rays(self, x, y, cos_a, sin_a, max_distance):
+        """
+        Casts rays by sphere tracing: each ray advances by the clearance bound at its current point, which cannot
+        cross an obstacle, so rays cross open space in a few long steps. Where the bound is shorter than the way out
+        of the current cell, the ray steps to the next cell instead, as a grid traversal would, so it cannot slip
+        diagonally between occupied cells; a ray stops in the first occupied cell it reaches.
+
+        Parameters:
+            x (float or numpy.ndarray): The x-coordinate(s) of the ray origins, broadcastable to cos_a.
+            y (float or numpy.ndarray): The y-coordinate(s) of the ray origins, broadcastable to cos_a.
+            cos_a (numpy.ndarray): The cosine of each ray angle, shape (num_rays,).
+            sin_a (numpy.ndarray): The sine of each ray angle, shape (num_rays,).
+            max_distance (float): The maximum distance reported for a ray.
+
+        Returns:
+            numpy.ndarray: The distance at which each ray reaches an occupied cell, shape (num_rays,).
+        """
+        cos_a = np.asarray(cos_a, dtype=float)
+        sin_a = np.asarray(sin_a, dtype=float)
+        x = np.broadcast_to(np.asarray(x, dtype=float), cos_a.shape).ravel()
+        y = np.broadcast_to(np.asarray(y, dtype=float), cos_a.shape).ravel()
+        cos_r = cos_a.ravel()
+        sin_r = sin_a.ravel()
+        res = self.resolution
+        values = self.values
+        nx, ny = values.shape
+        distances = np.full(cos_r.shape, float(max_distance))
+        rays = np.arange(cos_r.size)
+        t = np.zeros(cos_r.shape)
+        # Distance along each ray across a cell, and which cell side it leaves through
+        with np.errstate(divide='ignore'):
+            step_x = res / np.abs(cos_r)
+            step_y = res / np.abs(sin_r)
+        side_x = (cos_r > 0).astype(float)
+        side_y = (sin_r > 0).astype(float)
+        nudge = 1e-6 * res
+
+        while rays.size:
+            u = (x + t * cos_r - self.x_min) / res
+            v = (y + t * sin_r - self.y_min) / res
+            i = np.floor(u)
+            j = np.floor(v)
+            # The distance to the side of the current cell the ray leaves through
+            leave = np.fmin(np.abs(i + side_x - u) * step_x, np.abs(j + side_y - v) * step_y) + nudge
+            inside = (i >= 0) & (i < nx) & (j >= 0) & (j < ny)
+            np.minimum(np.maximum(i, 0, out=i), nx - 1, out=i)
+            np.minimum(np.maximum(j, 0, out=j), ny - 1, out=j)
+            value = values[i.astype(np.intp), j.astype(np.intp)]
+            hit = inside & (value < 0)
+            distances[rays[hit]] = t[hit]
+
+            # The lower bound of DistanceField.lower_bound, with the cell indices already at hand
+            bound = value - res * np.hypot(u - i - 0.5, v - j - 0.5)
+            outside = res * np.hypot(np.maximum(np.maximum(-u, u - nx), 0), np.maximum(np.maximum(-v, v - ny), 0))
+            t = t + np.maximum(np.maximum(bound, outside), leave)
+            keep = ~hit & (t < max_distance)
+            if not keep.all():
+                rays, t, x, y, cos_r, sin_r = rays[keep], t[keep], x[keep], y[keep], cos_r[keep], sin_r[keep]
+                step_x, step_y, side_x, side_y = step_x[keep], step_y[keep], side_x[keep], side_y[keep]
+
+        return distances.reshape(cos_a.shape)
+
+def distance_to(mask, resolution, max_distance=np.inf):
+    """
+    Computes the Euclidean distance from every cell center to the nearest cell set in a mask (0 inside it), with a
+    separable transform: the distance along the second axis first, by cumulative scans, then the combination along
+    the first axis, row offset by row offset until farther rows can no longer be closer than 'max_distance' or the
+    distances found so far.
+
+    Parameters:
+        mask (numpy.ndarray): A boolean array of shape (nx, ny).
+        resolution (float): The side length of a cell.
+        max_distance (float): Clip distances to this value.
+
+    Returns:
+        numpy.ndarray: The distances, shape (nx, ny); 'max_distance' (or inf) where no cell is set.
+    """
+    nx, ny = mask.shape
+    index = np.arange(ny, dtype=np.float32)
+    previous = np.maximum.accumulate(np.where(mask, index, -np.inf), axis=1)
+    following = np.minimum.accumulate(np.where(mask, index, np.inf)[:, ::-1], axis=1)[:, ::-1]
+    gap = np.minimum(index - previous, following - index)
+    # From a cell center to the edge of a cell 'gap' cells away
+    column = np.maximum(gap - np.float32(0.5), 0) * np.float32(resolution)
+    column_sq = column * column
+
+    squared = column_sq.copy()
+    for offset in range(1, nx):
+        across = np.float32(((offset - 0.5) * resolution) ** 2)
+        # Rows farther away are at least 'across' away, so they cannot improve any distance
+        if across >= min(squared.max(), max_distance ** 2):
+            break
+        np.minimum(squared[offset:], column_sq[:-offset] + across, out=squared[offset:])
+        np.minimum(squared[:-offset], column_sq[offset:] + across, out=squared[:-offset])
+    return np.minimum(np.sqrt(squared), np.float32(max_distance))
@@ -1,29 +1,451 @@
+import numpy as np
+from .SpatialGrid import SpatialGrid
+from .OccupancyGrid import OccupancyGrid
+from .DistanceField import DistanceField
+from .RectangleObstacle import RectangleObstacle
+from .MovingObstacle import MovingObstacle
+
+# Upper bound on the footprints x obstacles pairs tested at once by footprint_collisions
+COLLISION_ELEMENTS = 1 << 16
+# Footprints gathered per spatial-index query by footprint_collisions; groups with too many candidates are split
+COLLISION_GROUP = 64
+# Largest spread of a group of footprints tested together, in spatial index cells
+COLLISION_SPREAD = 4
+
 class Environment:
     """
-    A class representing the environment of a robotic system. This class is responsible for managing 
+    A class representing the environment of a robotic system. This class is responsible for managing
     the obstacles present in the robot's environment.
 
     Attributes:
-        obstacles (list): A list of obstacles present in the environment.
+        obstacles (list): A list of obstacles present in the environment. Obstacles added in bulk are stored as
+            bounds only, and their RectangleObstacle objects are created the first time this list is read.
+        index (SpatialGrid): The spatial index used to find obstacles near a point or inside a region.
+        occupancy_grid (OccupancyGrid): An optional bitmap form of the environment, None until one is built or set.
+        distance_field (DistanceField): An optional signed distance field of the environment, None until one is built
+            or set.
+        version (int): A counter incremented whenever the obstacles change, so callers can cache query results.
+        static_version (int): A counter incremented whenever obstacles are added or removed, or a static obstacle
+            changes, but not when moving obstacles advance: callers cache what depends on the static obstacles only
+            under it, and take the moving ones from get_moving_bounds.
+        _bounds (numpy.ndarray): The bounds (x_min, y_min, x_max, y_max) of every obstacle, in insertion order.
+        _count (int): The number of obstacles stored in '_bounds'.
+        _obstacles (list): The obstacle objects, None for the obstacles added in bulk not created yet.
+        _pending (bool): Whether '_obstacles' holds obstacles not created yet.
+        _moving (numpy.ndarray): The indices of the moving obstacles.
+        _velocity (numpy.ndarray): The velocity (vx, vy) of each moving obstacle, shape (num_moving, 2).
+        _area (numpy.ndarray): The region each moving obstacle bounces within, infinite when it has none, shape
+            (num_moving, 4).
     """
-    def __init__(self):
+    def __init__(self, cell_size=1.0):
         """
         Initializes the Environment with an empty list of obstacles.
+
+        Parameters:
+            cell_size (float): The cell size of the spatial index, defaults to 1 meter.
         """
-        self.obstacles = []
+        self._obstacles = []
+        self._pending = False
+        self._moving = np.zeros(0, dtype=np.intp)
+        self._velocity = np.zeros((0, 2))
+        self._area = np.zeros((0, 4))
+        self.index = SpatialGrid(cell_size)
+        self._bounds = np.empty((16, 4))
+        self._count = 0
+        self.occupancy_grid = None
+        self.distance_field = None
+        self.version = 0
+        self.static_version = 0
 
     def add_obstacle(self, obstacle):
         """
-        Adds an obstacle to the environment.
+        Adds an obstacle to the environment and registers it in the spatial index. A MovingObstacle is then moved by
+        step.
 
         Parameters:
             obstacle (object): An obstacle object to be added to the environment.
         """
-        self.obstacles.append(obstacle)
+        bounds = obstacle.get_bounds()
+        if self._count == len(self._bounds):
+            self._bounds = np.concatenate([self._bounds, np.empty_like(self._bounds)])
+        self._bounds[self._count] = bounds
+        self.index.insert(self._count, bounds)
+        self._count += 1
+        self.version += 1
+        self.static_version += 1
+        self._obstacles.append(obstacle)
+        if isinstance(obstacle, MovingObstacle):
+            area = obstacle.area if obstacle.area is not None else (-np.inf, -np.inf, np.inf, np.inf)
+            self._moving = np.append(self._moving, self._count - 1)
+            self._velocity = np.vstack([self._velocity, obstacle.get_velocity()])
+            self._area = np.vstack([self._area, area])
+        self._update_maps(bounds)
+
+    def add_obstacles(self, bounds, index=None):
+        """
+        Adds rectangular obstacles in bulk from their bounds. They are registered in the static layer of the spatial
+        index and rasterized into the maps with array operations; no Python object is created per obstacle until
+        the 'obstacles' list is read. When the environment is empty, a read-only bounds array is used as is, so a
+        memory-mapped map stays on disk until queried, and a prebuilt index layer can be given; writable arrays are
+        copied, so the caller's array is never the environment's storage.
+
+        Parameters:
+            bounds (numpy.ndarray): The obstacle bounds, shape (num_obstacles, 4) as (x_min, y_min, x_max, y_max).
+            index (tuple): The static layer of these obstacles, as returned by SpatialGrid.get_static for the cell
+                size of this environment's index. Only used when the environment is empty.
+        """
+        bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        if len(bounds) == 0:
+            return
+        first = self._count
+        if first == 0:
+            self._bounds = bounds.copy() if bounds.flags.writeable else bounds
+        else:
+            self._bounds = np.concatenate([self.get_bounds(), bounds])
+        if index is not None and first == 0:
+            self.index.set_static(*index)
+        else:
+            self.index.insert_many(first, bounds)
+        self._count += len(bounds)
+        self.version += 1
+        self.static_version += 1
+        self._obstacles.extend([None] * len(bounds))
+        self._pending = True
+        self._update_maps(bounds)
+
+    def clear(self):
+        """
+        Removes every obstacle. The occupancy grid and the distance field are dropped, since they describe the old
+        obstacles; the version keeps increasing so cached queries are invalidated.
+        """
+        self._obstacles = []
+        self._pending = False
+        self._moving = np.zeros(0, dtype=np.intp)
+        self._velocity = np.zeros((0, 2))
+        self._area = np.zeros((0, 4))
+        self.index = SpatialGrid(self.index.cell_size)
+        self._bounds = np.empty((16, 4))
+        self._count = 0
+        self.occupancy_grid = None
+        self.distance_field = None
+        self.version += 1
+        self.static_version += 1
+
+    def step(self, dt):
+        """
+        Moves the moving obstacles by their velocity over a time step, reflecting those that cross a side of their
+        area back inside. Does nothing when no obstacle moves.
+
+        Parameters:
+            dt (float): The time step, in seconds.
+        """
+        moving = self._moving
+        if len(moving) == 0:
+            return
+        velocity = self._velocity
+        bounds = self._bounds[moving]
+        bounds[:, 0::2] += velocity[:, 0:1] * dt
+        bounds[:, 1::2] += velocity[:, 1:2] * dt
+        area = self._area
+        bounced = np.zeros(len(moving), dtype=bool)
+        for axis in (0, 1):
+            below = area[:, axis] - bounds[:, axis]
+            above = bounds[:, axis + 2] - area[:, axis + 2]
+            shift = np.where(below > 0, 2 * below, np.where(above > 0, -2 * above, 0))
+            bounds[:, axis] += shift
+            bounds[:, axis + 2] += shift
+            speed = np.abs(velocity[:, axis])
+            velocity[:, axis] = np.where(below > 0, speed, np.where(above > 0, -speed, velocity[:, axis]))
+            bounced |= (below > 0) | (above > 0)
+        self.update_obstacles(moving, bounds)
+
+        objects = self._obstacles
+        for k in np.flatnonzero(bounced).tolist():
+            objects[moving[k]].vx, objects[moving[k]].vy = velocity[k].tolist()
+
+    def update_obstacles(self, indices, bounds):
+        """
+        Moves or resizes obstacles added with add_obstacle, keeping the acceleration structures up to date
+        incrementally: only the spatial index cells an obstacle leaves and enters are touched, and only obstacles
+        that changed grid cells are re-rasterized. A distance field, if set, is rebuilt, which costs as much as
+        building it; prefer the occupancy grid or the exact queries in worlds with moving obstacles. Raises a
+        ValueError, before changing anything, if one of the obstacles was added in bulk.
+
+        Parameters:
+            indices (numpy.ndarray): The indices of the obstacles, in insertion order.
+            bounds (numpy.ndarray): Their new bounds, shape (num_obstacles, 4) as (x_min, y_min, x_max, y_max).
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        old = self._bounds[indices]
+        index = self.index
+        for i, before in zip(indices.tolist(), old.tolist()):
+            if not index.is_movable(i, before):
+                raise ValueError(f"Obstacle {i} cannot move: only obstacles added with add_obstacle can.")
+        if not self._bounds.flags.writeable:
+            # Bounds loaded from a map are memory-mapped read-only
+            self._bounds = self._bounds.copy()
+        self._bounds[indices] = bounds
+
+        objects = self._obstacles
+        for i, before, after in zip(indices.tolist(), old.tolist(), bounds.tolist()):
+            index.move(i, before, after)
+            obstacle = objects[i]
+            if obstacle is not None:
+                obstacle.x, obstacle.y = after[0], after[1]
+                obstacle.width, obstacle.height = after[2] - after[0], after[3] - after[1]
+        self.version += 1
+        if not np.isin(indices, self._moving).all():
+            self.static_version += 1
+
+        grid = self.occupancy_grid
+        if grid is not None:
+            changed = (np.column_stack(grid.cell_range(old)) != np.column_stack(grid.cell_range(bounds))).any(axis=1)
+            if changed.any():
+                grid.rasterize(old[changed], -1)
+                grid.rasterize(bounds[changed])
+        if self.distance_field is not None:
+            field = self.distance_field
+            self.distance_field = DistanceField.from_bounds(self.get_bounds(), field.get_region(), field.resolution,
+                                                            field.max_distance)
+
+    def _update_maps(self, bounds):
+        """
+        Internal method to bring the occupancy grid and the distance field up to date with added obstacles.
+
+        Parameters:
+            bounds (numpy.ndarray): The bounds of the added obstacles.
+        """
+        if self.occupancy_grid is not None:
+            self.occupancy_grid.rasterize(bounds)
+        if self.distance_field is not None:
+            field = self.distance_field
+            self.distance_field = DistanceField.from_bounds(self.get_bounds(), field.get_region(), field.resolution,
+                                                            field.max_distance)
+
+    @property
+    def obstacles(self):
+        """
+        Retrieves the obstacle objects. Obstacles added in bulk have none until this list is first read, which
+        creates a RectangleObstacle for each of them; code on the hot path should use get_bounds and query_bounds
+        instead.
+
+        Returns:
+            list: The obstacles, in insertion order.
+        """
+        if self._pending:
+            objects = self._obstacles
+            for i, (x_min, y_min, x_max, y_max) in enumerate(self.get_bounds().tolist()):
+                if objects[i] is None:
+                    objects[i] = RectangleObstacle(x_min, y_min, x_max - x_min, y_max - y_min)
+            self._pending = False
+        return self._obstacles
+
+    def build_occupancy_grid(self, resolution=0.05, region=None):
+        """
+        Rasterizes the obstacles into an occupancy grid. Once built, point queries inside its region are answered
+        from the grid in constant time, and obstacles added later are rasterized into it as well (within its region;
+        point queries outside it use the spatial index).
+
+        Parameters:
+            resolution (float): The side length of a grid cell, defaults to 5 centimeters.
+            region (tuple): The area covered by the grid as (x_min, y_min, x_max, y_max). Defaults to the bounding
+                box of the current obstacles.
+
+        Returns:
+            OccupancyGrid: The built occupancy grid.
+        """
+        bounds = self.get_bounds()
+        if region is None:
+            if len(bounds) == 0:
+                region = (0, 0, resolution, resolution)
+            else:
+                region = (bounds[:, 0].min(), bounds[:, 1].min(), bounds[:, 2].max(), bounds[:, 3].max())
+        grid = OccupancyGrid(*region, resolution=resolution)
+        grid.rasterize(bounds)
+        self.occupancy_grid = grid
+        self.version += 1
+        return grid
+
+    def build_distance_field(self, resolution=0.05, region=None, max_distance=np.inf):
+        """
+        Precomputes the signed distance field of the obstacles. Once built, clearance queries take constant time and
+        the LIDAR can sphere-trace its rays ("sdf" method). Obstacles added later rebuild the field over the same
+        region, so add obstacles in bulk before building it.
+
+        Parameters:
+            resolution (float): The side length of a field cell, defaults to 5 centimeters.
+            region (tuple): The area covered by the field as (x_min, y_min, x_max, y_max). Defaults to the bounding
+                box of the current obstacles; the environment is free outside of it.
+            max_distance (float): Clip distances to this value, which also bounds the precomputation. Rays are
+                traced correctly with any value, but a LIDAR range is a good choice. Defaults to no clipping.
+
+        Returns:
+            DistanceField: The built distance field.
+        """
+        bounds = self.get_bounds()
+        if region is None:
+            if len(bounds) == 0:
+                region = (0, 0, resolution, resolution)
+            else:
+                region = (bounds[:, 0].min(), bounds[:, 1].min(), bounds[:, 2].max(), bounds[:, 3].max())
+        self.distance_field = DistanceField.from_bounds(bounds, region, resolution, max_distance)
+        self.version += 1
+        return self.distance_field
+
+    def set_distance_field(self, field):
+        """
+        Sets the distance field of the environment, for example one computed from a scanned occupancy grid with
+        DistanceField.from_occupancy_grid.
+
+        Parameters:
+            field (DistanceField): The distance field to use, or None to go back to exact obstacle queries.
+        """
+        self.distance_field = field
+        self.version += 1
+
+    def set_occupancy_grid(self, grid):
+        """
+        Sets the occupancy grid of the environment, for example one loaded from a map built from real scans.
+
+        Parameters:
+            grid (OccupancyGrid): The occupancy grid to use, or None to go back to exact obstacle queries.
+        """
+        self.occupancy_grid = grid
+        self.version += 1
+
+    def get_bounds(self):
+        """
+        Retrieves the bounds of all obstacles in the environment.
+
+        Returns:
+            numpy.ndarray: An array of shape (num_obstacles, 4) with rows (x_min, y_min, x_max, y_max).
+        """
+        return self._bounds[:self._count]
+
+    def get_moving_bounds(self):
+        """
+        Retrieves the bounds of the moving obstacles, in the order they were added.
+
+        Returns:
+            numpy.ndarray: An array of shape (num_moving, 4) with rows (x_min, y_min, x_max, y_max).
+        """
+        if len(self._moving) == 0:
+            return self._bounds[:0]
+        return self._bounds[self._moving]
+
+    def get_static_bounds(self):
+        """
+        Retrieves the bounds of the obstacles that do not move.
+
+        Returns:
+            numpy.ndarray: An array of shape (num_static, 4) with rows (x_min, y_min, x_max, y_max).
+        """
+        return np.delete(self.get_bounds(), self._moving, axis=0)
+
+    def query_bounds(self, x_min, y_min, x_max, y_max):
+        """
+        Retrieves the bounds of the obstacles that may overlap a region, using the spatial index.
+
+        Parameters:
+            x_min (float): The minimum x-coordinate of the region.
+            y_min (float): The minimum y-coordinate of the region.
+            x_max (float): The maximum x-coordinate of the region.
+            y_max (float): The maximum y-coordinate of the region.
+
+        Returns:
+            numpy.ndarray: An array of shape (num_candidates, 4) with the candidate obstacle bounds.
+        """
+        return self._bounds[self.index.query_box(x_min, y_min, x_max, y_max)]
+
+    def query_static_bounds(self, x_min, y_min, x_max, y_max):
+        """
+        Retrieves the bounds of the static obstacles that may overlap a region, using the spatial index. The result
+        stays valid until static_version changes.
+
+        Parameters:
+            x_min (float): The minimum x-coordinate of the region.
+            y_min (float): The minimum y-coordinate of the region.
+            x_max (float): The maximum x-coordinate of the region.
+            y_max (float): The maximum y-coordinate of the region.
+
+        Returns:
+            numpy.ndarray: An array of shape (num_candidates, 4) with the candidate obstacle bounds.
+        """
+        indices = self.index.query_box(x_min, y_min, x_max, y_max)
+        if len(self._moving):
+            indices = indices[~np.isin(indices, self._moving)]
+        return self._bounds[indices]
+
+    def clearance(self, point, max_distance=np.inf):
+        """
+        Computes the distance from a point to the nearest obstacle. With a finite 'max_distance', only the obstacles
+        the spatial index finds within that distance are checked. When a distance field is set, the answer is read
+        from it in constant time instead: a lower bound at most one and a half field cell diagonals below the exact
+        distance.
+
+        Parameters:
+            point (tuple): The point to be checked, represented as (x, y).
+            max_distance (float): The largest distance of interest; farther obstacles are ignored.
+
+        Returns:
+            float: The distance to the nearest obstacle, 0 if the point is inside one, or 'max_distance' if no
+                obstacle is closer.
+        """
+        if self.distance_field is not None:
+            return min(max(self.distance_field.clearance(point), 0.0), max_distance)
+        x, y = point
+        if np.isfinite(max_distance):
+            bounds = self.query_bounds(x - max_distance, y - max_distance, x + max_distance, y + max_distance)
+        else:
+            bounds = self.get_bounds()
+        if len(bounds) == 0:
+            return max_distance
+        dx = np.maximum(np.maximum(bounds[:, 0] - x, x - bounds[:, 2]), 0)
+        dy = np.maximum(np.maximum(bounds[:, 1] - y, y - bounds[:, 3]), 0)
+        return min(float(np.hypot(dx, dy).min()), max_distance)
+
+    def footprint_collisions(self, poses, width, height):
+        """
+        Checks a batch of robot footprints, rectangles centered on each pose and rotated by its heading, against the
+        obstacles. Consecutive poses are grouped, each group tested at once against the obstacles the spatial index
+        finds around it; a group spread over more than a few index cells or with too many candidates is split, so
+        scattered poses stay cheap.
+
+        Parameters:
+            poses (numpy.ndarray): The poses (x, y, theta), shape (num_poses, 3).
+            width (float): The footprint length along the heading.
+            height (float): The footprint length across the heading.
+
+        Returns:
+            numpy.ndarray: Whether each footprint overlaps an obstacle, shape (num_poses,).
+        """
+        poses = np.asarray(poses, dtype=float).reshape(-1, 3)
+        radius = 0.5 * np.hypot(width, height)
+        collisions = np.zeros(len(poses), dtype=bool)
+        groups = [(start, min(start + COLLISION_GROUP, len(poses))) for start in range(0, len(poses), COLLISION_GROUP)]
+        spread = COLLISION_SPREAD * self.index.cell_size
+        while groups:
+            start, stop = groups.pop()
+            x = poses[start:stop, 0]
+            y = poses[start:stop, 1]
+            x_min, y_min, x_max, y_max = x.min(), y.min(), x.max(), y.max()
+            if stop - start > 1 and x_max - x_min + y_max - y_min > spread:
+                bounds = None
+            else:
+                bounds = self.query_bounds(x_min - radius, y_min - radius, x_max + radius, y_max + radius)
+            if bounds is None or len(bounds) * (stop - start) > COLLISION_ELEMENTS and stop - start > 1:
+                middle = (start + stop) // 2
+                groups += [(start, middle), (middle, stop)]
+            elif len(bounds):
+                collisions[start:stop] = footprint_overlaps(poses[start:stop], width, height, bounds).any(axis=1)
+        return collisions
 
     def point_in_obstacle(self, point):
         """
-        Checks if a given point is within any of the obstacles in the environment.
+        Checks if a given point is within any of the obstacles in the environment. When an occupancy grid is set and
+        covers the point, the answer is read from the grid in constant time; outside the grid's region, where
+        obstacles added or moved later are clipped away, the spatial index is queried.
 
         Parameters:
             point (tuple): The point to be checked, represented as (x, y).
@@ -31,7 +453,48 @@ class Environment:
         Returns:
             bool: Returns True if the point is within any obstacle, False otherwise.
         """
-        for obstacle in self.obstacles:
-            if obstacle.contains_point(point):
+        grid = self.occupancy_grid
+        if grid is not None and grid.contains(point):
+            return grid.point_in_obstacle(point)
+        x, y = point
+        bounds = self._bounds
+        for i in self.index.query_point(point):
+            x_min, y_min, x_max, y_max = bounds[i]
+            if x_min < x < x_max and y_min < y < y_max:
                 return True
         return False
+
+def footprint_overlaps(poses, width, height, bounds):
+    """
+    Tests oriented rectangles against axis-aligned boxes with the separating axis theorem, for every pair at once:
+    two rectangles overlap unless their projections are disjoint on one of the four axes of their sides. Touching
+    is not an overlap, as for point_in_obstacle.
+
+    Parameters:
+        poses (numpy.ndarray): The rectangle centers and headings (x, y, theta), shape (num_poses, 3).
+        width (float): The rectangle length along the heading.
+        height (float): The rectangle length across the heading.
+        bounds (numpy.ndarray): The box bounds, shape (num_boxes, 4) as (x_min, y_min, x_max, y_max).
+
+    Returns:
+        numpy.ndarray: Whether each rectangle overlaps each box, shape (num_poses, num_boxes).
+    """
+    poses = np.asarray(poses, dtype=float).reshape(-1, 3)
+    bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+    half_width = width / 2
+    half_height = height / 2
+    cos = np.cos(poses[:, 2:3])
+    sin = np.sin(poses[:, 2:3])
+    abs_cos = np.abs(cos)
+    abs_sin = np.abs(sin)
+    box_x = (bounds[:, 2] - bounds[:, 0]) / 2
+    box_y = (bounds[:, 3] - bounds[:, 1]) / 2
+    dx = (bounds[:, 0] + bounds[:, 2]) / 2 - poses[:, 0:1]
+    dy = (bounds[:, 1] + bounds[:, 3]) / 2 - poses[:, 1:2]
+
+    # The box axes, then the rectangle's own axes
+    overlap = np.abs(dx) < box_x + half_width * abs_cos + half_height * abs_sin
+    overlap &= np.abs(dy) < box_y + half_width * abs_sin + half_height * abs_cos
+    overlap &= np.abs(dx * cos + dy * sin) < half_width + box_x * abs_cos + box_y * abs_sin
+    overlap &= np.abs(dy * cos - dx * sin) < half_height + box_x * abs_sin + box_y * abs_cos
+    return overlap
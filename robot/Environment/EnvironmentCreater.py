@@ -1,4 +1,6 @@
 from .RectangleObstacle import RectangleObstacle
+from .MapFile import MapFile
+from .WorldGenerator import WorldGenerator
 
 class EnvironmentCreator:
     """
@@ -34,6 +36,34 @@ class EnvironmentCreator:
         self.environment.add_obstacle(rectangle)
         return rectangle
 
+    def load_map(self, path):
+        """
+        Adds the obstacles of a map file to the environment in one call, along with its occupancy grid if it has
+        one and the environment was empty. The map is memory-mapped, so large maps load in milliseconds.
+
+        Parameters:
+            path (str): The map file, written by save_map.
+        """
+        MapFile(path).load(self.environment)
+
+    def setup_generated_environment(self, layout, size, density=None, seed=0, keep_clear=(), **params):
+        """
+        Replaces the obstacles of the environment with a procedural world, added in bulk.
+
+        Parameters:
+            layout (str): The WorldGenerator layout: "clutter", "maze" or "warehouse".
+            size (float): The side length of the world, centered on the origin.
+            density (float): The layout's density, or None for its default.
+            seed (int): The random seed, defaults to 0.
+            keep_clear (list): Points, e.g. the start pose and the goals, kept free of obstacles.
+            **params: Further parameters of the layout, see WorldGenerator.
+
+        Returns:
+            numpy.ndarray: The bounds of the generated obstacles.
+        """
+        self.environment.clear()
+        return WorldGenerator(seed).populate(self.environment, layout, size, density, keep_clear, **params)
+
     def setup_default_environment(self):
         """
         Sets up a default environment with a predefined set of rectangular obstacles.
@@ -0,0 +1,143 @@
+import json
+import struct
+import numpy as np
+from .Environment import Environment
+from .OccupancyGrid import OccupancyGrid
+from .SpatialGrid import SpatialGrid
+
+# File layout: MAGIC, the header length as a little-endian uint32, the JSON header padded with spaces, then each
+# array section starting on a SECTION_ALIGNMENT boundary. The header gives the offset, type and shape of each
+# section, so the arrays are read back with a single memory map each.
+MAGIC = b"RLMAP001"
+SECTION_ALIGNMENT = 64
+
+def save_map(path, environment):
+    """
+    Writes an environment to a map file: the obstacle bounds as one float64 array, the static spatial-index layer
+    built over them for the environment's cell size, and the occupancy grid bitmap when the environment has one.
+
+    Parameters:
+        path (str): The map file to create.
+        environment (Environment): The environment to save.
+    """
+    bounds = environment.get_bounds()
+    index = SpatialGrid(environment.index.cell_size)
+    index.insert_many(0, bounds)
+    keys, offsets, indices = index.get_static()
+    sections = [
+        ("bounds", np.ascontiguousarray(bounds, dtype="<f8")),
+        ("index_keys", keys.astype("<i8")),
+        ("index_offsets", offsets.astype("<i8")),
+        ("index_indices", indices.astype("<i8")),
+    ]
+    header = {"cell_size": index.cell_size, "grid": None, "sections": {}}
+    grid = environment.occupancy_grid
+    if grid is not None:
+        sections.append(("occupied", np.ascontiguousarray(grid.get_occupied(), dtype="u1")))
+        header["grid"] = {"resolution": grid.resolution, "origin": [grid.x_min, grid.y_min]}
+
+    # The offsets depend on the header length, which depends on the offsets: reserve room for them first
+    for name, array in sections:
+        header["sections"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": 0}
+    length = len(json.dumps(header)) + 32 * len(sections)
+    offset = len(MAGIC) + 4 + length
+    for name, array in sections:
+        offset += -offset % SECTION_ALIGNMENT
+        header["sections"][name]["offset"] = offset
+        offset += array.nbytes
+    text = json.dumps(header).encode()
+    text += b" " * (length - len(text))
+
+    with open(path, "wb") as file:
+        file.write(MAGIC + struct.pack("<I", length) + text)
+        for name, array in sections:
+            file.write(b"\0" * (header["sections"][name]["offset"] - file.tell()))
+            array.tofile(file)
+
+class MapFile:
+    """
+    Reads a map file written by save_map. The arrays are memory-mapped by default, so opening a map is immediate
+    whatever its size, and loading it into an environment creates no Python object per obstacle.
+
+    Attributes:
+        path (str): The map file.
+        header (dict): The header of the map.
+        bounds (numpy.ndarray): The obstacle bounds, shape (num_obstacles, 4) as (x_min, y_min, x_max, y_max).
+        index (tuple): The static spatial-index layer over the bounds, as (keys, offsets, indices).
+        occupied (numpy.ndarray): The occupancy bitmap, shape (nx, ny), or None when the map has no grid.
+    """
+    def __init__(self, path, mmap=True):
+        """
+        Opens a map.
+
+        Parameters:
+            path (str): The map file.
+            mmap (bool): Whether to memory-map the arrays, defaults to True; with False they are read into memory.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a map file")
+            length, = struct.unpack("<I", file.read(4))
+            self.header = json.loads(file.read(length))
+        sections = self.header["sections"]
+        self.bounds = self._read(sections["bounds"], mmap)
+        self.index = tuple(self._read(sections[name], mmap)
+                           for name in ("index_keys", "index_offsets", "index_indices"))
+        self.occupied = self._read(sections["occupied"], mmap) if "occupied" in sections else None
+
+    def _read(self, section, mmap):
+        """
+        Internal method to read an array section.
+
+        Parameters:
+            section (dict): The section's entry in the header.
+            mmap (bool): Whether to memory-map the array.
+
+        Returns:
+            numpy.ndarray: The array.
+        """
+        dtype = np.dtype(section["dtype"])
+        shape = tuple(section["shape"])
+        if not mmap or 0 in shape:
+            with open(self.path, "rb") as file:
+                file.seek(section["offset"])
+                return np.fromfile(file, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+        # A plain array view of the map: indexing a numpy.memmap subclass is several times slower
+        return np.asarray(np.memmap(self.path, dtype=dtype, mode="r", offset=section["offset"], shape=shape))
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def get_occupancy_grid(self):
+        """
+        Builds the occupancy grid stored in the map.
+
+        Returns:
+            OccupancyGrid: The grid, or None when the map has none.
+        """
+        if self.occupied is None:
+            return None
+        grid = self.header["grid"]
+        return OccupancyGrid.from_array(self.occupied, grid["resolution"], grid["origin"])
+
+    def load(self, environment=None):
+        """
+        Loads the map into an environment in one call: the obstacles are added in bulk with the stored index layer
+        when the cell sizes match. The stored occupancy grid, if any, is set when the environment was empty; an
+        environment with obstacles keeps its own grid, into which the map's obstacles are rasterized.
+
+        Parameters:
+            environment (Environment): The environment receiving the map, defaults to a new one.
+
+        Returns:
+            Environment: The environment.
+        """
+        if environment is None:
+            environment = Environment()
+        empty = len(environment.get_bounds()) == 0
+        index = self.index if environment.index.cell_size == self.header["cell_size"] else None
+        environment.add_obstacles(self.bounds, index)
+        if self.occupied is not None and empty:
+            environment.set_occupancy_grid(self.get_occupancy_grid())
+        return environment
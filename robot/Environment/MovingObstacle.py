@@ -0,0 +1,39 @@
+from .RectangleObstacle import RectangleObstacle
+
+class MovingObstacle(RectangleObstacle):
+    """
+    A rectangular obstacle moving at a constant velocity, such as a person or another cart. Once added to an
+    Environment, it is moved by Environment.step, which keeps the spatial index and the maps up to date; its fields
+    must not be changed directly. Within an optional area it bounces off the area's sides.
+
+    Attributes:
+        vx (float): The velocity along x, in meters per second.
+        vy (float): The velocity along y, in meters per second.
+        area (tuple): The region the obstacle stays in as (x_min, y_min, x_max, y_max), or None to move freely.
+    """
+    def __init__(self, x, y, width, height, vx=0.0, vy=0.0, area=None):
+        """
+        Initializes a MovingObstacle.
+
+        Parameters:
+            x (float): The x-coordinate of the bottom-left corner of the rectangle.
+            y (float): The y-coordinate of the bottom-left corner of the rectangle.
+            width (float): The width of the rectangle.
+            height (float): The height of the rectangle.
+            vx (float): The velocity along x, defaults to 0.
+            vy (float): The velocity along y, defaults to 0.
+            area (tuple): The region to bounce within as (x_min, y_min, x_max, y_max), defaults to None.
+        """
+        super().__init__(x, y, width, height)
+        self.vx = vx
+        self.vy = vy
+        self.area = area
+
+    def get_velocity(self):
+        """
+        Retrieves the velocity of the obstacle.
+
+        Returns:
+            tuple: The velocity represented as (vx, vy).
+        """
+        return (self.vx, self.vy)
@@ -0,0 +1,212 @@
+import numpy as np
+
+# Cost of stamping one box in rasterize, in grid cells accumulated by the difference array in the same time
+STAMP_OVERHEAD = 256
+
+class OccupancyGrid:
+    """
+    A bitmap representation of the environment at a fixed resolution. Cell [i, j] covers the square
+    [x_min + i * resolution, x_min + (i + 1) * resolution) x [y_min + j * resolution, y_min + (j + 1) * resolution),
+    so the first array axis runs along x and the second along y. Each cell stores how many obstacles overlap it,
+    which lets obstacles be added and removed independently.
+
+    Attributes:
+        resolution (float): The side length of a cell.
+        x_min (float): The x-coordinate of the grid's lower-left corner.
+        y_min (float): The y-coordinate of the grid's lower-left corner.
+        counts (numpy.ndarray): The number of obstacles overlapping each cell, shape (nx, ny).
+    """
+    def __init__(self, x_min, y_min, x_max, y_max, resolution=0.05):
+        """
+        Initializes an empty OccupancyGrid covering a rectangular region.
+
+        Parameters:
+            x_min (float): The minimum x-coordinate of the region.
+            y_min (float): The minimum y-coordinate of the region.
+            x_max (float): The maximum x-coordinate of the region.
+            y_max (float): The maximum y-coordinate of the region.
+            resolution (float): The side length of a cell, defaults to 5 centimeters.
+        """
+        self.resolution = resolution
+        self.x_min = x_min
+        self.y_min = y_min
+        nx = max(int(np.ceil((x_max - x_min) / resolution)), 1)
+        ny = max(int(np.ceil((y_max - y_min) / resolution)), 1)
+        self.counts = np.zeros((nx, ny), dtype=np.uint16)
+
+    @classmethod
+    def from_array(cls, occupied, resolution, origin=(0, 0)):
+        """
+        Creates an OccupancyGrid from an existing bitmap, such as a map produced from real scans.
+
+        Parameters:
+            occupied (numpy.ndarray): A boolean array of shape (nx, ny), True where a cell is occupied.
+            resolution (float): The side length of a cell.
+            origin (tuple): The (x, y) coordinates of the lower-left corner of cell [0, 0].
+
+        Returns:
+            OccupancyGrid: The grid holding the given bitmap.
+        """
+        occupied = np.asarray(occupied, dtype=bool)
+        grid = cls(origin[0], origin[1], origin[0] + occupied.shape[0] * resolution,
+                   origin[1] + occupied.shape[1] * resolution, resolution)
+        grid.counts = occupied.astype(np.uint16)
+        return grid
+
+    def get_occupied(self):
+        """
+        Retrieves the occupancy bitmap.
+
+        Returns:
+            numpy.ndarray: A boolean array of shape (nx, ny), True where a cell is occupied.
+        """
+        return self.counts > 0
+
+    def cell_range(self, bounds):
+        """
+        Computes the ranges of cells overlapping the interior of each box, clipped to the grid.
+
+        Parameters:
+            bounds (numpy.ndarray): Box bounds of shape (num_boxes, 4) as (x_min, y_min, x_max, y_max).
+
+        Returns:
+            tuple: Four integer arrays (i_start, j_start, i_stop, j_stop), with exclusive stop indices.
+        """
+        bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        nx, ny = self.counts.shape
+        res = self.resolution
+        i_start = np.clip(np.floor((bounds[:, 0] - self.x_min) / res), 0, nx).astype(np.intp)
+        j_start = np.clip(np.floor((bounds[:, 1] - self.y_min) / res), 0, ny).astype(np.intp)
+        i_stop = np.clip(np.ceil((bounds[:, 2] - self.x_min) / res), 0, nx).astype(np.intp)
+        j_stop = np.clip(np.ceil((bounds[:, 3] - self.y_min) / res), 0, ny).astype(np.intp)
+        return i_start, j_start, i_stop, j_stop
+
+    def rasterize(self, bounds, weight=1):
+        """
+        Adds boxes to the grid, incrementing the count of every cell they overlap. Many boxes are accumulated at once
+        through a 2D difference array, so the cost is linear in the number of boxes plus the number of cells; boxes
+        few enough for their total area to be small next to the grid, such as moved obstacles, are stamped directly.
+
+        Parameters:
+            bounds (numpy.ndarray): Box bounds of shape (num_boxes, 4) as (x_min, y_min, x_max, y_max).
+            weight (int): The amount added to each overlapped cell; use -1 to remove previously added boxes.
+        """
+        i_start, j_start, i_stop, j_stop = self.cell_range(bounds)
+        keep = (i_start < i_stop) & (j_start < j_stop)
+        if not keep.any():
+            return
+        i_start, j_start, i_stop, j_stop = i_start[keep], j_start[keep], i_stop[keep], j_stop[keep]
+
+        area = int(((i_stop - i_start) * (j_stop - j_start)).sum())
+        if len(i_start) <= 32 or STAMP_OVERHEAD * len(i_start) + area < self.counts.size:
+            # A handful of boxes is cheaper to stamp directly than to accumulate over the whole grid
+            counts = self.counts
+            for i0, j0, i1, j1 in zip(i_start.tolist(), j_start.tolist(), i_stop.tolist(), j_stop.tolist()):
+                if weight > 0:
+                    counts[i0:i1, j0:j1] += weight
+                else:
+                    counts[i0:i1, j0:j1] -= -weight
+            return
+
+        nx, ny = self.counts.shape
+        diff = np.zeros((nx + 1, ny + 1), dtype=np.int32)
+        np.add.at(diff, (i_start, j_start), weight)
+        np.add.at(diff, (i_stop, j_start), -weight)
+        np.add.at(diff, (i_start, j_stop), -weight)
+        np.add.at(diff, (i_stop, j_stop), weight)
+        delta = diff.cumsum(axis=0).cumsum(axis=1)[:nx, :ny]
+        self.counts = (self.counts + delta).astype(np.uint16)
+
+    def contains(self, point):
+        """
+        Checks if a point lies inside the region covered by the grid.
+
+        Parameters:
+            point (tuple): The point to be checked, represented as (x, y).
+
+        Returns:
+            bool: Returns True if the point lies in a cell of the grid, False otherwise.
+        """
+        nx, ny = self.counts.shape
+        return (0 <= point[0] - self.x_min < nx * self.resolution
+                and 0 <= point[1] - self.y_min < ny * self.resolution)
+
+    def point_in_obstacle(self, point):
+        """
+        Checks in constant time if a point lies in an occupied cell. Points outside the grid are free.
+
+        Parameters:
+            point (tuple): The point to be checked, represented as (x, y).
+
+        Returns:
+            bool: Returns True if the point lies in an occupied cell, False otherwise.
+        """
+        i = int(np.floor((point[0] - self.x_min) / self.resolution))
+        j = int(np.floor((point[1] - self.y_min) / self.resolution))
+        nx, ny = self.counts.shape
+        return 0 <= i < nx and 0 <= j < ny and self.counts[i, j] > 0
+
+    def cast_rays(self, x, y, cos_a, sin_a, max_distance):
+        """
+        Casts rays through the grid with a vectorized DDA (Amanatides-Woo) traversal, visiting every cell each ray
+        crosses in order and stopping at the first occupied one. Cells outside the grid are free, so a ray is dropped
+        once it has left the grid, which also bounds the traversal when 'max_distance' is infinite.
+
+        Parameters:
+            x (float or numpy.ndarray): The x-coordinate(s) of the ray origins, broadcastable to cos_a.
+            y (float or numpy.ndarray): The y-coordinate(s) of the ray origins, broadcastable to cos_a.
+            cos_a (numpy.ndarray): The cosine of each ray angle, shape (num_rays,).
+            sin_a (numpy.ndarray): The sine of each ray angle, shape (num_rays,).
+            max_distance (float): The maximum distance reported for a ray.
+
+        Returns:
+            numpy.ndarray: The distance at which each ray enters an occupied cell, shape (num_rays,).
+        """
+        cos_a = np.asarray(cos_a, dtype=float)
+        sin_a = np.asarray(sin_a, dtype=float)
+        x = np.broadcast_to(np.asarray(x, dtype=float), cos_a.shape)
+        y = np.broadcast_to(np.asarray(y, dtype=float), cos_a.shape)
+        res = self.resolution
+        counts = self.counts
+        nx, ny = counts.shape
+        distances = np.full(cos_a.shape, float(max_distance))
+
+        i = np.floor((x - self.x_min) / res).astype(np.intp)
+        j = np.floor((y - self.y_min) / res).astype(np.intp)
+        step_i = np.where(cos_a > 0, 1, -1)
+        step_j = np.where(sin_a > 0, 1, -1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta_i = np.abs(res / cos_a)
+            delta_j = np.abs(res / sin_a)
+            next_i = np.where(cos_a != 0,
+                              (self.x_min + (i + (step_i > 0)) * res - x) / cos_a, np.inf)
+            next_j = np.where(sin_a != 0,
+                              (self.y_min + (j + (step_j > 0)) * res - y) / sin_a, np.inf)
+        t = np.zeros(cos_a.shape)
+        rays = np.arange(cos_a.size)
+
+        while rays.size:
+            inside = (i >= 0) & (i < nx) & (j >= 0) & (j < ny)
+            hit = np.zeros(rays.size, dtype=bool)
+            hit[inside] = counts[i[inside], j[inside]] > 0
+            distances[rays[hit]] = t[hit]
+
+            # Advance every remaining ray across the nearest cell boundary
+            along_i = next_i < next_j
+            t = np.where(along_i, next_i, next_j)
+            i = i + np.where(along_i, step_i, 0)
+            j = j + np.where(along_i, 0, step_j)
+            next_i = next_i + np.where(along_i, delta_i, 0)
+            next_j = next_j + np.where(along_i, 0, delta_j)
+
+            # A ray outside the grid and heading away from it can no longer hit anything
+            leaving = (((i < 0) & (step_i < 0)) | ((i >= nx) & (step_i > 0))
+                       | ((j < 0) & (step_j < 0)) | ((j >= ny) & (step_j > 0)))
+            keep = ~hit & ~leaving & (t < max_distance)
+            if not keep.all():
+                rays, t, i, j = rays[keep], t[keep], i[keep], j[keep]
+                next_i, next_j = next_i[keep], next_j[keep]
+                step_i, step_j = step_i[keep], step_j[keep]
+                delta_i, delta_j = delta_i[keep], delta_j[keep]
+
+        return distances
@@ -1,5 +1,3 @@
-import matplotlib.patches as patches
-
 class RectangleObstacle:
     """
     A class representing a rectangular obstacle in a robotic environment. It provides functionalities to check if a point 
@@ -38,7 +36,16 @@ class RectangleObstacle:
         """
         x, y = point
         return self.x < x < self.x + self.width and self.y < y < self.y + self.height
-    
+
+    def get_bounds(self):
+        """
+        Retrieves the axis-aligned bounds of the rectangle.
+
+        Returns:
+            tuple: The bounds represented as (x_min, y_min, x_max, y_max).
+        """
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
     def draw(self, ax):
         """
         Draws the rectangle on a given matplotlib axis.
@@ -46,6 +53,9 @@ class RectangleObstacle:
         Parameters:
             ax (matplotlib.axes.Axes): The matplotlib axis on which the rectangle will be drawn.
         """
+        # Imported here so obstacles can be created without loading matplotlib
+        import matplotlib.patches as patches
+
         # Defining vertices of the polygon (rectangle)
         vertices = [(self.x, self.y), (self.x + self.width, self.y), 
                     (self.x + self.width, self.y + self.height), (self.x, self.y + self.height)]
@@ -0,0 +1,245 @@
+from math import floor
+import numpy as np
+
+class SpatialGrid:
+    """
+    A uniform grid spatial index over axis-aligned obstacle bounds. Each obstacle index is registered in every cell
+    its bounds overlap, so point and region queries only visit obstacles stored in nearby cells.
+
+    Obstacles inserted one at a time go to a dictionary of lists. Obstacles inserted in bulk go to a static layer in
+    compressed sparse row form, built with array operations: the occupied cells as sorted integer keys, and the
+    obstacle indices of each cell stored contiguously. Queries look in both.
+
+    Attributes:
+        cell_size (float): The side length of a grid cell.
+        _cells (dict): A mapping from cell coordinates (i, j) to the list of obstacle indices overlapping that cell.
+        _keys (numpy.ndarray): The sorted keys of the cells in the static layer, i * 2**32 + j.
+        _offsets (numpy.ndarray): The start of each static cell's indices in '_indices', plus the total at the end.
+        _indices (numpy.ndarray): The obstacle indices of the static cells, cell after cell.
+    """
+    def __init__(self, cell_size=1.0):
+        """
+        Initializes an empty SpatialGrid.
+
+        Parameters:
+            cell_size (float): The side length of a grid cell, defaults to 1 meter.
+        """
+        self.cell_size = cell_size
+        self._cells = {}
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.intp)
+        self._indices = np.zeros(0, dtype=np.intp)
+
+    def cell_range(self, x_min, y_min, x_max, y_max):
+        """
+        Computes the inclusive range of cell coordinates covered by a box.
+
+        Parameters:
+            x_min (float): The minimum x-coordinate of the box.
+            y_min (float): The minimum y-coordinate of the box.
+            x_max (float): The maximum x-coordinate of the box.
+            y_max (float): The maximum y-coordinate of the box.
+
+        Returns:
+            tuple: The cell range represented as (i_min, j_min, i_max, j_max).
+        """
+        size = self.cell_size
+        return (floor(x_min / size), floor(y_min / size), floor(x_max / size), floor(y_max / size))
+
+    def insert(self, index, bounds):
+        """
+        Registers an obstacle in every cell overlapped by its bounds.
+
+        Parameters:
+            index (int): The index of the obstacle in the environment.
+            bounds (tuple): The obstacle bounds represented as (x_min, y_min, x_max, y_max).
+        """
+        i_min, j_min, i_max, j_max = self.cell_range(*bounds)
+        cells = self._cells
+        for i in range(i_min, i_max + 1):
+            for j in range(j_min, j_max + 1):
+                cells.setdefault((i, j), []).append(index)
+
+    def is_movable(self, index, bounds):
+        """
+        Checks whether an obstacle can be moved with move, that is whether it was inserted one at a time rather than
+        in bulk into the static layer.
+
+        Parameters:
+            index (int): The index of the obstacle in the environment.
+            bounds (tuple): The bounds the obstacle was registered with, as (x_min, y_min, x_max, y_max).
+
+        Returns:
+            bool: True if the obstacle can be moved.
+        """
+        i_min, j_min, _, _ = self.cell_range(*bounds)
+        return index in self._cells.get((i_min, j_min), ())
+
+    def move(self, index, old_bounds, new_bounds):
+        """
+        Updates the cells of an obstacle inserted one at a time after its bounds changed. Only the cells it leaves
+        and enters are touched, so an obstacle moving within its cells costs nothing.
+
+        Parameters:
+            index (int): The index of the obstacle in the environment.
+            old_bounds (tuple): The bounds the obstacle was registered with, as (x_min, y_min, x_max, y_max).
+            new_bounds (tuple): The new bounds of the obstacle.
+
+        Returns:
+            bool: Whether the obstacle changed cells.
+        """
+        old = self.cell_range(*old_bounds)
+        new = self.cell_range(*new_bounds)
+        if old == new:
+            return False
+        cells = self._cells
+        for i in range(old[0], old[2] + 1):
+            for j in range(old[1], old[3] + 1):
+                if new[0] <= i <= new[2] and new[1] <= j <= new[3]:
+                    continue
+                indices = cells.get((i, j))
+                if indices is None or index not in indices:
+                    raise ValueError(f"Obstacle {index} cannot move: only obstacles inserted one at a time can.")
+                indices.remove(index)
+                if not indices:
+                    del cells[(i, j)]
+        for i in range(new[0], new[2] + 1):
+            for j in range(new[1], new[3] + 1):
+                if not (old[0] <= i <= old[2] and old[1] <= j <= old[3]):
+                    cells.setdefault((i, j), []).append(index)
+        return True
+
+    def insert_many(self, first, bounds):
+        """
+        Registers a batch of obstacles in the static layer, without a Python loop over obstacles or cells.
+
+        Parameters:
+            first (int): The index of the first obstacle of the batch; the others follow consecutively.
+            bounds (numpy.ndarray): The obstacle bounds, shape (num_obstacles, 4) as (x_min, y_min, x_max, y_max).
+        """
+        bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        if len(bounds) == 0:
+            return
+        cells = np.floor(bounds / self.cell_size).astype(np.int64)
+        rows = cells[:, 3] - cells[:, 1] + 1
+        sizes = (cells[:, 2] - cells[:, 0] + 1) * rows
+
+        # Expand every obstacle into the cells it covers: position k of its block is cell (k // rows, k % rows)
+        owner = np.repeat(np.arange(len(bounds)), sizes)
+        local = np.arange(len(owner)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        i = cells[owner, 0] + local // rows[owner]
+        j = cells[owner, 1] + local % rows[owner]
+        keys = np.concatenate([np.repeat(self._keys, np.diff(self._offsets)), i * 2 ** 32 + j])
+        indices = np.concatenate([self._indices, first + owner])
+
+        # A stable sort keeps the indices of each cell in insertion order
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        starts = np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))
+        self._keys = keys[starts]
+        self._offsets = np.append(starts, len(keys))
+        self._indices = indices[order]
+
+    def get_static(self):
+        """
+        Retrieves the static layer, e.g. to store it next to the obstacle bounds.
+
+        Returns:
+            tuple: The arrays (keys, offsets, indices) of the layer.
+        """
+        return self._keys, self._offsets, self._indices
+
+    def set_static(self, keys, offsets, indices):
+        """
+        Replaces the static layer with one built beforehand by insert_many for the same cell size.
+
+        Parameters:
+            keys (numpy.ndarray): The sorted cell keys.
+            offsets (numpy.ndarray): The start of each cell's indices, plus the total at the end.
+            indices (numpy.ndarray): The obstacle indices, cell after cell.
+        """
+        self._keys = keys
+        self._offsets = offsets
+        self._indices = indices
+
+    def _static_rows(self, i_min, j_min, i_max, j_max):
+        """
+        Internal method to find the static layer's indices in a range of cells. The cells of one row i are
+        contiguous in key order, so each row is a single slice of '_indices'.
+
+        Parameters:
+            i_min (int): The first cell column.
+            j_min (int): The first cell row.
+            i_max (int): The last cell column, inclusive.
+            j_max (int): The last cell row, inclusive.
+
+        Returns:
+            list: Arrays of obstacle indices, one per row with any.
+        """
+        keys = self._keys
+        if len(keys) == 0:
+            return []
+        # Rows without any static cell need not be searched
+        i_min = max(i_min, (int(keys[0]) + 2 ** 31) >> 32)
+        i_max = min(i_max, (int(keys[-1]) + 2 ** 31) >> 32)
+        if i_min > i_max:
+            return []
+        rows = np.arange(i_min, i_max + 1, dtype=np.int64) * 2 ** 32
+        lo = self._offsets[np.searchsorted(keys, rows + j_min)]
+        hi = self._offsets[np.searchsorted(keys, rows + j_max, side="right")]
+        return [self._indices[start:stop] for start, stop in zip(lo.tolist(), hi.tolist()) if stop > start]
+
+    def query_point(self, point):
+        """
+        Retrieves the obstacles registered in the cell containing a point.
+
+        Parameters:
+            point (tuple): The point to query, represented as (x, y).
+
+        Returns:
+            list: The indices of obstacles that may contain the point.
+        """
+        size = self.cell_size
+        i = floor(point[0] / size)
+        j = floor(point[1] / size)
+        found = self._cells.get((i, j), [])
+        keys = self._keys
+        if len(keys):
+            key = i * 2 ** 32 + j
+            position = int(keys.searchsorted(key))
+            if position < len(keys) and int(keys[position]) == key:
+                offsets = self._offsets
+                return self._indices[int(offsets[position]):int(offsets[position + 1])].tolist() + found
+        return found
+
+    def query_box(self, x_min, y_min, x_max, y_max):
+        """
+        Retrieves the obstacles registered in any cell overlapped by a box.
+
+        Parameters:
+            x_min (float): The minimum x-coordinate of the box.
+            y_min (float): The minimum y-coordinate of the box.
+            x_max (float): The maximum x-coordinate of the box.
+            y_max (float): The maximum y-coordinate of the box.
+
+        Returns:
+            numpy.ndarray: The sorted, unique indices of obstacles that may overlap the box.
+        """
+        i_min, j_min, i_max, j_max = self.cell_range(x_min, y_min, x_max, y_max)
+        cells = self._cells
+        found = []
+        if (i_max - i_min + 1) * (j_max - j_min + 1) > len(cells):
+            # The box covers more cells than are occupied, so walk the occupied ones instead
+            for (i, j), indices in cells.items():
+                if i_min <= i <= i_max and j_min <= j <= j_max:
+                    found.extend(indices)
+        else:
+            for i in range(i_min, i_max + 1):
+                for j in range(j_min, j_max + 1):
+                    indices = cells.get((i, j))
+                    if indices:
+                        found.extend(indices)
+        static = self._static_rows(i_min, j_min, i_max, j_max)
+        if static:
+            return np.unique(np.concatenate(static + [np.array(found, dtype=np.intp)]))
+        return np.unique(np.array(found, dtype=np.intp))
@@ -0,0 +1,168 @@
+import numpy as np
+
+class WorldGenerator:
+    """
+    Generates large procedural worlds of rectangular obstacles, for measuring how sensing and navigation scale.
+    Worlds are square, centered on the origin, and fully determined by their parameters and the seed. Obstacles
+    are produced as one bounds array with array operations, so worlds of a million obstacles take about a second,
+    and are added to an Environment in bulk.
+
+    Layouts:
+        "clutter": Randomly placed boxes; density is the number of boxes per square meter.
+        "maze": A maze of thin walls on a square cell lattice, with the origin at the center of a cell; density is
+            the fraction of interior walls kept, 1 giving a perfect maze (a single path between any two cells).
+        "warehouse": Rows of shelving units separated by aisles, with cross aisles every few units and the origin
+            at an aisle crossing; density is the fraction of shelving units present.
+
+    Attributes:
+        seed (int): The random seed; every generated world starts from it.
+    """
+    LAYOUTS = ("clutter", "maze", "warehouse")
+
+    def __init__(self, seed=0):
+        """
+        Initializes the WorldGenerator.
+
+        Parameters:
+            seed (int): The random seed, defaults to 0.
+        """
+        self.seed = seed
+
+    def clutter(self, size, density=0.25, min_side=0.2, max_side=1.0):
+        """
+        Generates randomly placed boxes.
+
+        Parameters:
+            size (float): The side length of the world.
+            density (float): The number of boxes per square meter, defaults to 0.25.
+            min_side (float): The smallest box side, defaults to 20 centimeters.
+            max_side (float): The largest box side, defaults to 1 meter.
+
+        Returns:
+            numpy.ndarray: The box bounds, shape (num_boxes, 4) as (x_min, y_min, x_max, y_max).
+        """
+        rng = np.random.default_rng(self.seed)
+        count = int(round(density * size * size))
+        corners = rng.uniform(-size / 2, size / 2, size=(count, 2))
+        sides = rng.uniform(min_side, max_side, size=(count, 2))
+        return np.hstack([corners, corners + sides])
+
+    def maze(self, size, density=1.0, cell=2.0, wall=0.1):
+        """
+        Generates a maze with the binary tree algorithm, which carves every cell's passage independently and so
+        vectorizes: each cell opens its north or east wall at random, except along the top row and right column.
+
+        Parameters:
+            size (float): The side length of the world; the maze uses the largest odd number of cells that fits.
+            density (float): The fraction of interior walls kept, defaults to 1 (a perfect maze).
+            cell (float): The side length of a maze cell, defaults to 2 meters.
+            wall (float): The wall thickness, defaults to 10 centimeters.
+
+        Returns:
+            numpy.ndarray: The wall bounds, shape (num_walls, 4) as (x_min, y_min, x_max, y_max).
+        """
+        rng = np.random.default_rng(self.seed)
+        n = max(int(size // cell), 1)
+        n -= 1 - n % 2
+        start = -n * cell / 2
+        half = wall / 2
+
+        north = rng.random((n, n)) < 0.5
+        north[n - 1, :] = True
+        north[:, n - 1] = False
+        # Walls between cells (i, j) and (i + 1, j), then between (i, j) and (i, j + 1)
+        vertical = north[:-1, :] & (rng.random((n - 1, n)) < density)
+        horizontal = ~north[:, :-1] & (rng.random((n, n - 1)) < density)
+
+        i, j = np.nonzero(vertical)
+        x = start + (i + 1) * cell
+        y = start + j * cell
+        walls = [np.column_stack([x - half, y - half, x + half, y + cell + half])]
+        i, j = np.nonzero(horizontal)
+        x = start + i * cell
+        y = start + (j + 1) * cell
+        walls.append(np.column_stack([x - half, y - half, x + cell + half, y + half]))
+        end = -start
+        walls.append(np.array([
+            [start - half, start - half, end + half, start + half],
+            [start - half, end - half, end + half, end + half],
+            [start - half, start - half, start + half, end + half],
+            [end - half, start - half, end + half, end + half],
+        ]))
+        return np.concatenate(walls)
+
+    def warehouse(self, size, density=1.0, aisle=2.0, shelf_depth=1.0, shelf_length=3.0, block=5, cross_aisle=3.0):
+        """
+        Generates rows of shelving units along x. Only units lying entirely inside the world are kept.
+
+        Parameters:
+            size (float): The side length of the world.
+            density (float): The fraction of shelving units present, defaults to 1.
+            aisle (float): The width of the aisles between rows, defaults to 2 meters.
+            shelf_depth (float): The depth of a shelving row, defaults to 1 meter.
+            shelf_length (float): The length of a shelving unit, defaults to 3 meters.
+            block (int): The number of units between cross aisles, defaults to 5.
+            cross_aisle (float): The width of the cross aisles, defaults to 3 meters.
+
+        Returns:
+            numpy.ndarray: The shelving unit bounds, shape (num_units, 4) as (x_min, y_min, x_max, y_max).
+        """
+        rng = np.random.default_rng(self.seed)
+        pitch = shelf_depth + aisle
+        rows = int(np.ceil(size / (2 * pitch))) + 1
+        units = int(np.ceil(size / (2 * shelf_length))) + 1
+        k, m = np.meshgrid(np.arange(-rows, rows), np.arange(-units, units), indexing="ij")
+        # Symmetric about the origin: row -1 ends half an aisle below it, unit -1 half a cross aisle left of it
+        y = aisle / 2 + k * pitch
+        x = cross_aisle / 2 + m * shelf_length + np.floor_divide(m, block) * cross_aisle
+        bounds = np.column_stack([x.ravel(), y.ravel(), x.ravel() + shelf_length, y.ravel() + shelf_depth])
+        inside = (bounds[:, :2] >= -size / 2).all(axis=1) & (bounds[:, 2:] <= size / 2).all(axis=1)
+        present = rng.random(len(bounds)) < density
+        return bounds[inside & present]
+
+    def generate(self, layout, size, density=None, keep_clear=(), clear_radius=0.5, **params):
+        """
+        Generates a world.
+
+        Parameters:
+            layout (str): "clutter", "maze" or "warehouse".
+            size (float): The side length of the world.
+            density (float): The layout's density, or None for its default.
+            keep_clear (list): Points, e.g. the start pose and the goals, around which obstacles are removed.
+            clear_radius (float): The radius kept free around each of those points, defaults to 50 centimeters.
+            **params: Further parameters of the layout's method.
+
+        Returns:
+            numpy.ndarray: The obstacle bounds, shape (num_obstacles, 4) as (x_min, y_min, x_max, y_max).
+        """
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"World layout '{layout}' not recognized.")
+        if density is not None:
+            params["density"] = density
+        bounds = getattr(self, layout)(size, **params)
+        keep = np.ones(len(bounds), dtype=bool)
+        for x, y in keep_clear:
+            dx = np.maximum(np.maximum(bounds[:, 0] - x, x - bounds[:, 2]), 0)
+            dy = np.maximum(np.maximum(bounds[:, 1] - y, y - bounds[:, 3]), 0)
+            keep &= np.hypot(dx, dy) > clear_radius
+        return bounds[keep]
+
+    def populate(self, environment, layout, size, density=None, keep_clear=(), clear_radius=0.5, **params):
+        """
+        Generates a world and adds its obstacles to an environment in bulk.
+
+        Parameters:
+            environment (Environment): The environment receiving the obstacles.
+            layout (str): "clutter", "maze" or "warehouse".
+            size (float): The side length of the world.
+            density (float): The layout's density, or None for its default.
+            keep_clear (list): Points around which obstacles are removed.
+            clear_radius (float): The radius kept free around each of those points.
+            **params: Further parameters of the layout's method.
+
+        Returns:
+            numpy.ndarray: The bounds of the added obstacles.
+        """
+        bounds = self.generate(layout, size, density, keep_clear, clear_radius, **params)
+        environment.add_obstacles(bounds)
+        return bounds
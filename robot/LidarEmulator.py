@@ -1,28 +1,57 @@
 import numpy as np
+from .Environment.Environment import Environment
+
+# Upper bound on the rays x obstacles elements intersected at once by update_batch
+BATCH_ELEMENTS = 1 << 16
 
 class LidarEmulator:
     """
-    A class to emulate LIDAR sensor data for a robotic system. This emulator simulates the behavior of a LIDAR sensor 
+    A class to emulate LIDAR sensor data for a robotic system. This emulator simulates the behavior of a LIDAR sensor
     by casting rays in the environment and detecting obstacles.
 
     Attributes:
         _num_rays (int): The number of rays used in the simulation to represent LIDAR data.
         max_distance (float): The maximum distance that the LIDAR can detect.
-        lidar_data (list): The simulated distances detected by each LIDAR ray.
-        lidar_end_points (list): The end points of each LIDAR ray in the environment.
+        method (str): How rays are cast: "exact" intersects the obstacle rectangles analytically, "grid" traverses
+            the environment's occupancy grid cell by cell, "sdf" sphere-traces the environment's distance field.
+        lidar_data (numpy.ndarray): The simulated distances detected by each LIDAR ray, shape (num_rays,).
+        lidar_end_points (numpy.ndarray): The end points of each LIDAR ray in the environment, shape (num_rays, 2).
+        angles (numpy.ndarray): The ray angles relative to the robot's heading, shape (num_rays,).
+
+    The emulator owns every buffer used on its update path: lidar_data and lidar_end_points are overwritten in place
+    each update, the ray directions are rotated from precomputed cos/sin tables, and the intersection workspace is
+    reused between updates. Consumers receive views of these buffers and must copy anything they keep across ticks.
     """
-    def __init__(self, num_rays=720, max_distance=5):
+    def __init__(self, num_rays=720, max_distance=5, method="exact"):
         """
         Initializes the LidarEmulator with a specified number of rays and maximum detection distance.
 
         Parameters:
             num_rays (int): The number of rays to use in the LIDAR simulation.
             max_distance (float): The maximum distance that the LIDAR rays can detect.
+            method (str): The ray casting method, "exact" (default), "grid" or "sdf".
         """
         self._num_rays = num_rays
         self.max_distance = max_distance
-        self.lidar_data = [max_distance] * num_rays
-        self.lidar_end_points = [(0, 0)] * num_rays
+        self.method = method
+        self.lidar_data = np.full(num_rays, float(max_distance))
+        self.lidar_end_points = np.zeros((num_rays, 2))
+
+        # Direction tables, rotated into _cos/_sin by the robot heading on each update
+        self.angles = np.linspace(0, 2 * np.pi, num_rays, endpoint=False)
+        self._cos_table = np.cos(self.angles)
+        self._sin_table = np.sin(self.angles)
+        self._cos = self._cos_table.copy()
+        self._sin = self._sin_table.copy()
+        self._scratch = np.empty(num_rays)
+
+        # Intersection workspace (grown on demand) and the cached spatial-index candidates
+        self._work = ()
+        self._work_capacity = 0
+        self._work_views = (np.empty((0, num_rays)),)
+        self._candidates = None
+        self._candidates_key = None
+        self._candidates_environment = None
 
     def cast_ray(self, x, y, angle, obstacles):
         """
@@ -32,54 +61,267 @@ class LidarEmulator:
             x (float): The x-coordinate of the ray's starting point.
             y (float): The y-coordinate of the ray's starting point.
             angle (float): The angle at which the ray is cast.
-            obstacles (list): A list of obstacles to check for collisions.
+            obstacles (list or Environment): A list of obstacles, or an environment whose spatial index is used.
 
         Returns:
             float: The distance at which an obstacle is detected, or the maximum distance if no obstacle is found.
         """
-        for r in np.linspace(0, self.max_distance, 200):
-            xr = x + r * np.cos(angle)
-            yr = y + r * np.sin(angle)
+        distances = self.cast_rays(x, y, np.cos([angle]), np.sin([angle]), obstacles)
+        return float(distances[0])
+
+    def cast_rays(self, x, y, cos_a, sin_a, obstacles):
+        """
+        Casts a set of rays with the configured method.
+
+        Parameters:
+            x (float or numpy.ndarray): The x-coordinate(s) of the ray origins.
+            y (float or numpy.ndarray): The y-coordinate(s) of the ray origins.
+            cos_a (numpy.ndarray): The cosine of each ray angle.
+            sin_a (numpy.ndarray): The sine of each ray angle.
+            obstacles (list or Environment): A list of obstacles, or an environment. The "grid" method requires an
+                environment with an occupancy grid, and the "sdf" method one with a distance field.
+
+        Returns:
+            numpy.ndarray: The hit distance of each ray.
+        """
+        if self.method == "grid":
+            grid = getattr(obstacles, "occupancy_grid", None)
+            if grid is None:
+                raise ValueError("The 'grid' lidar method requires an Environment with an occupancy grid.")
+            return grid.cast_rays(x, y, cos_a, sin_a, self.max_distance)
+        if self.method == "sdf":
+            field = getattr(obstacles, "distance_field", None)
+            if field is None:
+                raise ValueError("The 'sdf' lidar method requires an Environment with a distance field.")
+            return field.cast_rays(x, y, cos_a, sin_a, self.max_distance)
+        if self.method != "exact":
+            raise ValueError(f"Lidar method '{self.method}' not recognized.")
+        return intersect_rays(x, y, cos_a, sin_a, self.candidate_bounds(x, y, obstacles), self.max_distance)
+
+    def candidate_bounds(self, x, y, obstacles):
+        """
+        Retrieves the bounds of the obstacles that rays cast from a point could reach. When given an Environment,
+        only obstacles indexed within max_distance of the point are returned. The static candidates are cached until
+        the robot moves into a different set of index cells or the static obstacles change; the moving obstacles in
+        range are added on every call.
+
+        Parameters:
+            x (float): The x-coordinate of the ray origin.
+            y (float): The y-coordinate of the ray origin.
+            obstacles (list or Environment): A list of obstacles, or an environment whose spatial index is used.
 
-            for obstacle in obstacles:
-                if obstacle.contains_point((xr, yr)):
-                    return r   
+        Returns:
+            numpy.ndarray: An array of shape (num_candidates, 4) with the candidate obstacle bounds.
+        """
+        if isinstance(obstacles, Environment):
+            r = self.max_distance
+            key = (obstacles.static_version, obstacles.index.cell_range(x - r, y - r, x + r, y + r))
+            if self._candidates_key != key or self._candidates_environment is not obstacles:
+                self._candidates = obstacles.query_static_bounds(x - r, y - r, x + r, y + r)
+                self._candidates_key = key
+                self._candidates_environment = obstacles
+            moving = obstacles.get_moving_bounds()
+            if len(moving):
+                near = ((moving[:, 0] <= x + r) & (moving[:, 2] >= x - r)
+                        & (moving[:, 1] <= y + r) & (moving[:, 3] >= y - r))
+                return np.concatenate([self._candidates, moving[near]])
+            return self._candidates
+        return obstacle_bounds(obstacles)
 
-        return self.max_distance
-    
     def update(self, robot_pos, obstacles):
         """
         Updates the LIDAR emulation data based on the robot's position and the environment's obstacles.
+        All rays are cast at once into the emulator's preallocated buffers.
 
         Parameters:
             robot_pos (tuple): The position of the robot, given as (x, y, theta).
-            obstacles (list): A list of obstacles in the environment to check against the LIDAR rays.
+            obstacles (list or Environment): The obstacles to check against the LIDAR rays, either as a list or as an
+                environment whose spatial index limits the check to nearby obstacles.
+        """
+        x, y, theta = robot_pos[0], robot_pos[1], robot_pos[2]
+        cos_a, sin_a = self._rotate(theta)
+
+        if self.method == "exact":
+            self._intersect_into(x, y, cos_a, sin_a, self.candidate_bounds(x, y, obstacles))
+        else:
+            self.lidar_data[:] = self.cast_rays(x, y, cos_a, sin_a, obstacles)
+
+        end_x = self.lidar_end_points[:, 0]
+        end_y = self.lidar_end_points[:, 1]
+        np.multiply(self.lidar_data, cos_a, out=end_x)
+        np.multiply(self.lidar_data, sin_a, out=end_y)
+        end_x += x
+        end_y += y
+
+    def _rotate(self, theta):
+        """
+        Internal method to rotate the ray direction tables by the robot heading, in place.
+
+        Parameters:
+            theta (float): The robot heading.
+
+        Returns:
+            tuple: Views of the rotated cosine and sine buffers, each of shape (num_rays,).
+        """
+        c, s = np.cos(theta), np.sin(theta)
+        scratch = self._scratch
+        # cos(a + theta) = cos(a)cos(theta) - sin(a)sin(theta)
+        np.multiply(self._cos_table, c, out=self._cos)
+        np.multiply(self._sin_table, s, out=scratch)
+        self._cos -= scratch
+        # sin(a + theta) = sin(a)cos(theta) + cos(a)sin(theta)
+        np.multiply(self._sin_table, c, out=self._sin)
+        np.multiply(self._cos_table, s, out=scratch)
+        self._sin += scratch
+        return self._cos, self._sin
+
+    def _intersect_into(self, x, y, cos_a, sin_a, bounds):
+        """
+        Internal method to intersect the current scan with the candidate obstacles directly into lidar_data.
+        The workspace is laid out as obstacles x rays and filled one obstacle row at a time, so every NumPy call
+        works on equally shaped operands and none of them needs a temporary or an iterator buffer.
+
+        Parameters:
+            x (float): The x-coordinate of the robot.
+            y (float): The y-coordinate of the robot.
+            cos_a (numpy.ndarray): The cosine of each ray angle, shape (num_rays,).
+            sin_a (numpy.ndarray): The sine of each ray angle, shape (num_rays,).
+            bounds (numpy.ndarray): The candidate obstacle bounds, shape (num_obstacles, 4).
+        """
+        distances = self.lidar_data
+        distances.fill(self.max_distance)
+        if len(bounds) == 0:
+            return
+
+        work = self._workspace(len(bounds))
+        tx1, tx2, ty1, ty2 = work[:4]
+        # Rays parallel to a slab divide by zero
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for k, (x_min, y_min, x_max, y_max) in enumerate(bounds):
+                np.divide(x_min - x, cos_a, out=tx1[k])
+                np.divide(x_max - x, cos_a, out=tx2[k])
+                np.divide(y_min - y, sin_a, out=ty1[k])
+                np.divide(y_max - y, sin_a, out=ty2[k])
+        t_hit = slab_entry(*work)
+        for row in t_hit:
+            np.minimum(distances, row, out=distances)
+
+    def _workspace(self, num_obstacles):
+        """
+        Internal method to retrieve obstacles x rays views of the reusable intersection workspace, growing it
+        geometrically when more obstacles are in range than ever before.
+
+        Parameters:
+            num_obstacles (int): The number of candidate obstacles.
+
+        Returns:
+            tuple: Five float and two boolean arrays of shape (num_obstacles, num_rays), as used by slab_entry.
         """
-        angles = np.linspace(0, 2 * np.pi, self._num_rays, endpoint=False)
-        for i, angle in enumerate(angles):
-            adjusted_angle = angle + robot_pos[2]  # Adjust the angle based on the robot's orientation
-            distance = self.cast_ray(robot_pos[0], robot_pos[1], adjusted_angle, obstacles)
-            self.lidar_data[i] = distance
+        if len(self._work_views[0]) == num_obstacles:
+            return self._work_views
+        size = self._num_rays * num_obstacles
+        if size > self._work_capacity:
+            capacity = max(size, 2 * self._work_capacity)
+            self._work = tuple(np.empty(capacity) for _ in range(5)) + \
+                tuple(np.empty(capacity, dtype=bool) for _ in range(2))
+            self._work_capacity = capacity
+        self._work_views = tuple(buffer[:size].reshape(num_obstacles, self._num_rays) for buffer in self._work)
+        return self._work_views
 
-            xr = robot_pos[0] + distance * np.cos(adjusted_angle)
-            yr = robot_pos[1] + distance * np.sin(adjusted_angle)
-            self.lidar_end_points[i] = (xr, yr)
+    def update_batch(self, poses, obstacles):
+        """
+        Casts a full scan from each of several poses against the same obstacles in one vectorized call, for example
+        for a fleet of robots or a set of Monte Carlo rollouts. The emulator's own lidar_data is left untouched.
+
+        Parameters:
+            poses (numpy.ndarray): The sensor poses, shape (N, 3) with rows (x, y, theta).
+            obstacles (list or Environment): The obstacles to check against the LIDAR rays. With an Environment,
+                each pose is only intersected with the obstacles indexed near it.
+
+        Returns:
+            tuple: The distances of shape (N, num_rays) and the ray end points of shape (N, num_rays, 2).
+        """
+        poses = np.asarray(poses, dtype=float).reshape(-1, 3)
+        x = poses[:, 0:1]
+        y = poses[:, 1:2]
+        c = np.cos(poses[:, 2:3])
+        s = np.sin(poses[:, 2:3])
+        cos_a = self._cos_table * c - self._sin_table * s
+        sin_a = self._sin_table * c + self._cos_table * s
+
+        if self.method == "exact":
+            distances = self._intersect_batch(x, y, cos_a, sin_a, obstacles)
+        else:
+            distances = self.cast_rays(np.broadcast_to(x, cos_a.shape).ravel(), np.broadcast_to(y, cos_a.shape).ravel(),
+                                       cos_a.ravel(), sin_a.ravel(), obstacles).reshape(cos_a.shape)
+
+        end_points = np.empty(cos_a.shape + (2,))
+        end_points[..., 0] = x + distances * cos_a
+        end_points[..., 1] = y + distances * sin_a
+        return distances, end_points
+
+    def _intersect_batch(self, x, y, cos_a, sin_a, obstacles):
+        """
+        Internal method to intersect a batch of scans with obstacles, in chunks of poses bounded by BATCH_ELEMENTS.
+
+        Parameters:
+            x (numpy.ndarray): The x-coordinates of the poses, shape (N, 1).
+            y (numpy.ndarray): The y-coordinates of the poses, shape (N, 1).
+            cos_a (numpy.ndarray): The cosine of each ray angle, shape (N, num_rays).
+            sin_a (numpy.ndarray): The sine of each ray angle, shape (N, num_rays).
+            obstacles (list or Environment): The obstacles to check against the LIDAR rays.
+
+        Returns:
+            numpy.ndarray: The hit distances, shape (N, num_rays).
+        """
+        num_poses, num_rays = cos_a.shape
+        distances = np.empty(cos_a.shape)
+        if not isinstance(obstacles, Environment):
+            bounds = obstacle_bounds(obstacles)
+            if len(bounds) == 0:
+                distances.fill(self.max_distance)
+                return distances
+            chunk = max(BATCH_ELEMENTS // (num_rays * len(bounds)), 1)
+            for start in range(0, num_poses, chunk):
+                rows = slice(start, start + chunk)
+                distances[rows] = slab_distances(
+                    x[rows, :, None], y[rows, :, None], cos_a[rows, :, None], sin_a[rows, :, None],
+                    bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3], self.max_distance)
+            return distances
+
+        # Each pose has its own candidate set. Poses are grouped by candidate count, largest first, and each group is
+        # padded to its largest set with NaN bounds, which never register a hit.
+        candidates = [self.candidate_bounds(x[n, 0], y[n, 0], obstacles) for n in range(num_poses)]
+        order = np.argsort([-len(c) for c in candidates], kind="stable")
+        start = 0
+        while start < num_poses:
+            width = max(len(candidates[order[start]]), 1)
+            chunk = max(BATCH_ELEMENTS // (num_rays * width), 1)
+            rows = order[start:start + chunk]
+            bounds = np.full((len(rows), 1, width, 4), np.nan)
+            for k, n in enumerate(rows):
+                bounds[k, 0, :len(candidates[n])] = candidates[n]
+            distances[rows] = slab_distances(
+                x[rows, :, None], y[rows, :, None], cos_a[rows, :, None], sin_a[rows, :, None],
+                bounds[..., 0], bounds[..., 1], bounds[..., 2], bounds[..., 3], self.max_distance)
+            start += len(rows)
+        return distances
 
     def get_end_points(self):
         """
         Retrieves the end points of all the LIDAR rays in the environment.
 
         Returns:
-            list: A list of tuples representing the end points of the LIDAR rays.
+            numpy.ndarray: An array of shape (num_rays, 2) with the end points of the LIDAR rays.
         """
         return self.lidar_end_points
-    
+
     def get_data(self):
         """
         Retrieves the simulated LIDAR data.
 
         Returns:
-            list: The distances detected by each LIDAR ray.
+            numpy.ndarray: The distances detected by each LIDAR ray.
         """
         return self.lidar_data
 
@@ -91,3 +333,102 @@ class LidarEmulator:
             int: The number of rays.
         """
         return self._num_rays
+
+def obstacle_bounds(obstacles):
+    """
+    Collects the axis-aligned bounds of a list of rectangle obstacles into a single array.
+
+    Parameters:
+        obstacles (list): A list of RectangleObstacle objects.
+
+    Returns:
+        numpy.ndarray: An array of shape (num_obstacles, 4) with rows (x_min, y_min, x_max, y_max).
+    """
+    if len(obstacles) == 0:
+        return np.empty((0, 4))
+    return np.array([obstacle.get_bounds() for obstacle in obstacles], dtype=float)
+
+def intersect_rays(x, y, cos_a, sin_a, bounds, max_distance):
+    """
+    Computes the exact distance along each ray to the first axis-aligned rectangle it enters, using the slab method
+    over a rays x obstacles array. A ray starting inside an obstacle reports a distance of 0, and rays that hit
+    nothing report max_distance.
+
+    Parameters:
+        x (float or numpy.ndarray): The x-coordinate(s) of the ray origins, broadcastable to cos_a.
+        y (float or numpy.ndarray): The y-coordinate(s) of the ray origins, broadcastable to cos_a.
+        cos_a (numpy.ndarray): The cosine of each ray angle, shape (num_rays,).
+        sin_a (numpy.ndarray): The sine of each ray angle, shape (num_rays,).
+        bounds (numpy.ndarray): Obstacle bounds of shape (num_obstacles, 4) as (x_min, y_min, x_max, y_max).
+        max_distance (float): The maximum distance reported for a ray.
+
+    Returns:
+        numpy.ndarray: The hit distance of each ray, shape (num_rays,).
+    """
+    cos_a = np.asarray(cos_a, dtype=float)
+    sin_a = np.asarray(sin_a, dtype=float)
+    if len(bounds) == 0:
+        return np.full(cos_a.shape, float(max_distance))
+
+    x = np.broadcast_to(np.asarray(x, dtype=float), cos_a.shape)[:, None]
+    y = np.broadcast_to(np.asarray(y, dtype=float), cos_a.shape)[:, None]
+    return slab_distances(x, y, cos_a[:, None], sin_a[:, None],
+                          bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3], max_distance)
+
+def slab_distances(x, y, cos_a, sin_a, x_min, y_min, x_max, y_max, max_distance):
+    """
+    Slab-method ray/box intersection over broadcast arrays, reduced over the last (obstacle) axis.
+
+    Parameters:
+        x (numpy.ndarray): The x-coordinates of the ray origins.
+        y (numpy.ndarray): The y-coordinates of the ray origins.
+        cos_a (numpy.ndarray): The cosine of each ray angle.
+        sin_a (numpy.ndarray): The sine of each ray angle.
+        x_min (numpy.ndarray): The minimum x-coordinate of each box.
+        y_min (numpy.ndarray): The minimum y-coordinate of each box.
+        x_max (numpy.ndarray): The maximum x-coordinate of each box.
+        y_max (numpy.ndarray): The maximum y-coordinate of each box.
+        max_distance (float): The maximum distance reported for a ray.
+
+    Returns:
+        numpy.ndarray: The hit distance of each ray, with the broadcast shape minus its last axis.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tx1 = (x_min - x) / cos_a
+        tx2 = (x_max - x) / cos_a
+        ty1 = (y_min - y) / sin_a
+        ty2 = (y_max - y) / sin_a
+    work = (tx1, tx2, ty1, ty2, np.empty(tx1.shape), np.empty(tx1.shape, dtype=bool), np.empty(tx1.shape, dtype=bool))
+    t_hit = slab_entry(*work)
+    return np.minimum(t_hit.min(axis=-1), max_distance)
+
+def slab_entry(tx1, tx2, ty1, ty2, t_far, miss, test):
+    """
+    Turns per-slab crossing distances into box entry distances, in place. Every argument has the same shape, so no
+    temporaries are needed.
+
+    Parameters:
+        tx1 (numpy.ndarray): The distances to the x_min slab plane; overwritten with the entry distances.
+        tx2 (numpy.ndarray): The distances to the x_max slab plane; used as scratch.
+        ty1 (numpy.ndarray): The distances to the y_min slab plane; used as scratch.
+        ty2 (numpy.ndarray): The distances to the y_max slab plane; used as scratch.
+        t_far (numpy.ndarray): Scratch array for the exit distances.
+        miss (numpy.ndarray): Scratch boolean array.
+        test (numpy.ndarray): Scratch boolean array.
+
+    Returns:
+        numpy.ndarray: tx1, holding the distance at which each ray enters each box, or inf where it misses.
+    """
+    # fmin/fmax drop the NaNs produced by a ray running exactly along a slab edge
+    np.fmax(tx1, tx2, out=t_far)
+    t_near = np.fmin(tx1, tx2, out=tx1)
+    np.fmin(t_far, np.fmax(ty1, ty2, out=tx2), out=t_far)
+    np.fmax(t_near, np.fmin(ty1, ty2, out=ty1), out=t_near)
+
+    # Obstacles are open sets, so a ray only grazing an edge or corner is not a hit; NaN bounds never hit
+    np.greater_equal(t_near, t_far, out=miss)
+    miss |= np.less_equal(t_far, 0.0, out=test)
+    miss |= np.isnan(t_near, out=test)
+    np.maximum(t_near, 0.0, out=t_near)
+    np.copyto(t_near, np.inf, where=miss)
+    return t_near
@@ -0,0 +1,245 @@
+import numpy as np
+
+# Components, read for their default parameters
+from .Components.Odometer import Odometer
+from .Components.PidController import PidController
+from .Components.SteeringController import SteeringController
+from .Components.GoalController import GoalController
+from .Components.GapDetector import GapDetector
+
+# Environment
+from .Environment.Environment import Environment
+from .Environment.EnvironmentCreater import EnvironmentCreator
+
+class RobotBatch:
+    """
+    A fleet of N simulated robots stored as arrays (struct of arrays). One update steps goal tracking, gap
+    following, steering, PID velocity control and kinematics for every robot at once, following the same sequence
+    of operations as Robot.update, so each row behaves like an independent Robot in the Simulation superstate
+    using the "pid" velocity controller.
+
+    A robot is active while it has goals to follow, like a Robot outside the Idle state. When its last goal is
+    reached it goes idle and is reset as Robot.reset does.
+
+    Attributes:
+        num_robots (int): The number of robots N.
+        environment (Environment): The environment shared by all robots.
+        gap_detector (GapDetector): The gap detector configuration applied to every robot's scans.
+        pose (numpy.ndarray): The pose of each robot, shape (N, 3) with rows (x, y, theta).
+        vel (numpy.ndarray): The linear velocity of each robot, shape (N,).
+        steering (numpy.ndarray): The angular velocity of each robot, shape (N,).
+        pid_integral (numpy.ndarray): The PID integrator of each robot, shape (N,).
+        pid_error (numpy.ndarray): The previous PID error of each robot, shape (N,).
+        goal (numpy.ndarray): The current goal of each robot, shape (N, 2); only valid where has_goal is True.
+        has_goal (numpy.ndarray): Whether each robot has a current goal, shape (N,).
+        gap_goal (numpy.ndarray): The latest gap goal of each robot, shape (N, 2); NaN where there is none.
+        active (numpy.ndarray): Whether each robot is following goals, shape (N,).
+        goals (numpy.ndarray): The goal queue of each robot, padded, shape (N, max_goals, 2).
+        goal_count (numpy.ndarray): The number of queued goals of each robot, shape (N,).
+        next_goal (numpy.ndarray): The index of the next goal to dequeue for each robot, shape (N,).
+        visited_count (numpy.ndarray): The number of goals each robot has reached, shape (N,).
+        distance (numpy.ndarray): The distance of each robot to its current goal, shape (N,).
+        K_p, K_i, K_d (numpy.ndarray): The PID gains of each robot, shape (N,).
+        K_h (numpy.ndarray): The steering gain of each robot, shape (N,).
+        cruise_vel, max_vel (numpy.ndarray): The cruise and maximum velocities of each robot, shape (N,).
+        distance_accuracy (numpy.ndarray): The goal reaching radius of each robot, shape (N,).
+    """
+    def __init__(self, num_robots, environment=None):
+        """
+        Initializes the RobotBatch with every robot idle at the Odometer's default pose and the components' default
+        parameters.
+
+        Parameters:
+            num_robots (int): The number of robots.
+            environment (Environment): The shared environment; defaults to a new default environment, as a Robot
+                would create.
+        """
+        if environment is None:
+            environment = Environment()
+            EnvironmentCreator(environment).setup_default_environment()
+        self.num_robots = num_robots
+        self.environment = environment
+        self.gap_detector = GapDetector()
+
+        odometer = Odometer()
+        pid = PidController()
+        steering_controller = SteeringController()
+        goal_controller = GoalController()
+
+        n = num_robots
+        self.pose = np.tile(np.array(odometer.get_pose(), dtype=float), (n, 1))
+        self.vel = np.zeros(n)
+        self.steering = np.zeros(n)
+        self.pid_integral = np.zeros(n)
+        self.pid_error = np.zeros(n)
+        self.goal = np.zeros((n, 2))
+        self.has_goal = np.zeros(n, dtype=bool)
+        self.gap_goal = np.full((n, 2), np.nan)
+        self.active = np.zeros(n, dtype=bool)
+        self.goals = np.zeros((n, 0, 2))
+        self.goal_count = np.zeros(n, dtype=np.intp)
+        self.next_goal = np.zeros(n, dtype=np.intp)
+        self.visited_count = np.zeros(n, dtype=np.intp)
+        self.distance = np.zeros(n)
+
+        self.K_p = np.full(n, float(pid._K_p))
+        self.K_i = np.full(n, float(pid._K_i))
+        self.K_d = np.full(n, float(pid._K_d))
+        self.K_h = np.full(n, float(steering_controller._K_h))
+        self.cruise_vel = np.full(n, float(odometer.cruise_vel))
+        self.max_vel = np.full(n, float(odometer.max_vel))
+        self.distance_accuracy = np.full(n, float(goal_controller.distance_accuracy))
+
+        self._scan_gap_goals = None
+
+    def set_poses(self, poses):
+        """
+        Sets the pose of every robot.
+
+        Parameters:
+            poses (numpy.ndarray): The new poses, shape (N, 3) or (3,) for all robots alike.
+        """
+        self.pose[:] = poses
+
+    def set_goals(self, goals, robots=None):
+        """
+        Gives robots a new list of goals and activates them, like a Robot entering a new state: the robots are reset
+        first and their previous goals discarded, visited ones included, since the goal rows are overwritten.
+
+        Parameters:
+            goals (list or numpy.ndarray): The goals of each selected robot, either one (G, 2) list shared by all of
+                them or one list of (x, y) goals per robot.
+            robots (numpy.ndarray): The indices or boolean mask of the robots to set; defaults to all robots.
+        """
+        rows = np.arange(self.num_robots)[robots if robots is not None else slice(None)]
+        goals = [np.asarray(g, dtype=float).reshape(-1, 2) for g in goals] \
+            if np.ndim(goals) != 2 else [np.asarray(goals, dtype=float)] * len(rows)
+
+        width = max([len(g) for g in goals] + [self.goals.shape[1]])
+        if width > self.goals.shape[1]:
+            padded = np.zeros((self.num_robots, width, 2))
+            padded[:, :self.goals.shape[1]] = self.goals
+            self.goals = padded
+
+        self._reset(rows)
+        for row, robot_goals in zip(rows, goals):
+            self.goals[row, :len(robot_goals)] = robot_goals
+            self.goal_count[row] = len(robot_goals)
+            self.next_goal[row] = 0
+        self.visited_count[rows] = 0
+        self.active[rows] = True
+
+    def sense(self, lidar):
+        """
+        Casts every robot's LIDAR scan in one batched call and detects gaps on all scans at once. The gap goals are
+        applied by the next update, to the robots that have a current goal.
+
+        Parameters:
+            lidar (LidarEmulator): The LIDAR emulator configuration used for all robots.
+
+        Returns:
+            numpy.ndarray: The raw scans, shape (N, num_rays).
+        """
+        scans, _ = lidar.update_batch(self.pose, self.environment)
+        _, _, _, self._scan_gap_goals = self.gap_detector.process_scans(scans, self.pose)
+        return scans
+
+    def update(self, dt):
+        """
+        Steps every robot by one time step, in the order of Robot.update: gap goals from the last sense call,
+        goal tracking, steering, PID velocity control and kinematics.
+
+        Parameters:
+            dt (float): The time step.
+        """
+        # Environment sensing: only robots with a current goal refresh their gap goal
+        if self._scan_gap_goals is not None:
+            self.gap_goal[self.has_goal] = self._scan_gap_goals[self.has_goal]
+            self._scan_gap_goals = None
+
+        # Goal controller: fetch a goal if there is none, then check whether the current one is reached
+        active = self.active
+        self._next_goal(active & ~self.has_goal)
+        checking = active & self.has_goal
+        self.distance[checking] = np.hypot(self.goal[checking, 0] - self.pose[checking, 0],
+                                           self.goal[checking, 1] - self.pose[checking, 1])
+        arrived = checking & (self.distance < self.distance_accuracy)
+        self.visited_count[arrived] += 1
+        self._next_goal(arrived)
+
+        # Robots that ran out of goals go idle
+        finished = active & ~self.has_goal
+        self._reset(finished)
+        self.active[finished] = False
+        moving = active & ~finished
+        if not moving.any():
+            return
+
+        pose = self.pose[moving]
+
+        # Steering towards the gap goal, or the current goal when there is none
+        target = np.where(np.isnan(self.gap_goal[moving, :1]), self.goal[moving], self.gap_goal[moving])
+        heading_error = np.arctan2(target[:, 1] - pose[:, 1], target[:, 0] - pose[:, 0]) - pose[:, 2]
+        steering = self.K_h[moving] * np.arctan2(np.sin(heading_error), np.cos(heading_error))
+
+        # PID velocity control
+        vel = self.vel[moving]
+        error = self.cruise_vel[moving] - vel
+        integral = self.pid_integral[moving] + error * dt
+        derivative = (error - self.pid_error[moving]) / dt
+        output = vel + self.K_p[moving] * error + self.K_i[moving] * integral + self.K_d[moving] * derivative
+        self.pid_error[moving] = error
+        self.pid_integral[moving] = integral
+        vel = np.minimum(np.abs(output), self.max_vel[moving])
+
+        # Kinematics
+        pose[:, 0] += vel * np.cos(pose[:, 2]) * dt
+        pose[:, 1] += vel * np.sin(pose[:, 2]) * dt
+        pose[:, 2] += steering * dt
+        self.pose[moving] = pose
+        self.vel[moving] = vel
+        self.steering[moving] = steering
+
+    def get_visited(self, robot):
+        """
+        Retrieves the goals a robot has reached.
+
+        Parameters:
+            robot (int): The index of the robot.
+
+        Returns:
+            numpy.ndarray: The reached goals in order, shape (visited, 2).
+        """
+        return self.goals[robot, :self.visited_count[robot]]
+
+    def _next_goal(self, rows):
+        """
+        Internal method to move the selected robots to their next queued goal, clearing the current goal of those
+        whose queue is empty.
+
+        Parameters:
+            rows (numpy.ndarray): A boolean mask of the robots to advance.
+        """
+        available = rows & (self.next_goal < self.goal_count)
+        index = np.flatnonzero(available)
+        self.goal[index] = self.goals[index, self.next_goal[index]]
+        self.next_goal[index] += 1
+        self.has_goal[available] = True
+        self.has_goal[rows & ~available] = False
+
+    def _reset(self, rows):
+        """
+        Internal method to reset the selected robots as Robot.reset does: goals, velocities and controller states
+        are cleared, the pose and visited goals are kept.
+
+        Parameters:
+            rows (numpy.ndarray): The indices or boolean mask of the robots to reset.
+        """
+        self.has_goal[rows] = False
+        self.goal_count[rows] = 0
+        self.next_goal[rows] = 0
+        self.distance[rows] = 0
+        self.vel[rows] = 0
+        self.steering[rows] = 0
+        self.pid_integral[rows] = 0
+        self.pid_error[rows] = 0
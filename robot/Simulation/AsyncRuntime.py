@@ -0,0 +1,169 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from ..Components.RateScheduler import RateScheduler
+
+class AsyncRuntime:
+    """
+    Runs the robot on one asyncio event loop: gesture input, sensing and control, and rendering are separate tasks
+    that await their next event instead of polling.
+
+    - Control: a fixed-rate task (see RateScheduler) running sense -> update with the measured dt.
+    - Gestures: camera frames are processed in a single-thread executor, so the blocking OpenCV and MediaPipe work
+      never stalls the loop; recognized gestures go through a bounded input channel.
+    - Inputs: a task awaiting the input channel and applying each gesture as soon as it arrives.
+    - Rendering: drawn between control cycles at its own rate, and shed when the control cycle has no time for it.
+      With a Visualizer, the control task publishes a snapshot every cycle instead and drawing happens in the
+      visualizer's process.
+
+    The runtime stops when the robot enters the Stop state, the gesture window is closed, the optional duration
+    elapses or stop is called; every task is then cancelled and the camera released.
+
+    Attributes:
+        robot (Robot): The robot.
+        lidar (LidarEmulator): The LIDAR emulator feeding the robot.
+        ax (matplotlib.axes.Axes): The axis rendered to, or None to run without rendering.
+        gestures (HandGestureRecognition): The gesture recognizer, or None to run without camera input.
+        visualizer (Visualizer): A started visualizer receiving a snapshot every control cycle, or None.
+        scheduler (RateScheduler): The control loop scheduler.
+        render_freq (float): The rendering rate, in Hz.
+        duration (float): The run time in seconds after which the runtime stops, or None to run until stopped.
+        input_capacity (int): The capacity of the input channel; the oldest gesture is dropped when it is full.
+        inputs (asyncio.Queue): The input channel, created when the runtime starts.
+        _stop_event (asyncio.Event): Set to stop the runtime.
+        _executor (ThreadPoolExecutor): The thread running the blocking gesture recognition.
+    """
+    def __init__(self, robot, lidar, ax=None, gestures=None, freq=20, render_freq=10, duration=None,
+                 input_capacity=1, visualizer=None):
+        """
+        Initializes the AsyncRuntime.
+
+        Parameters:
+            robot (Robot): The robot to run.
+            lidar (LidarEmulator): The LIDAR emulator feeding the robot.
+            ax (matplotlib.axes.Axes): The axis to render to, or None to run without rendering.
+            gestures (HandGestureRecognition): The gesture recognizer, or None to run without camera input.
+            freq (float): The control rate in Hz, defaults to 20.
+            render_freq (float): The rendering rate in Hz, defaults to 10.
+            duration (float): Stop after this many seconds, defaults to running until stopped.
+            input_capacity (int): The capacity of the input channel, defaults to 1 so the latest gesture wins.
+            visualizer (Visualizer): A started visualizer to publish snapshots to, defaults to None.
+        """
+        self.robot = robot
+        self.lidar = lidar
+        self.ax = ax
+        self.gestures = gestures
+        self.visualizer = visualizer
+        self.scheduler = RateScheduler(freq)
+        self.render_freq = render_freq
+        self.duration = duration
+        self.input_capacity = input_capacity
+        self.inputs = None
+        self._stop_event = None
+        self._executor = None
+
+    async def run(self):
+        """
+        Runs the tasks until the runtime stops, then cancels them and releases the camera.
+
+        Returns:
+            dict: The control loop timing statistics of the run.
+        """
+        self._stop_event = asyncio.Event()
+        self.inputs = asyncio.Queue(maxsize=self.input_capacity)
+        tasks = [asyncio.create_task(self._control(), name="control"),
+                 asyncio.create_task(self._inputs(), name="inputs")]
+        if self.gestures is not None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gestures")
+            tasks.append(asyncio.create_task(self._recognize(), name="gestures"))
+        if self.ax is not None:
+            tasks.append(asyncio.create_task(self._render(), name="render"))
+        stop = asyncio.create_task(self._stop_event.wait(), name="stop")
+
+        try:
+            done, _ = await asyncio.wait(tasks + [stop], timeout=self.duration,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is not stop and not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks + [stop]:
+                task.cancel()
+            await asyncio.gather(*tasks, stop, return_exceptions=True)
+            if self._executor is not None:
+                # Runs after the frame in progress, on the thread owning the camera and window
+                await asyncio.get_running_loop().run_in_executor(self._executor, self.gestures.stop)
+                self._executor.shutdown()
+                self._executor = None
+        return self.scheduler.stats()
+
+    def stop(self):
+        """
+        Requests the runtime to stop. Must be called from the event loop's thread.
+        """
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def submit(self, command):
+        """
+        Sends an input command to the robot, dropping the oldest pending command if the channel is full.
+
+        Parameters:
+            command (str): The input, as accepted by InputSystem.update.
+        """
+        if self.inputs.full():
+            self.inputs.get_nowait()
+        self.inputs.put_nowait(command)
+
+    async def _control(self):
+        """
+        Internal task running sense -> update at the control rate.
+        """
+        robot = self.robot
+        lidar = self.lidar
+        scheduler = self.scheduler
+        visualizer = self.visualizer
+        while True:
+            dt = await scheduler.wait_async()
+            robot.sense(lidar)
+            robot.update(dt)
+            robot.environment.step(dt)
+            if visualizer is not None:
+                visualizer.publish(robot)
+            if robot.state_machine.is_state("Stop"):
+                self.stop()
+                return
+
+    async def _inputs(self):
+        """
+        Internal task applying input commands as they arrive.
+        """
+        while True:
+            command = await self.inputs.get()
+            self.robot.input_system.update(command)
+
+    async def _recognize(self):
+        """
+        Internal task processing camera frames in the executor and forwarding recognized gestures.
+        """
+        loop = asyncio.get_running_loop()
+        gestures = self.gestures
+        await loop.run_in_executor(self._executor, gestures.open)
+        while not gestures.stopped:
+            gesture = await loop.run_in_executor(self._executor, gestures.process_frame)
+            if gesture:
+                self.submit(gesture)
+        self.stop()
+
+    async def _render(self):
+        """
+        Internal task drawing the robot at the rendering rate, when the control cycle has time for it.
+        """
+        self.robot.render.pause = None
+        canvas = self.ax.figure.canvas
+        scheduler = RateScheduler(self.render_freq)
+        while True:
+            await scheduler.wait_async()
+            if self.scheduler.optional(self.robot.draw, self.ax):
+                if self.robot.render.mode != "blit":
+                    canvas.draw_idle()  # Blitting already updated the window
+                canvas.flush_events()
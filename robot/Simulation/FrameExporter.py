@@ -0,0 +1,306 @@
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ..robot import Robot
+from ..Systems.RasterRenderSystem import RasterRenderSystem
+from .TickLog import TickLog, restore_obstacles
+
+class LogFrames:
+    """
+    Rebuilds the frames of a recorded run from a tick log, as RenderSystem snapshots. The visited and remaining goals
+    are derived from the goal route in the log header and the recorded current goal; goals added during the run are
+    not recorded, so they are not drawn until they become the current goal. Moving obstacles are drawn at their
+    recorded bounds.
+
+    Attributes:
+        log (TickLog): The log.
+        route (list): The goals of the run in order: the current goal when recording started, then the queue.
+        progress (numpy.ndarray): The number of goals visited by each tick.
+        positions (numpy.ndarray): The start position followed by the position after each tick, shape
+            (num_ticks + 1, 2).
+        _to_goal (int): The value of the ToGoal state, in which the LIDAR data is drawn.
+    """
+    def __init__(self, log):
+        """
+        Initializes the LogFrames.
+
+        Parameters:
+            log (TickLog): The recorded run.
+        """
+        self.log = log
+        start = log.header["start"]
+        self.route = ([list(start["goal"])] if start["goal"] else []) + [list(goal) for goal in start["goals"]]
+        self._to_goal = log.header["states"]["ToGoal"]
+
+        # A goal is visited whenever the current goal changes
+        goals = log["goal"]
+        previous = np.empty_like(goals)
+        if len(goals):
+            previous[0] = start["goal"] if start["goal"] else (np.nan, np.nan)
+            previous[1:] = goals[:-1]
+        same = ((goals == previous) | (np.isnan(goals) & np.isnan(previous))).all(axis=1)
+        self.progress = np.cumsum(~same)
+
+        self.positions = np.empty((len(log) + 1, 2))
+        self.positions[0] = start["pose"][:2]
+        self.positions[1:] = log["pose"][:, :2]
+
+    def snapshot(self, tick, previous=None):
+        """
+        Builds the snapshot drawn after a tick.
+
+        Parameters:
+            tick (int): The index of the tick in the log.
+            previous (int): The tick of the previous frame, whose trajectory is already drawn; None to include the
+                whole trajectory.
+
+        Returns:
+            dict: The frame state, as returned by RenderSystem.snapshot, with the bounds of the moving obstacles
+                under "moving_obstacles" (None when the run had none).
+        """
+        record = self.log.records[tick]
+        goal = record["goal"]
+        gap = record["gap_goal"]
+        has_goal = not np.isnan(goal[0])
+        visited = int(self.progress[tick])
+        first = 0 if previous is None else previous + 2
+        return {
+            "pose": tuple(float(value) for value in record["pose"]),
+            "lidar": np.array(record["processed"]) if record["state"] == self._to_goal else None,
+            "visited_goals": self.route[:visited],
+            "current_goal": [float(goal[0]), float(goal[1])] if has_goal else None,
+            "goals": self.route[visited + 1:] if has_goal else self.route[visited:],
+            "gap": None if np.isnan(gap[0]) else [float(gap[0]), float(gap[1])],
+            "trajectory": [tuple(point) for point in self.positions[first:tick + 2]],
+            "moving_obstacles": np.array(record["moving"]) if "moving" in record.dtype.names else None,
+        }
+
+def render_chunk(path, ticks, output, dpi=100, fps=None, raster=False):
+    """
+    Renders consecutive frames of a log with a non-interactive backend, in the blit mode of RenderSystem, or with
+    RasterRenderSystem. Runs in a worker process: the log is opened from its path, and every frame after the first
+    only draws what changed.
+
+    Parameters:
+        path (str): The log file.
+        ticks (list): The ticks to render, in increasing order.
+        output (str): A directory receiving one PNG per frame, named after the tick's step; or, when fps is given,
+            the video file receiving the chunk.
+        dpi (int): The resolution of the frames.
+        fps (float): The frame rate of the video, or None to write PNG frames.
+        raster (bool): Whether to draw with RasterRenderSystem instead of matplotlib.
+
+    Returns:
+        int: The number of frames rendered.
+    """
+    log = TickLog(path)
+    frames = LogFrames(log)
+    with contextlib.redirect_stdout(io.StringIO()):
+        robot = Robot()
+    # Only the logged obstacles are drawn, not the default ones every robot starts with
+    environment = robot.environment
+    restore_obstacles(environment, log)
+    count = len(environment.get_bounds())
+    moving_indices = np.arange(count - len(log.moving_bounds(None)), count)
+    if raster:
+        rasterizer = RasterRenderSystem(robot, int(6.4 * dpi), int(6.4 * dpi))
+        draw = rasterizer.draw_snapshot
+        pixel_format = "rgb24"
+    else:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        render = robot.render
+        render.mode = "blit"
+        render.pause = None
+        figure = Figure(dpi=dpi)
+        canvas = FigureCanvasAgg(figure)
+        ax = figure.add_subplot()
+
+        def draw(snapshot):
+            render.draw_snapshot(ax, snapshot)
+            return np.asarray(canvas.buffer_rgba())
+        pixel_format = "rgba"
+
+    encoder = None
+    previous = None
+    for tick in ticks:
+        snapshot = frames.snapshot(tick, previous)
+        if snapshot["moving_obstacles"] is not None:
+            environment.update_obstacles(moving_indices, snapshot["moving_obstacles"])
+        image = draw(snapshot)
+        previous = tick
+        if fps is None:
+            from PIL import Image  # Installed with matplotlib
+            # Light compression: the default level spends more time encoding than drawing
+            Image.fromarray(image).save(os.path.join(output, f"frame_{int(log['step'][tick]):06d}.png"),
+                                        compress_level=1)
+            continue
+        if encoder is None:
+            height, width = image.shape[:2]
+            encoder = subprocess.Popen(
+                [_ffmpeg(), "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", pixel_format,
+                 "-s", f"{width}x{height}", "-r", str(fps), "-i", "-", "-c:v", "libx264", "-pix_fmt", "yuv420p",
+                 output], stdin=subprocess.PIPE)
+        encoder.stdin.write(image.tobytes())
+    if encoder is not None:
+        encoder.stdin.close()
+        if encoder.wait():
+            raise RuntimeError(f"ffmpeg failed to encode {output}")
+    return len(ticks)
+
+def _ffmpeg():
+    """
+    Internal function to locate the ffmpeg executable, needed for video export.
+
+    Returns:
+        str: The path of ffmpeg.
+    """
+    path = shutil.which("ffmpeg")
+    if path is None:
+        raise RuntimeError("Video export needs ffmpeg on the PATH; export PNG frames instead")
+    return path
+
+class FrameExporter:
+    """
+    Renders a recorded run to PNG frames or a video, for reviewing runs after the fact. The frames are split into
+    contiguous chunks rendered by a pool of worker processes with the Agg backend, then put back in order: PNG
+    frames are named after their step, and video chunks are encoded separately then joined without re-encoding.
+
+    A headless run is exported by recording it first, e.g. 'python -m robot.Simulation.HeadlessRunner --record
+    run.bin' then 'python -m robot.Simulation.FrameExporter run.bin --video run.mp4'.
+
+    Attributes:
+        path (str): The log file.
+        every (int): Render one tick out of this many.
+        workers (int): The number of worker processes; defaults to one per core.
+        dpi (int): The resolution of the frames.
+        raster (bool): Whether frames are drawn with RasterRenderSystem instead of matplotlib.
+        ticks (list): The ticks rendered.
+        dt (float): The time step of the recorded run.
+    """
+    def __init__(self, path, every=1, workers=None, dpi=100, raster=False):
+        """
+        Initializes the FrameExporter.
+
+        Parameters:
+            path (str): The log file written by TickRecorder.
+            every (int): Render one tick out of this many, defaults to every tick.
+            workers (int): The number of worker processes, defaults to the number of cores. With 1, frames are
+                rendered in the calling process.
+            dpi (int): The resolution of the frames, defaults to 100 (640x480 pixels, 640x640 rasterized).
+            raster (bool): Draw the frames with RasterRenderSystem, several times faster than matplotlib; defaults
+                to False.
+        """
+        log = TickLog(path)
+        self.path = path
+        self.every = every
+        self.workers = workers or os.cpu_count() or 1
+        self.dpi = dpi
+        self.raster = raster
+        self.ticks = list(range(every - 1, len(log), every))
+        self.dt = log.header["dt"]
+
+    def _chunks(self):
+        """
+        Internal method to split the ticks into contiguous chunks, a few per worker so the cores stay busy.
+
+        Returns:
+            list: The chunks, in order.
+        """
+        count = min(len(self.ticks), 4 * self.workers) if self.workers > 1 else 1
+        return [list(chunk) for chunk in np.array_split(self.ticks, max(count, 1)) if len(chunk)]
+
+    def _render(self, chunks, outputs, fps=None):
+        """
+        Internal method to render the chunks, in the pool or in the calling process.
+
+        Parameters:
+            chunks (list): The chunks of ticks.
+            outputs (list): The output of each chunk, as taken by render_chunk.
+            fps (float): The video frame rate, or None for PNG frames.
+
+        Returns:
+            int: The number of frames rendered.
+        """
+        if self.workers == 1:
+            counts = [render_chunk(self.path, chunk, output, self.dpi, fps, self.raster)
+                      for chunk, output in zip(chunks, outputs)]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                counts = list(executor.map(render_chunk, [self.path] * len(chunks), chunks, outputs,
+                                           [self.dpi] * len(chunks), [fps] * len(chunks),
+                                           [self.raster] * len(chunks)))
+        return sum(counts)
+
+    def write_frames(self, frame_dir):
+        """
+        Renders the frames to PNG files named frame_<step>.png.
+
+        Parameters:
+            frame_dir (str): The directory receiving the frames; created if needed.
+
+        Returns:
+            int: The number of frames written.
+        """
+        os.makedirs(frame_dir, exist_ok=True)
+        chunks = self._chunks()
+        return self._render(chunks, [frame_dir] * len(chunks))
+
+    def write_video(self, path, fps=None):
+        """
+        Renders the frames to a video with ffmpeg (H.264).
+
+        Parameters:
+            path (str): The video file.
+            fps (float): The frame rate, defaults to real time: one frame per 'every' ticks of the recorded time step.
+
+        Returns:
+            int: The number of frames encoded.
+        """
+        _ffmpeg()
+        fps = fps or 1 / (self.dt * self.every)
+        chunks = self._chunks()
+        with tempfile.TemporaryDirectory() as directory:
+            segments = [os.path.join(directory, f"chunk_{index:04d}.mp4") for index in range(len(chunks))]
+            count = self._render(chunks, segments, fps)
+            playlist = os.path.join(directory, "chunks.txt")
+            with open(playlist, "w") as file:
+                file.writelines(f"file '{segment}'\n" for segment in segments)
+            subprocess.run([_ffmpeg(), "-loglevel", "error", "-y", "-f", "concat", "-safe", "0", "-i", playlist,
+                            "-c", "copy", path], check=True)
+        return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a recorded run to PNG frames or a video.")
+    parser.add_argument("log", help="log file written by TickRecorder")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--frames", metavar="DIR", help="directory receiving one PNG per frame")
+    output.add_argument("--video", metavar="FILE", help="video file, encoded with ffmpeg")
+    parser.add_argument("--every", type=int, default=1, help="render one tick out of N (default: 1)")
+    parser.add_argument("--fps", type=float, default=None, help="video frame rate (default: real time)")
+    parser.add_argument("--dpi", type=int, default=100, help="frame resolution (default: 100, 640x480)")
+    parser.add_argument("--raster", action="store_true",
+                        help="draw the frames with NumPy instead of matplotlib, several times faster")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    exporter = FrameExporter(args.log, args.every, args.workers, args.dpi, args.raster)
+    start = time.perf_counter()
+    if args.frames:
+        count = exporter.write_frames(args.frames)
+    else:
+        count = exporter.write_video(args.video, args.fps)
+    elapsed = time.perf_counter() - start
+    recorded = len(exporter.ticks) * exporter.every * exporter.dt
+    print(f"{count} frames of a {recorded:.1f} s run rendered on {exporter.workers} workers in {elapsed:.1f} s "
+          f"({recorded / elapsed:.1f}x real time), written to {args.frames or args.video}")
+
+if __name__ == "__main__":
+    main()
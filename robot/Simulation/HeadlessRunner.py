@@ -0,0 +1,258 @@
+import argparse
+import os
+import time
+import numpy as np
+from ..robot import Robot
+from ..LidarEmulator import LidarEmulator
+from .TickLog import TickRecorder
+from .MultiRateClock import MultiRateClock
+from ..Systems.RasterRenderSystem import RasterRenderSystem
+
+class SimulationResult:
+    """
+    A summary of a headless simulation run.
+
+    Attributes:
+        final_pose (list): The pose of the robot when the run ended, as [x, y, theta].
+        goals_reached (list): The goals visited during the run, in order.
+        stop_reason (str): Why the run ended: "goals_reached", "stopped", "step_budget" or "time_budget".
+        steps (int): The number of simulation steps executed.
+        sim_time (float): The simulated time covered by the run, in seconds.
+        wall_time (float): The wall-clock time the run took, in seconds.
+        steps_per_sec (float): The simulation throughput.
+    """
+    def __init__(self, final_pose, goals_reached, stop_reason, steps, sim_time, wall_time):
+        """
+        Initializes the SimulationResult.
+
+        Parameters:
+            final_pose (list): The final pose of the robot.
+            goals_reached (list): The goals visited during the run.
+            stop_reason (str): Why the run ended.
+            steps (int): The number of simulation steps executed.
+            sim_time (float): The simulated time, in seconds.
+            wall_time (float): The wall-clock time, in seconds.
+        """
+        self.final_pose = final_pose
+        self.goals_reached = goals_reached
+        self.stop_reason = stop_reason
+        self.steps = steps
+        self.sim_time = sim_time
+        self.wall_time = wall_time
+        self.steps_per_sec = steps / wall_time if wall_time > 0 else float("inf")
+
+    def as_dict(self):
+        """
+        Converts the result to a dictionary, for logging or tabulation.
+
+        Returns:
+            dict: The result fields.
+        """
+        return {
+            "final_pose": list(self.final_pose),
+            "goals_reached": [list(goal) for goal in self.goals_reached],
+            "stop_reason": self.stop_reason,
+            "steps": self.steps,
+            "sim_time": self.sim_time,
+            "wall_time": self.wall_time,
+            "steps_per_sec": self.steps_per_sec,
+        }
+
+    def __repr__(self):
+        x, y, theta = self.final_pose
+        return (f"SimulationResult({self.stop_reason}: {len(self.goals_reached)} goals reached, "
+                f"final pose ({x:.3f}, {y:.3f}, {theta:.3f}), {self.steps} steps, "
+                f"{self.sim_time:.1f} s simulated in {self.wall_time:.3f} s, {self.steps_per_sec:.0f} steps/s)")
+
+class HeadlessRunner:
+    """
+    Runs the sense -> update loop of simulation.py without a window, as fast as the CPU allows. Rendering is
+    optional and only happens every 'render_every' steps, without pausing.
+
+    Attributes:
+        robot (Robot): The simulated robot.
+        lidar (LidarEmulator): The LIDAR emulator feeding the robot.
+        dt (float): The simulated time step.
+        max_steps (int): The step budget, or None for no limit.
+        time_budget (float): The wall-clock budget in seconds, or None for no limit.
+        render_every (int): Render every this many steps, or 0 to never render.
+        ax (matplotlib.axes.Axes): The axis rendered to; created on a non-interactive figure when needed.
+        raster (RasterRenderSystem): An optional raster renderer drawing the frames instead of matplotlib.
+        frame_dir (str): A directory receiving a PNG of every rendered frame, or None.
+        on_step (callable): An optional callback called as on_step(robot, step) after every step.
+        recorder (TickRecorder): An optional recorder receiving every tick.
+        clock (MultiRateClock): An optional multi-rate clock; each step then advances it by dt instead of running
+            one sense -> update cycle.
+    """
+    def __init__(self, robot=None, lidar=None, dt=0.1, max_steps=10000, time_budget=None,
+                 render_every=0, ax=None, frame_dir=None, on_step=None, recorder=None,
+                 clock=None, raster=None):
+        """
+        Initializes the HeadlessRunner.
+
+        Parameters:
+            robot (Robot): The robot to simulate; defaults to a new robot set up with setup_default_scenario.
+            lidar (LidarEmulator): The LIDAR emulator; defaults to a new LidarEmulator.
+            dt (float): The simulated time step, defaults to 0.1 seconds as in simulation.py.
+            max_steps (int): The step budget, or None for no limit.
+            time_budget (float): The wall-clock budget in seconds, or None for no limit.
+            render_every (int): Render every this many steps, or 0 to never render.
+            ax (matplotlib.axes.Axes): The axis to render to.
+            frame_dir (str): A directory receiving a PNG of every rendered frame.
+            on_step (callable): A callback called as on_step(robot, step) after every step.
+            recorder (TickRecorder): A recorder receiving every tick; it is started by run, and closed by the caller.
+            clock (MultiRateClock): A multi-rate clock driving the robot and LIDAR at their own rates.
+            raster (RasterRenderSystem): A raster renderer to draw the frames with, instead of matplotlib.
+        """
+        if robot is None:
+            robot = Robot()
+            setup_default_scenario(robot)
+        self.robot = robot
+        self.lidar = lidar if lidar is not None else LidarEmulator()
+        self.dt = dt
+        self.max_steps = max_steps
+        self.time_budget = time_budget
+        self.render_every = render_every
+        self.ax = ax
+        self.frame_dir = frame_dir
+        self.on_step = on_step
+        self.recorder = recorder
+        self.clock = clock
+        self.raster = raster
+
+    def run(self):
+        """
+        Steps the simulation until the robot goes idle after its goals, is stopped, or a budget runs out.
+
+        Returns:
+            SimulationResult: The summary of the run.
+        """
+        robot = self.robot
+        lidar = self.lidar
+        dt = self.dt
+        state_machine = robot.state_machine
+        if self.render_every:
+            self._prepare_rendering()
+        if self.recorder is not None:
+            self.recorder.start(robot, lidar, dt)
+
+        step = 0
+        stop_reason = "step_budget"
+        start = time.perf_counter()
+        deadline = start + self.time_budget if self.time_budget is not None else None
+        while self.max_steps is None or step < self.max_steps:
+            if self.clock is not None:
+                self.clock.advance(dt)
+            else:
+                robot.sense(lidar)
+                robot.update(dt)
+                robot.environment.step(dt)
+            step += 1
+
+            if self.recorder is not None:
+                self.recorder.record(robot, lidar, step)
+            if self.on_step is not None:
+                self.on_step(robot, step)
+            if self.render_every and step % self.render_every == 0:
+                self._render(step)
+
+            if state_machine.is_state("Idle"):
+                stop_reason = "goals_reached"
+                break
+            if state_machine.is_state("Stop"):
+                stop_reason = "stopped"
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                stop_reason = "time_budget"
+                break
+        wall_time = time.perf_counter() - start
+
+        return SimulationResult(list(robot.odometer.get_pose()), list(robot.goal_controller.get_visited()),
+                                stop_reason, step, step * dt, wall_time)
+
+    def _prepare_rendering(self):
+        """
+        Internal method to set up headless rendering: the robot draws without pausing, onto a non-interactive Agg
+        figure unless an axis was provided or frames are rasterized.
+        """
+        self.robot.render.pause = None
+        if self.ax is None and self.raster is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            figure = Figure()
+            FigureCanvasAgg(figure)
+            self.ax = figure.add_subplot()
+        if self.frame_dir:
+            os.makedirs(self.frame_dir, exist_ok=True)
+
+    def _render(self, step):
+        """
+        Internal method to draw the current frame and save it if a frame directory is set.
+
+        Parameters:
+            step (int): The current step number.
+        """
+        if self.raster is not None:
+            image = self.raster.draw()
+        else:
+            self.robot.draw(self.ax)
+        if self.frame_dir:
+            path = os.path.join(self.frame_dir, f"frame_{step:06d}.png")
+            if self.raster is not None:
+                from PIL import Image  # Installed with matplotlib
+                Image.fromarray(image).save(path, compress_level=1)
+            elif self.robot.render.mode == "blit":
+                # Saving the figure would redraw it without the animated artists; save the blitted canvas instead
+                from matplotlib.image import imsave
+                imsave(path, np.asarray(self.ax.figure.canvas.buffer_rgba()))
+            else:
+                self.ax.figure.savefig(path)
+
+def setup_default_scenario(robot):
+    """
+    Sets up the scenario of simulation.py: start below the default obstacle, head to the goal and back.
+
+    Parameters:
+        robot (Robot): The robot to set up.
+    """
+    if robot.state_machine.is_superstate("Simulation"):
+        robot.odometer.set_pose([0, -4, 1.17])
+    robot.goal_controller.add_goal([0, 10])
+    robot.input_system.update('to_goal')
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the robot simulation headless, faster than real time.")
+    parser.add_argument("--steps", type=int, default=10000, help="step budget (default: 10000)")
+    parser.add_argument("--time-budget", type=float, default=None, help="wall-clock budget in seconds")
+    parser.add_argument("--dt", type=float, default=0.1, help="simulated time step in seconds (default: 0.1)")
+    parser.add_argument("--render-every", type=int, default=0, help="render every N steps (default: never)")
+    parser.add_argument("--render-mode", choices=("redraw", "blit", "raster"), default="redraw",
+                        help="redraw the whole axis every frame, only the moving artists, or rasterize the frame "
+                             "with NumPy instead of matplotlib (default: redraw)")
+    parser.add_argument("--frames", default=None, help="directory receiving a PNG of every rendered frame")
+    parser.add_argument("--record", default=None, help="log file receiving every tick, for TickLog replays")
+    parser.add_argument("--profile", type=int, default=None, metavar="N",
+                        help="time the robot's systems, printing a summary every N ticks (0: only at the end)")
+    parser.add_argument("--rates", type=float, nargs=3, default=None, metavar=("PHYSICS", "SENSOR", "CONTROL"),
+                        help="run physics, LIDAR and control at separate rates in Hz, e.g. 200 10 20")
+    args = parser.parse_args()
+
+    recorder = TickRecorder(args.record) if args.record else None
+    runner = HeadlessRunner(dt=args.dt, max_steps=args.steps, time_budget=args.time_budget,
+                            render_every=args.render_every, frame_dir=args.frames, recorder=recorder)
+    if args.render_mode == "raster":
+        runner.raster = RasterRenderSystem(runner.robot)
+    else:
+        runner.robot.render.mode = args.render_mode
+    if args.rates:
+        runner.clock = MultiRateClock(runner.robot, runner.lidar, *args.rates)
+    if args.profile is not None:
+        runner.robot.profiler.enable(summary_every=args.profile)
+    print(runner.run())
+    if args.profile is not None:
+        print(runner.robot.profiler.summary())
+    if recorder is not None:
+        recorder.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+from fractions import Fraction
+from math import lcm
+
+class MultiRateClock:
+    """
+    A simulated clock running the robot's loops at separate rates: the odometer and the moving obstacles are
+    integrated at the physics rate, the LIDAR is cast at the sensor rate, and gap detection plus navigation run at
+    the control rate on the latest scan, as on the real robot.
+
+    Time advances in physics steps. A loop at rate r fires at the first physics step at or after each multiple of
+    1 / r, decided with integer arithmetic so the schedule never drifts. Within a step, sensing runs first, then
+    control, then the physics step.
+
+    Attributes:
+        robot (Robot): The simulated robot.
+        lidar (LidarEmulator): The LIDAR emulator.
+        physics_rate (float): The odometer integration rate, in Hz.
+        sensor_rate (float): The LIDAR rate, in Hz.
+        control_rate (float): The control rate, in Hz.
+        physics_dt (float): The physics step, in seconds.
+        control_dt (float): The control period passed to Robot.update, in seconds.
+        steps (int): The number of physics steps run.
+        sensor_updates (int): The number of LIDAR scans cast.
+        control_updates (int): The number of control updates run.
+        _scale (int): The factor turning the rates into integers.
+        _physics (int): The scaled physics rate.
+        _sensor (int): The scaled sensor rate.
+        _control (int): The scaled control rate.
+    """
+    def __init__(self, robot, lidar, physics_rate=200, sensor_rate=10, control_rate=20):
+        """
+        Initializes the MultiRateClock.
+
+        Parameters:
+            robot (Robot): The robot to simulate.
+            lidar (LidarEmulator): The LIDAR emulator feeding the robot.
+            physics_rate (float): The odometer integration rate in Hz, defaults to 200.
+            sensor_rate (float): The LIDAR rate in Hz, defaults to 10.
+            control_rate (float): The control rate in Hz, defaults to 20.
+        """
+        rates = [Fraction(rate).limit_denominator(1000) for rate in (physics_rate, sensor_rate, control_rate)]
+        if min(rates) <= 0:
+            raise ValueError("Rates must be positive")
+        if max(rates[1:]) > rates[0]:
+            raise ValueError("The sensor and control rates cannot exceed the physics rate")
+        self._scale = lcm(*(rate.denominator for rate in rates))
+        self._physics, self._sensor, self._control = (int(rate * self._scale) for rate in rates)
+
+        self.robot = robot
+        self.lidar = lidar
+        self.physics_rate = physics_rate
+        self.sensor_rate = sensor_rate
+        self.control_rate = control_rate
+        self.physics_dt = 1 / physics_rate
+        self.control_dt = 1 / control_rate
+        self.steps = 0
+        self.sensor_updates = 0
+        self.control_updates = 0
+
+    def get_time(self):
+        """
+        Retrieves the simulated time.
+
+        Returns:
+            float: The time covered by the physics steps run, in seconds.
+        """
+        return self.steps * self.physics_dt
+
+    def step(self):
+        """
+        Runs one physics step, preceded by the sensing and control updates due at its start.
+        """
+        robot = self.robot
+        # A loop at rate r is due at step i when a multiple of 1 / r falls in (i - 1, i], counted in physics steps
+        if (self.steps * self._sensor) % self._physics < self._sensor:
+            robot.sense(self.lidar)
+            self.sensor_updates += 1
+        if (self.steps * self._control) % self._physics < self._control:
+            robot.update(self.control_dt, integrate=False)
+            self.control_updates += 1
+        robot.odometer.update(self.physics_dt)
+        robot.environment.step(self.physics_dt)
+        self.steps += 1
+
+    def advance(self, duration):
+        """
+        Runs the physics steps covering a duration.
+
+        Parameters:
+            duration (float): The simulated time to advance, in seconds.
+
+        Returns:
+            int: The number of physics steps run.
+        """
+        target = round((self.get_time() + duration) * self.physics_rate)
+        count = max(target - self.steps, 0)
+        for _ in range(count):
+            self.step()
+        return count
@@ -0,0 +1,207 @@
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from ..robot import Robot
+from ..LidarEmulator import LidarEmulator
+from ..Environment.EnvironmentCreater import EnvironmentCreator
+from ..Components.PidController import PidController
+from ..Components.SteeringController import SteeringController
+from ..Components.GapDetector import GapDetector
+from .HeadlessRunner import HeadlessRunner
+
+# Components, read for their default parameters so the sweep defaults follow them
+_pid = PidController()
+_steering_controller = SteeringController()
+_gap_detector = GapDetector()
+
+# Scenario settings understood by run_scenario, with their defaults
+DEFAULT_CONFIG = {
+    "K_p": _pid._K_p,
+    "K_i": _pid._K_i,
+    "K_d": _pid._K_d,
+    "K_h": _steering_controller._K_h,
+    "angular_resolution": _gap_detector.angular_resolution,
+    "pose": (0, -4, 1.17),
+    "goals": None,
+    "dt": 0.1,
+    "max_steps": 2000,
+    "world": None,
+    "world_size": 20.0,
+    "world_density": None,
+    "world_seed": 0,
+}
+
+# Columns of the result table, after the scenario settings
+METRICS = ["stop_reason", "steps", "time_to_goal", "goals_reached", "min_clearance", "collisions",
+           "cpu_ms_per_tick", "final_x", "final_y", "final_theta"]
+
+def grid(**axes):
+    """
+    Builds the Cartesian product of scenario settings, in a fixed order: the last setting varies fastest.
+
+    Parameters:
+        **axes: Each setting name mapped to the list of values to sweep, e.g. K_h=[1, 3, 5].
+
+    Returns:
+        list: One configuration dictionary per combination.
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+def run_scenario(config):
+    """
+    Runs one headless simulation and measures it. Scenarios are deterministic, so a configuration gives the same
+    metrics in any worker process, apart from the CPU time.
+
+    Parameters:
+        config (dict): Scenario settings overriding DEFAULT_CONFIG. "goals" replaces the to_goal path of
+            simulation.py with a list of (x, y) goals. "world" replaces the default obstacle with a WorldGenerator
+            layout of side "world_size", seeded with "world_seed", keeping the start and the goals clear.
+
+    Returns:
+        dict: The metrics of the run, keyed by the names in METRICS.
+    """
+    settings = dict(DEFAULT_CONFIG, **config)
+    with contextlib.redirect_stdout(io.StringIO()):
+        robot = Robot()
+        robot.pid.set_gains(settings["K_p"], settings["K_i"], settings["K_d"])
+        robot.steering_controller.set_gains(settings["K_h"])
+        robot.gap_detector.angular_resolution = settings["angular_resolution"]
+        robot.odometer.set_pose(list(settings["pose"]))
+        robot.input_system.update('to_goal')
+        if settings["goals"] is not None:
+            robot.goal_controller.reset()
+            for goal in settings["goals"]:
+                robot.goal_controller.add_goal(list(goal))
+        if settings["world"] is not None:
+            goal_controller = robot.goal_controller
+            goals = [goal_controller.get_current_goal()] + list(goal_controller.get_goals().queue)
+            keep_clear = [settings["pose"][:2]] + [goal[:2] for goal in goals if len(goal)]
+            EnvironmentCreator(robot.environment).setup_generated_environment(
+                settings["world"], settings["world_size"], settings["world_density"], settings["world_seed"],
+                keep_clear)
+
+        lidar = LidarEmulator()
+        environment = robot.environment
+        sensing = robot.environment_sensing
+        tracker = {"clearance": math.inf, "collisions": 0, "inside": False}
+
+        def on_step(robot, step):
+            position = robot.odometer.get_pose()[:2]
+            clearance = environment.clearance(position, lidar.max_distance)
+            tracker["clearance"] = min(tracker["clearance"], clearance)
+            # A collision starts whenever the robot's footprint begins to overlap an obstacle
+            inside = sensing.in_collision()
+            if inside and not tracker["inside"]:
+                tracker["collisions"] += 1
+            tracker["inside"] = inside
+
+        runner = HeadlessRunner(robot, lidar, dt=settings["dt"], max_steps=settings["max_steps"], on_step=on_step)
+        cpu_start = time.process_time()
+        result = runner.run()
+        cpu_time = time.process_time() - cpu_start
+
+    x, y, theta = result.final_pose
+    return {
+        "stop_reason": result.stop_reason,
+        "steps": result.steps,
+        "time_to_goal": result.sim_time if result.stop_reason == "goals_reached" else math.nan,
+        "goals_reached": len(result.goals_reached),
+        "min_clearance": tracker["clearance"],
+        "collisions": tracker["collisions"],
+        "cpu_ms_per_tick": 1000 * cpu_time / max(result.steps, 1),
+        "final_x": x,
+        "final_y": y,
+        "final_theta": theta,
+    }
+
+class SweepRunner:
+    """
+    Runs a list of scenario configurations in a process pool and gathers their metrics into one table. Results are
+    ordered by configuration, not by completion, so the table is the same whatever the number of workers.
+
+    Attributes:
+        configs (list): The scenario configurations, as dictionaries of settings overriding DEFAULT_CONFIG.
+        workers (int): The number of worker processes; defaults to one per core.
+        results (list): The metrics of each configuration once run, in configuration order.
+    """
+    def __init__(self, configs, workers=None):
+        """
+        Initializes the SweepRunner.
+
+        Parameters:
+            configs (list): The scenario configurations, for example from grid().
+            workers (int): The number of worker processes, defaults to the number of cores. With 1, the scenarios
+                run in the calling process.
+        """
+        self.configs = [dict(config) for config in configs]
+        self.workers = workers or os.cpu_count() or 1
+        self.results = []
+
+    def run(self):
+        """
+        Runs every scenario.
+
+        Returns:
+            list: One row per configuration, merging its index, settings and metrics.
+        """
+        if self.workers == 1:
+            metrics = [run_scenario(config) for config in self.configs]
+        else:
+            # Small chunks keep the cores busy when scenario lengths differ widely
+            chunksize = max(1, len(self.configs) // (4 * self.workers))
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                metrics = list(executor.map(run_scenario, self.configs, chunksize=chunksize))
+        self.results = [dict({"index": index}, **config, **row)
+                        for index, (config, row) in enumerate(zip(self.configs, metrics))]
+        return self.results
+
+    def write_csv(self, path):
+        """
+        Writes the results to a CSV file, one row per configuration.
+
+        Parameters:
+            path (str): The output file.
+        """
+        settings = []
+        for config in self.configs:
+            settings += [name for name in config if name not in settings]
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=["index"] + settings + METRICS, restval="")
+            writer.writeheader()
+            writer.writerows(self.results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep controller gains headless over a process pool.")
+    parser.add_argument("--K_h", type=float, nargs="+", default=[1, 3, 5], help="steering gains")
+    parser.add_argument("--K_p", type=float, nargs="+", default=[0.05, 0.1, 0.2], help="PID proportional gains")
+    parser.add_argument("--angular-resolution", type=float, nargs="+", default=[0.5],
+                        help="gap detector angular resolutions, in degrees")
+    parser.add_argument("--world", choices=["clutter", "maze", "warehouse"], default=None,
+                        help="generated world layout (default: the single default obstacle)")
+    parser.add_argument("--world-size", type=float, default=20.0, help="generated world side, in meters")
+    parser.add_argument("--world-seed", type=int, nargs="+", default=[0], help="generated world seeds")
+    parser.add_argument("--steps", type=int, default=2000, help="step budget per scenario (default: 2000)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--output", default="sweep.csv", help="CSV file receiving the table (default: sweep.csv)")
+    args = parser.parse_args()
+
+    axes = {"K_h": args.K_h, "K_p": args.K_p, "angular_resolution": args.angular_resolution, "max_steps": [args.steps]}
+    if args.world is not None:
+        axes.update(world=[args.world], world_size=[args.world_size], world_seed=args.world_seed)
+    configs = grid(**axes)
+    sweep = SweepRunner(configs, args.workers)
+    start = time.perf_counter()
+    sweep.run()
+    sweep.write_csv(args.output)
+    print(f"{len(configs)} scenarios on {sweep.workers} workers in {time.perf_counter() - start:.1f} s, "
+          f"written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+import argparse
+import json
+import struct
+import time
+import numpy as np
+from ..robot import Robot
+from ..Components.StateMachine import State
+from ..Environment.MovingObstacle import MovingObstacle
+
+# File layout: MAGIC, the header length as a little-endian uint32, the JSON header padded with spaces so the records
+# start on a HEADER_ALIGNMENT boundary, then the records back to back.
+MAGIC = b"RLTICKS1"
+HEADER_ALIGNMENT = 64
+
+def tick_dtype(num_rays, num_segments, lidar_dtype="<f8", num_moving=0):
+    """
+    Builds the structured record type of one simulation tick.
+
+    Parameters:
+        num_rays (int): The number of LIDAR rays per scan.
+        num_segments (int): The number of processed LIDAR segments.
+        lidar_dtype (str): The type used to store raw scans; "<f4" halves their size but replays are then no longer
+            exact.
+        num_moving (int): The number of moving obstacles, whose bounds are stored every tick; defaults to none.
+
+    Returns:
+        numpy.dtype: The record type.
+    """
+    moving = [("moving", "<f8", (num_moving, 4))] if num_moving else []
+    return np.dtype([
+        ("step", "<i4"),
+        ("time", "<f8"),
+        ("pose", "<f8", (3,)),
+        ("vel", "<f8"),
+        ("steering", "<f8"),
+        ("state", "u1"),
+        ("goal", "<f8", (2,)),
+        ("gap_goal", "<f8", (2,)),
+        ("threshold", "<f8"),
+        ("lidar", lidar_dtype, (num_rays,)),
+        ("processed", "<f8", (num_segments,)),
+    ] + moving)
+
+def _point(point):
+    """
+    Internal function to convert an optional point, stored as an empty list when unset, to an (x, y) pair with NaN
+    for unset.
+    """
+    return (point[0], point[1]) if len(point) else (np.nan, np.nan)
+
+class TickRecorder:
+    """
+    Streams every simulation tick to a binary log: pose, velocity, steering, state, goal, gap goal, raw and
+    processed LIDAR data, and the bounds of the moving obstacles when there are any. Records are buffered and
+    written in chunks. The header keeps the robot's state and parameters when recording started and the obstacle
+    bounds, so a log can be replayed on its own. The moving obstacles must be present when recording starts.
+
+    Call start before the first tick and record after every robot update, or pass the recorder to HeadlessRunner.
+
+    Attributes:
+        path (str): The log file.
+        chunk_size (int): The number of records buffered between writes.
+        lidar_dtype (str): The type used to store raw scans.
+        count (int): The number of records written so far.
+        _file (file): The open log file, None before start and after close.
+        _buffer (numpy.ndarray): The chunk buffer of structured records.
+        _filled (int): The number of records in the chunk buffer.
+        _dt (float): The time step of the recorded run.
+        _num_moving (int): The number of moving obstacles recorded every tick.
+    """
+    def __init__(self, path, chunk_size=256, lidar_dtype="<f8"):
+        """
+        Initializes the TickRecorder.
+
+        Parameters:
+            path (str): The log file to create.
+            chunk_size (int): The number of records buffered between writes, defaults to 256.
+            lidar_dtype (str): The type used to store raw scans, defaults to float64 for exact replays.
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.lidar_dtype = lidar_dtype
+        self.count = 0
+        self._file = None
+        self._buffer = None
+        self._filled = 0
+        self._dt = 0
+        self._num_moving = 0
+
+    def start(self, robot, lidar, dt):
+        """
+        Creates the log and writes its header from the robot's current state.
+
+        Parameters:
+            robot (Robot): The recorded robot.
+            lidar (LidarEmulator): The LIDAR emulator feeding the robot.
+            dt (float): The time step of the run.
+        """
+        num_segments = robot.gap_detector.get_num_segments(lidar.get_num_rays())
+        moving = robot.environment.get_moving_bounds()
+        dtype = tick_dtype(lidar.get_num_rays(), num_segments, self.lidar_dtype, len(moving))
+        goal_controller = robot.goal_controller
+        vel, steering = robot.odometer.get_velocities()
+        header = {
+            "dtype": dtype.descr,
+            "dt": dt,
+            "num_rays": lidar.get_num_rays(),
+            "max_distance": lidar.max_distance,
+            "states": {state.name: state.value for state in State},
+            "start": {
+                "pose": [float(value) for value in robot.odometer.get_pose()],
+                "vel": float(vel),
+                "steering": float(steering),
+                "pid": [float(robot.pid._prev_integral), float(robot.pid._prev_error)],
+                "state": robot.state_machine._current_state.name,
+                "goal": [float(value) for value in goal_controller.get_current_goal()],
+                "goals": [[float(value) for value in goal] for goal in goal_controller.get_goals().queue],
+                "gap_goal": [float(value) for value in robot.gap_detector.get_gap_goal()],
+            },
+            "robot": {
+                "K_p": robot.pid._K_p,
+                "K_i": robot.pid._K_i,
+                "K_d": robot.pid._K_d,
+                "K_h": robot.steering_controller._K_h,
+                "angular_resolution": robot.gap_detector.angular_resolution,
+                "distance_accuracy": goal_controller.distance_accuracy,
+                "cruise_vel": robot.odometer.cruise_vel,
+                "max_vel": robot.odometer.max_vel,
+            },
+            "obstacles": robot.environment.get_static_bounds().tolist(),
+            "moving_obstacles": moving.tolist(),
+        }
+        text = json.dumps(header).encode()
+        length = len(MAGIC) + 4 + len(text)
+        text += b" " * (-length % HEADER_ALIGNMENT)
+
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC + struct.pack("<I", len(text)) + text)
+        self._buffer = np.zeros(self.chunk_size, dtype=dtype)
+        self._filled = 0
+        self._dt = dt
+        self._num_moving = len(moving)
+        self.count = 0
+
+    def record(self, robot, lidar, step):
+        """
+        Appends the tick that just ran to the log.
+
+        Parameters:
+            robot (Robot): The recorded robot, after its update.
+            lidar (LidarEmulator): The LIDAR emulator, holding the scan used by the tick.
+            step (int): The number of the tick, starting at 1.
+        """
+        row = self._buffer[self._filled]
+        row["step"] = step
+        row["time"] = step * self._dt
+        row["pose"] = robot.odometer.get_pose()
+        row["vel"], row["steering"] = robot.odometer.get_velocities()
+        row["state"] = robot.state_machine._current_state.value
+        row["goal"] = _point(robot.goal_controller.get_current_goal())
+        row["gap_goal"] = _point(robot.goal_controller.gap_goal)
+        row["threshold"] = robot.gap_detector.threshold_distance
+        row["lidar"] = lidar.get_data()
+        row["processed"] = robot.gap_detector.processed_lidar_data
+        if self._num_moving:
+            row["moving"] = robot.environment.get_moving_bounds()
+        self._filled += 1
+        self.count += 1
+        if self._filled == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered records to the log.
+        """
+        if self._filled:
+            self._buffer[:self._filled].tofile(self._file)
+            self._filled = 0
+        self._file.flush()
+
+    def close(self):
+        """
+        Writes the remaining records and closes the log.
+        """
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class TickLog:
+    """
+    Reads a log written by TickRecorder. The records are memory-mapped, so opening a log is immediate and fields are
+    read from disk as they are accessed.
+
+    Attributes:
+        path (str): The log file.
+        header (dict): The header of the log.
+        records (numpy.memmap): The structured records, one per tick.
+    """
+    def __init__(self, path):
+        """
+        Opens a log.
+
+        Parameters:
+            path (str): The log file.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a tick log")
+            length, = struct.unpack("<I", file.read(4))
+            self.header = json.loads(file.read(length))
+        dtype = np.dtype([tuple(field) if len(field) == 2 else (field[0], field[1], tuple(field[2]))
+                          for field in self.header["dtype"]])
+        offset = len(MAGIC) + 4 + length
+        with open(path, "rb") as file:
+            size = file.seek(0, 2)
+        count = (size - offset) // dtype.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, field):
+        return self.records[field]
+
+    def scan_poses(self):
+        """
+        Retrieves the pose at which each scan was taken: the pose before the tick's update.
+
+        Returns:
+            numpy.ndarray: The poses, shape (num_ticks, 3).
+        """
+        poses = np.empty((len(self), 3))
+        if len(self):
+            poses[0] = self.header["start"]["pose"]
+            poses[1:] = self.records["pose"][:-1]
+        return poses
+
+    def moving_bounds(self, tick):
+        """
+        Retrieves the bounds of the moving obstacles after a tick.
+
+        Parameters:
+            tick (int): The index of the tick in the log, or None for the bounds when recording started.
+
+        Returns:
+            numpy.ndarray: The bounds, shape (num_moving, 4); empty when the run had no moving obstacles.
+        """
+        if tick is None or "moving" not in self.records.dtype.names:
+            return np.array(self.header.get("moving_obstacles", []), dtype=float).reshape(-1, 4)
+        return np.array(self.records[tick]["moving"])
+
+    def make_robot(self):
+        """
+        Creates a robot with the recorded parameters and obstacles, in the state it had when recording started.
+
+        Returns:
+            Robot: The robot, ready to replay the first tick.
+        """
+        robot = Robot()
+        parameters = self.header["robot"]
+        robot.pid.set_gains(parameters["K_p"], parameters["K_i"], parameters["K_d"])
+        robot.steering_controller.set_gains(parameters["K_h"])
+        robot.gap_detector.angular_resolution = parameters["angular_resolution"]
+        robot.goal_controller.distance_accuracy = parameters["distance_accuracy"]
+        robot.odometer.cruise_vel = parameters["cruise_vel"]
+        robot.odometer.max_vel = parameters["max_vel"]
+        restore(robot, self.header["start"])
+        restore_obstacles(robot.environment, self)
+        return robot
+
+def restore(robot, start):
+    """
+    Puts a robot in the state recorded in a log header.
+
+    Parameters:
+        robot (Robot): The robot to set up.
+        start (dict): The "start" entry of a log header.
+    """
+    goals = start["goals"]
+    robot.state_machine.change_state(start["state"], [goal[0] for goal in goals], [goal[1] for goal in goals])
+    robot.goal_controller._goal = list(start["goal"])
+    robot.odometer.set_pose(list(start["pose"]))
+    robot.odometer.set_vel(start["vel"])
+    robot.odometer.set_steering(start["steering"])
+    robot.pid._prev_integral, robot.pid._prev_error = start["pid"]
+    robot.gap_detector._gap_goal = list(start["gap_goal"])
+
+def restore_obstacles(environment, log, tick=None):
+    """
+    Replaces the obstacles of an environment with those of a log: the static ones in bulk, the moving ones one at a
+    time, so they can be moved to the bounds of later ticks with update_obstacles; they are the last obstacles of
+    the environment.
+
+    Parameters:
+        environment (Environment): The environment to set up.
+        log (TickLog): The recorded run.
+        tick (int): The tick whose moving obstacle bounds are used, or None for those when recording started.
+    """
+    environment.clear()
+    environment.add_obstacles(log.header["obstacles"])
+    for x_min, y_min, x_max, y_max in log.moving_bounds(tick).tolist():
+        environment.add_obstacle(MovingObstacle(x_min, y_min, x_max - x_min, y_max - y_min))
+
+def replay(log, robot=None):
+    """
+    Replays a log in closed loop: the recorded scans are fed to the gap detector and the robot is updated, without
+    casting any LIDAR ray. Moving obstacles are put at their recorded bounds after every tick. The replayed poses are
+    compared with the recorded ones, so a change in gap detection or navigation shows up as a divergence.
+
+    Parameters:
+        log (TickLog): The log to replay.
+        robot (Robot): The robot to drive, already set up as the log's start; defaults to log.make_robot().
+
+    Returns:
+        dict: The number of replayed ticks, the largest pose difference, the first step whose pose differs by more
+            than 1e-9 (None if none), the wall-clock time and the replay throughput.
+    """
+    if robot is None:
+        robot = log.make_robot()
+    dt = log.header["dt"]
+    scans = log["lidar"]
+    recorded = log["pose"]
+    poses = np.empty((len(log), 3))
+    environment = robot.environment
+    moving = log["moving"] if "moving" in log.records.dtype.names else None
+    if moving is not None:
+        count = len(environment.get_bounds())
+        moving_indices = np.arange(count - moving.shape[1], count)
+
+    start = time.perf_counter()
+    for tick in range(len(log)):
+        robot.gap_detector.preprocess_lidar(scans[tick])
+        robot.update(dt)
+        if moving is not None:
+            environment.update_obstacles(moving_indices, moving[tick])
+        poses[tick] = robot.odometer.get_pose()
+    wall_time = time.perf_counter() - start
+
+    errors = np.abs(poses - recorded).max(axis=1) if len(log) else np.zeros(0)
+    diverged = np.flatnonzero(errors > 1e-9)
+    return {
+        "steps": len(log),
+        "max_pose_error": float(errors.max()) if len(errors) else 0.0,
+        "first_divergence": int(log["step"][diverged[0]]) if len(diverged) else None,
+        "wall_time": wall_time,
+        "steps_per_sec": len(log) / wall_time if wall_time > 0 else float("inf"),
+    }
+
+def replay_gaps(log, gap_detector=None):
+    """
+    Re-runs gap detection on every recorded scan at once and compares the gap goals with the recorded ones. Only the
+    ticks where the robot had a goal when sensing are compared, since the gap goal is not refreshed otherwise.
+
+    Parameters:
+        log (TickLog): The log to replay.
+        gap_detector (GapDetector): The gap detector to test; defaults to one with the recorded angular resolution.
+
+    Returns:
+        tuple: The recomputed gap goals, shape (num_ticks, 2) with NaN where there is no gap, and a boolean array of
+            shape (num_ticks,) marking the compared ticks whose gap goal differs from the recording.
+    """
+    if gap_detector is None:
+        gap_detector = log.make_robot().gap_detector
+    _, _, _, gap_goals = gap_detector.process_scans(log["lidar"], log.scan_poses())
+
+    # The goal held while sensing is the goal left by the previous tick
+    had_goal = np.empty(len(log), dtype=bool)
+    if len(log):
+        had_goal[0] = bool(log.header["start"]["goal"])
+        had_goal[1:] = ~np.isnan(log["goal"][:-1, 0])
+    same = np.isclose(gap_goals, log["gap_goal"], rtol=0, atol=1e-9, equal_nan=True).all(axis=1)
+    return gap_goals, had_goal & ~same
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded simulation log without casting LIDAR rays.")
+    parser.add_argument("log", help="log file written by TickRecorder")
+    args = parser.parse_args()
+
+    log = TickLog(args.log)
+    result = replay(log)
+    _, mismatches = replay_gaps(log)
+    print(f"{result['steps']} ticks replayed at {result['steps_per_sec']:.0f} ticks/s, "
+          f"max pose error {result['max_pose_error']:.3g}, first divergence at step {result['first_divergence']}, "
+          f"{int(mismatches.sum())} gap goal mismatches")
+
+if __name__ == "__main__":
+    main()
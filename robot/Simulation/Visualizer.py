@@ -0,0 +1,221 @@
+import multiprocessing
+import queue
+import numpy as np
+from ..Components.RateScheduler import RateScheduler
+
+class Visualizer:
+    """
+    Draws a robot in a separate process, so the control loop never waits on matplotlib. The control loop publishes
+    snapshots of the robot (see RenderSystem.snapshot) and the viewer process redraws the latest one at its own
+    display rate.
+
+        visualizer = Visualizer(freq=30)
+        visualizer.start()
+        while running:
+            robot.sense(lidar)
+            robot.update(dt)
+            visualizer.publish(robot)
+        visualizer.close()
+
+    Publishing never blocks: the channel holds a single snapshot, and when the viewer has not taken the previous one
+    yet, that stale snapshot is dropped and replaced, so the viewer always draws the newest state. The trajectory
+    points and obstacle changes of dropped snapshots are carried over to the next one, so none are lost.
+
+    Obstacles are sent only when they change: all of them whenever the environment's static version changes (an
+    obstacle added, removed or cleared), and only the moving ones when just those advanced.
+
+    Snapshots only read the robot's components, so the visualizer also attaches to a robot in the Real superstate,
+    which does not draw itself.
+
+    Attributes:
+        freq (float): The display rate of the viewer, in Hz.
+        mode (str): The RenderSystem mode of the viewer, "blit" or "redraw".
+        backend (str): The matplotlib backend of the viewer, or None for the default one.
+        published (int): The number of snapshots sent to the viewer.
+        dropped (int): The number of stale snapshots dropped before the viewer took them.
+        frames (multiprocessing.Value): The number of frames drawn by the viewer.
+        _context (multiprocessing.context.BaseContext): The "spawn" context, so the viewer starts without the GUI
+            state of this process.
+        _channel (multiprocessing.Queue): The snapshot channel, holding at most one snapshot.
+        _process (multiprocessing.Process): The viewer process.
+        _trajectory (list): The trajectory points not sent yet.
+        _static_version (int): The environment static version the viewer's obstacles match, None to send them all.
+        _version (int): The environment version the viewer's moving obstacles match, None to send them.
+    """
+    def __init__(self, freq=30, mode="blit", backend=None):
+        """
+        Initializes the Visualizer.
+
+        Parameters:
+            freq (float): The display rate in Hz, defaults to 30.
+            mode (str): The rendering mode of the viewer, defaults to "blit".
+            backend (str): The matplotlib backend of the viewer, defaults to matplotlib's choice.
+        """
+        self.freq = freq
+        self.mode = mode
+        self.backend = backend
+        self.published = 0
+        self.dropped = 0
+        self._context = multiprocessing.get_context("spawn")
+        self.frames = self._context.Value("i", 0)
+        self._channel = None
+        self._process = None
+        self._trajectory = []
+        self._static_version = None
+        self._version = None
+
+    def start(self):
+        """
+        Starts the viewer process.
+        """
+        self._channel = self._context.Queue(maxsize=1)
+        self._process = self._context.Process(target=view, name="visualizer", daemon=True,
+                                              args=(self._channel, self.freq, self.mode, self.backend, self.frames))
+        self._process.start()
+
+    def is_alive(self):
+        """
+        Checks whether the viewer is running; it stops when its window is closed.
+
+        Returns:
+            bool: True if the viewer process is running.
+        """
+        return self._process is not None and self._process.is_alive()
+
+    def publish(self, robot):
+        """
+        Sends a snapshot of the robot to the viewer, without blocking.
+
+        Parameters:
+            robot (Robot): The robot to draw.
+
+        Returns:
+            bool: True if the snapshot was sent, False if the viewer was taking the previous one at that moment; the
+                snapshot's trajectory points and obstacle changes are then sent with the next one.
+        """
+        snapshot = robot.render.snapshot()
+        self._trajectory.extend(snapshot["trajectory"])
+        environment = robot.environment
+        try:
+            stale = self._channel.get_nowait()
+        except queue.Empty:
+            stale = None
+        if stale is not None:
+            # The viewer never saw the stale snapshot: carry its trajectory points and obstacle changes over
+            self.dropped += 1
+            self._trajectory[:0] = stale["trajectory"]
+            if stale["obstacles"] is not None:
+                self._static_version = None
+            if stale["moving_obstacles"] is not None:
+                self._version = None
+        snapshot["trajectory"] = self._trajectory
+        snapshot["obstacles"] = None
+        snapshot["moving_obstacles"] = None
+        if self._static_version != environment.static_version:
+            snapshot["obstacles"] = environment.get_static_bounds().copy()
+            snapshot["moving_obstacles"] = environment.get_moving_bounds().copy()
+        elif self._version != environment.version:
+            snapshot["moving_obstacles"] = environment.get_moving_bounds().copy()
+        try:
+            self._channel.put_nowait(snapshot)
+        except queue.Full:
+            if snapshot["obstacles"] is not None:
+                self._static_version = None
+            if snapshot["moving_obstacles"] is not None:
+                self._version = None
+            return False
+        self.published += 1
+        self._trajectory = []
+        self._static_version = environment.static_version
+        self._version = environment.version
+        return True
+
+    def wait(self):
+        """
+        Waits until the viewer window is closed.
+        """
+        if self._process is not None:
+            self._process.join()
+
+    def close(self, timeout=1.0):
+        """
+        Asks the viewer to stop and waits for it, terminating it if it does not stop in time.
+
+        Parameters:
+            timeout (float): How long to wait for the viewer, in seconds.
+        """
+        if self._process is None:
+            return
+        try:
+            self._channel.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._channel.close()
+        self._process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def view(channel, freq, mode, backend, frames):
+    """
+    The viewer process: draws the latest snapshot from the channel at a fixed display rate, with the RenderSystem
+    of a robot mirroring the published robot's obstacles. The mirror starts from an empty environment, replaced
+    whenever a snapshot carries all the obstacles. Runs until it receives None or its window is closed.
+
+    Parameters:
+        channel (multiprocessing.Queue): The snapshot channel.
+        freq (float): The display rate in Hz.
+        mode (str): The rendering mode.
+        backend (str): The matplotlib backend, or None for the default one.
+        frames (multiprocessing.Value): Incremented for every frame drawn.
+    """
+    import matplotlib
+    if backend:
+        matplotlib.use(backend)
+    import matplotlib.pyplot as plt
+    from ..robot import Robot
+    from ..Environment.MovingObstacle import MovingObstacle
+
+    mirror = Robot()
+    environment = mirror.environment
+    environment.clear()  # Drops the default obstacles every robot starts with
+    render = mirror.render
+    render.mode = mode
+    render.pause = None
+    fig, ax = plt.subplots()
+    if matplotlib.get_backend().lower() != "agg":
+        plt.show(block=False)
+    scheduler = RateScheduler(freq)
+    while plt.fignum_exists(fig.number):
+        scheduler.wait()
+        try:
+            snapshot = channel.get_nowait()
+        except queue.Empty:
+            fig.canvas.flush_events()  # Nothing new: keep the window responsive
+            continue
+        if snapshot is None:
+            break
+        moving = snapshot["moving_obstacles"]
+        if snapshot["obstacles"] is not None:
+            environment.clear()
+            environment.add_obstacles(snapshot["obstacles"])
+            for x_min, y_min, x_max, y_max in moving.tolist():
+                environment.add_obstacle(MovingObstacle(x_min, y_min, x_max - x_min, y_max - y_min))
+        elif moving is not None:
+            count = len(environment.get_bounds())
+            environment.update_obstacles(np.arange(count - len(moving), count), moving)
+        render.draw_snapshot(ax, snapshot)
+        if mode != "blit":
+            fig.canvas.draw_idle()
+        fig.canvas.flush_events()
+        with frames.get_lock():
+            frames.value += 1
+    plt.close(fig)
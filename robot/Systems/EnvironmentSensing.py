@@ -12,6 +12,7 @@ class EnvironmentSensingSystem:
         _state_machine (StateMachine): The Finite State Machine of the robot.
         robot_width (float): The width of the robot, used for sensing calculations.
         robot_height (float): The height of the robot, used for sensing calculations.
+        _profiler (Profiler): The robot's profiler, timing the gap detector.
     """
 
     def __init__(self, robot, environment_creator):
@@ -28,6 +29,7 @@ class EnvironmentSensingSystem:
         self._gap_detector = robot.gap_detector
         self.goal_controller = robot.goal_controller
         self._state_machine = robot.state_machine
+        self._profiler = robot.profiler
         
         self.robot_width = .2   # Width of the robot
         self.robot_height = .2  # Height of the robot
@@ -45,4 +47,43 @@ class EnvironmentSensingSystem:
         pose = self._robot_odometer.get_pose()
         goal = self.goal_controller.get_current_goal()
         if goal:
-            self._gap_detector.update(pose)
\ No newline at end of file
+            with self._profiler.section("gap_detector"):
+                self._gap_detector.update(pose)
+
+    def clearance(self):
+        """
+        Computes the robot's clearance: the distance from its center to the nearest obstacle, minus the radius of the
+        circle enclosing its footprint. Takes constant time when the environment has a distance field.
+
+        Returns:
+            float: The clearance, negative when the robot may touch an obstacle.
+        """
+        pose = self._robot_odometer.get_pose()
+        radius = 0.5 * np.hypot(self.robot_width, self.robot_height)
+        return self._environment.clearance(pose[:2]) - radius
+
+    def in_collision(self, pose=None):
+        """
+        Checks whether the robot's footprint overlaps an obstacle.
+
+        Parameters:
+            pose (tuple): The pose (x, y, theta) to check, defaults to the robot's current pose.
+
+        Returns:
+            bool: True if the footprint overlaps an obstacle.
+        """
+        if pose is None:
+            pose = self._robot_odometer.get_pose()
+        return bool(self.check_poses([pose])[0])
+
+    def check_poses(self, poses):
+        """
+        Checks candidate poses at once, e.g. the poses along a candidate motion, against the obstacles.
+
+        Parameters:
+            poses (numpy.ndarray): The poses (x, y, theta), shape (num_poses, 3).
+
+        Returns:
+            numpy.ndarray: Whether the robot's footprint at each pose overlaps an obstacle, shape (num_poses,).
+        """
+        return self._environment.footprint_collisions(poses, self.robot_width, self.robot_height)
@@ -30,13 +30,15 @@ class NavigationSystem():
         
         self.type = "pid"
 
-    def update(self, dt):
+    def update(self, dt, integrate=True):
         """
         Updates the navigation system based on the current robot pose, goal status, and time step. 
         This includes updating goal status, calculating steering commands, and adjusting velocity.
 
         Parameters:
             dt (float): The time step for updating the navigation system.
+            integrate (bool): Whether to advance the odometer by dt after setting the new commands. Set it to False
+                when the pose is integrated separately, for example at a higher physics rate.
         """
 
         if self._state_machine.is_state("Idle"):
@@ -70,7 +72,8 @@ class NavigationSystem():
         # Update the robot's configuration.
         self._odometer.set_vel(vel)
         self._odometer.set_steering(steering)
-        self._odometer.update(dt)
+        if integrate:
+            self._odometer.update(dt)
 
     def calculate_velocity(self, cruise_vel, vel, dt, distance, max_vel):
         """
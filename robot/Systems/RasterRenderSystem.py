@@ -0,0 +1,303 @@
+import numpy as np
+
+# Colors of the matplotlib rendering, as 8-bit RGB
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GRID = (176, 176, 176)
+OBSTACLE = (215, 215, 215)
+ROBOT = (235, 235, 235)
+GREEN = (0, 128, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+YELLOW = (191, 191, 0)
+
+def _kernel(size):
+    """
+    Internal function to build the pixel offsets of a square brush.
+
+    Parameters:
+        size (int): The width of the brush, in pixels.
+
+    Returns:
+        list: The (dx, dy) offsets covered by the brush.
+    """
+    low = -(size // 2)
+    return [(dx, dy) for dy in range(low, low + size) for dx in range(low, low + size)]
+
+def _disc(radius):
+    """
+    Internal function to build the pixel offsets of a filled disc.
+
+    Parameters:
+        radius (int): The radius of the disc, in pixels.
+
+    Returns:
+        list: The (dx, dy) offsets covered by the disc.
+    """
+    return [(dx, dy) for dy in range(-radius, radius + 1) for dx in range(-radius, radius + 1)
+            if dx * dx + dy * dy <= radius * radius + radius]
+
+def stamp(image, xs, ys, color, offsets=((0, 0),)):
+    """
+    Sets the pixels at the given positions, each widened by a brush, clipping to the image.
+
+    Parameters:
+        image (numpy.ndarray): The RGB image, shape (height, width, 3).
+        xs (numpy.ndarray): The pixel columns.
+        ys (numpy.ndarray): The pixel rows.
+        color (tuple): The RGB color.
+        offsets (list): The (dx, dy) offsets of the brush, defaults to a single pixel.
+    """
+    height, width = image.shape[:2]
+    offsets = np.asarray(offsets, dtype=np.intp)
+    x = (np.asarray(xs)[:, None] + offsets[:, 0]).ravel()
+    y = (np.asarray(ys)[:, None] + offsets[:, 1]).ravel()
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    image[y[inside], x[inside]] = color
+
+def draw_segments(image, segments, color, thickness=1, dash=0):
+    """
+    Draws line segments, all at once: every segment is sampled at one point per pixel along its major axis.
+
+    Parameters:
+        image (numpy.ndarray): The RGB image, shape (height, width, 3).
+        segments (numpy.ndarray): The segments in pixel coordinates, shape (num_segments, 2, 2).
+        color (tuple): The RGB color.
+        thickness (int): The line width in pixels, defaults to 1.
+        dash (int): The length in pixels of the dashes and of the gaps between them, or 0 for solid lines.
+    """
+    segments = np.asarray(segments, dtype=float).reshape(-1, 2, 2)
+    if not len(segments):
+        return
+    height, width = image.shape[:2]
+    start = segments[:, 0]
+    delta = segments[:, 1] - start
+    # Segments leaving the image are sampled at most as many times as the image is wide and high
+    steps = np.minimum(np.ceil(np.abs(delta).max(axis=1)), 2 * (width + height)).astype(np.intp) + 1
+    owner = np.repeat(np.arange(len(segments)), steps)
+    index = np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)
+    if dash:
+        keep = (index // dash) % 2 == 0
+        owner = owner[keep]
+        index = index[keep]
+    t = index / np.maximum(steps[owner] - 1, 1)
+    xs = np.rint(start[owner, 0] + delta[owner, 0] * t).astype(np.intp)
+    ys = np.rint(start[owner, 1] + delta[owner, 1] * t).astype(np.intp)
+    stamp(image, xs, ys, color, _kernel(thickness))
+
+def draw_polyline(image, points, color, thickness=1):
+    """
+    Draws a polyline through consecutive points.
+
+    Parameters:
+        image (numpy.ndarray): The RGB image, shape (height, width, 3).
+        points (numpy.ndarray): The points in pixel coordinates, shape (num_points, 2).
+        color (tuple): The RGB color.
+        thickness (int): The line width in pixels, defaults to 1.
+    """
+    points = np.asarray(points, dtype=float)
+    if len(points) > 1:
+        draw_segments(image, np.stack([points[:-1], points[1:]], axis=1), color, thickness)
+
+def fill_rectangles(image, rectangles, color):
+    """
+    Fills axis-aligned rectangles, all at once, with a summed-area table of their corners.
+
+    Parameters:
+        image (numpy.ndarray): The RGB image, shape (height, width, 3).
+        rectangles (numpy.ndarray): The rectangles in pixel coordinates, rows (x_min, y_min, x_max, y_max).
+        color (tuple): The RGB color.
+    """
+    rectangles = np.asarray(rectangles, dtype=float).reshape(-1, 4)
+    if not len(rectangles):
+        return
+    height, width = image.shape[:2]
+    x_min = np.clip(np.rint(rectangles[:, 0]), 0, width).astype(np.intp)
+    x_max = np.clip(np.rint(rectangles[:, 2]), 0, width).astype(np.intp)
+    y_min = np.clip(np.rint(rectangles[:, 1]), 0, height).astype(np.intp)
+    y_max = np.clip(np.rint(rectangles[:, 3]), 0, height).astype(np.intp)
+    corners = np.zeros((height + 1, width + 1), dtype=np.int32)
+    np.add.at(corners, (y_min, x_min), 1)
+    np.add.at(corners, (y_min, x_max), -1)
+    np.add.at(corners, (y_max, x_min), -1)
+    np.add.at(corners, (y_max, x_max), 1)
+    covered = corners.cumsum(axis=0).cumsum(axis=1)[:height, :width] > 0
+    image[covered] = color
+
+def fill_polygon(image, vertices, color):
+    """
+    Fills a convex polygon: the pixels of its bounding box are tested against every edge at once.
+
+    Parameters:
+        image (numpy.ndarray): The RGB image, shape (height, width, 3).
+        vertices (numpy.ndarray): The vertices in pixel coordinates, in order, shape (num_vertices, 2).
+        color (tuple): The RGB color.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    height, width = image.shape[:2]
+    x_min, y_min = np.maximum(np.floor(vertices.min(axis=0)), 0).astype(np.intp)
+    x_max = min(int(np.ceil(vertices[:, 0].max())), width - 1)
+    y_max = min(int(np.ceil(vertices[:, 1].max())), height - 1)
+    if x_min > x_max or y_min > y_max:
+        return
+    ys, xs = np.mgrid[y_min:y_max + 1, x_min:x_max + 1]
+    edges = np.roll(vertices, -1, axis=0) - vertices
+    # The pixel centers on the same side of every edge are inside, whatever the winding
+    sides = (edges[:, 0, None, None] * (ys - vertices[:, 1, None, None])
+             - edges[:, 1, None, None] * (xs - vertices[:, 0, None, None]))
+    inside = (sides >= 0).all(axis=0) | (sides <= 0).all(axis=0)
+    image[ys[inside], xs[inside]] = color
+
+class RasterRenderSystem:
+    """
+    A lightweight alternative to RenderSystem drawing the same frame, without matplotlib, into a NumPy RGB image:
+    grid, obstacles, trajectory, LIDAR rays, robot footprint, goals and gap goal. Lines and polygons are rasterized
+    with vectorized NumPy operations, so a frame takes a few milliseconds.
+
+    As in the "blit" mode of RenderSystem, the grid, the obstacles and the trajectory so far are kept in a background
+    image, rebuilt only when the obstacles change; each frame extends the trajectory in the background, copies it
+    and draws the moving parts on top. The image is reused between frames: copy it to keep a frame.
+
+    The image is top-down, with rows going down the y axis, and can be saved or encoded as is (e.g. by FrameExporter
+    or HeadlessRunner), streamed, or inspected by tests.
+
+    Attributes:
+        width (int): The image width, in pixels.
+        height (int): The image height, in pixels.
+        extent (tuple): The region drawn, as (x_min, x_max, y_min, y_max) in meters.
+        image (numpy.ndarray): The last frame, shape (height, width, 3), uint8.
+        _render (RenderSystem): The robot's render system, providing snapshots and the robot footprint.
+        _environment (Environment): The environment in which the robot operates.
+        _state_machine (StateMachine): The Finite State Machine of the robot.
+        _background (numpy.ndarray): The grid, static obstacles and trajectory drawn so far.
+        _background_version (int): The environment static version the background was built from.
+        _trajectory (list): The trajectory points so far, in meters.
+        _scale (numpy.ndarray): The pixels per meter along x and y; negative along y since rows go down.
+        _origin (numpy.ndarray): The pixel position of the world origin.
+    """
+    def __init__(self, robot, width=640, height=640, extent=(-5, 5, -5, 5)):
+        """
+        Initializes the RasterRenderSystem.
+
+        Parameters:
+            robot (Robot): The robot to draw.
+            width (int): The image width in pixels, defaults to 640.
+            height (int): The image height in pixels, defaults to 640.
+            extent (tuple): The region drawn as (x_min, x_max, y_min, y_max), defaults to the RenderSystem workspace.
+        """
+        self._render = robot.render
+        self._environment = robot.environment
+        self._state_machine = robot.state_machine
+        self.width = width
+        self.height = height
+        self.extent = extent
+        self.image = np.empty((height, width, 3), dtype=np.uint8)
+        self._background = np.empty_like(self.image)
+        self._background_version = None
+        self._trajectory = []
+        x_min, x_max, y_min, y_max = extent
+        self._scale = np.array([width / (x_max - x_min), -height / (y_max - y_min)])
+        self._origin = np.array([-x_min * self._scale[0], -y_max * self._scale[1]])
+
+    def to_pixels(self, points):
+        """
+        Converts world positions to pixel coordinates.
+
+        Parameters:
+            points (numpy.ndarray): The positions in meters, shape (..., 2).
+
+        Returns:
+            numpy.ndarray: The (column, row) pixel coordinates, same shape.
+        """
+        return np.asarray(points, dtype=float) * self._scale + self._origin
+
+    def draw(self):
+        """
+        Draws the robot's current state. Like RenderSystem, nothing is drawn in the Real superstate.
+
+        Returns:
+            numpy.ndarray: The frame.
+        """
+        if self._state_machine.is_superstate("Real"):
+            return self.image
+        return self.draw_snapshot(self._render.snapshot())
+
+    def draw_snapshot(self, snapshot):
+        """
+        Draws a frame from a snapshot, extending the trajectory with the snapshot's new points.
+
+        Parameters:
+            snapshot (dict): The frame state, as returned by RenderSystem.snapshot.
+
+        Returns:
+            numpy.ndarray: The frame.
+        """
+        new_points = snapshot["trajectory"]
+        self._trajectory.extend(new_points)
+        if self._background_version != self._environment.static_version:
+            self._draw_background()
+        elif new_points:
+            tail = self._trajectory[-len(new_points) - 1:]
+            draw_polyline(self._background, self.to_pixels(tail), GREEN, 2)
+
+        image = self.image
+        np.copyto(image, self._background)
+        self._draw_obstacles(image, self._environment.get_moving_bounds())
+        pose = snapshot["pose"]
+        lidar_data = snapshot["lidar"]
+        if lidar_data is not None and len(lidar_data):
+            cos_a, sin_a = self._render.lidar_directions(len(lidar_data), pose[2])
+            segments = np.empty((len(lidar_data), 2, 2))
+            segments[:, 0] = pose[:2]
+            segments[:, 1, 0] = pose[0] + lidar_data * cos_a
+            segments[:, 1, 1] = pose[1] + lidar_data * sin_a
+            draw_segments(image, self.to_pixels(segments), YELLOW, dash=4)
+
+        robot = self.to_pixels(self._render.footprint(pose))
+        fill_polygon(image, robot[:-1], ROBOT)
+        draw_polyline(image, robot, BLACK, 2)
+
+        disc = _disc(4)
+        for goals, color in ((snapshot["visited_goals"], GREEN), (snapshot["goals"], RED),
+                             ([snapshot["current_goal"]] if snapshot["current_goal"] else [], BLUE),
+                             ([snapshot["gap"]] if snapshot["gap"] else [], YELLOW)):
+            if len(goals):
+                points = np.rint(self.to_pixels(np.reshape(goals, (-1, 2)))).astype(np.intp)
+                stamp(image, points[:, 0], points[:, 1], color, disc)
+        return image
+
+    def _draw_background(self):
+        """
+        Internal method to rebuild the background: grid lines at every meter, static obstacles, and the whole
+        trajectory.
+        """
+        background = self._background
+        background[:] = WHITE
+        x_min, x_max, y_min, y_max = self.extent
+        columns = np.arange(np.ceil(x_min), np.floor(x_max) + 1) * self._scale[0] + self._origin[0]
+        rows = np.arange(np.ceil(y_min), np.floor(y_max) + 1) * self._scale[1] + self._origin[1]
+        background[:, np.clip(np.rint(columns).astype(np.intp), 0, self.width - 1)] = GRID
+        background[np.clip(np.rint(rows).astype(np.intp), 0, self.height - 1), :] = GRID
+
+        self._draw_obstacles(background, self._environment.get_static_bounds())
+        if len(self._trajectory) > 1:
+            draw_polyline(background, self.to_pixels(self._trajectory), GREEN, 2)
+        self._background_version = self._environment.static_version
+
+    def _draw_obstacles(self, image, bounds):
+        """
+        Internal method to draw filled and outlined obstacles.
+
+        Parameters:
+            image (numpy.ndarray): The image to draw into.
+            bounds (numpy.ndarray): The obstacle bounds, shape (num_obstacles, 4).
+        """
+        if len(bounds) == 0:
+            return
+        # Pixel rows grow downwards, so the top of an obstacle is its y_max
+        corners = self.to_pixels(bounds.reshape(-1, 2, 2))
+        rectangles = np.column_stack([corners[:, 0, 0], corners[:, 1, 1], corners[:, 1, 0], corners[:, 0, 1]])
+        fill_rectangles(image, rectangles, OBSTACLE)
+        outline = np.stack([bounds[:, [0, 1]], bounds[:, [2, 1]], bounds[:, [2, 3]], bounds[:, [0, 3]],
+                            bounds[:, [0, 1]]], axis=1)
+        draw_segments(image, self.to_pixels(np.stack([outline[:, :-1], outline[:, 1:]], axis=2)), BLACK, 2)
@@ -1,5 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
 class RenderSystem:
     """
@@ -16,6 +15,17 @@ class RenderSystem:
         _trajectory_y (list): List to store the y coordinates of the robot's trajectory.
         robot_width (float): The width of the robot, used in visualization.
         robot_height (float): The height of the robot, used in visualization.
+        pause (float): The time in seconds 'draw' pauses to refresh an interactive window, or None to only draw
+            onto the axis (for headless or non-interactive backends).
+        mode (str): "redraw" clears and redraws the whole axis every frame. "blit" creates the artists once, keeps
+            the static obstacles and the trajectory so far in a cached background, and only redraws the moving
+            artists, moving obstacles included, so the cost of a frame does not grow with the length of the run.
+        _profiler (Profiler): The robot's profiler, timing the pause separately from drawing.
+        _artists (dict): The persistent artists of the "blit" mode, by name.
+        _artists_ax (matplotlib.axes.Axes): The axis the persistent artists were created on.
+        _artists_version (int): The environment static version the obstacle artist was built from.
+        _background (object): The cached canvas region holding the static artists and the trajectory.
+        _draw_connection (tuple): The canvas and callback id of the draw event handler.
     """
 
     def __init__(self, robot):
@@ -33,8 +43,17 @@ class RenderSystem:
 
         self._trajectory_x = []  
         self._trajectory_y = []
+        self._lidar_tables = None
         self.robot_width = .6   
         self.robot_height = .3
+        self.pause = 0.1
+        self.mode = "redraw"
+        self._profiler = robot.profiler
+        self._artists = {}
+        self._artists_ax = None
+        self._artists_version = None
+        self._background = None
+        self._draw_connection = None
 
     def draw(self, ax):
         """
@@ -45,32 +64,75 @@ class RenderSystem:
         """
         if self._state_machine.is_superstate("Real"):
             return
+        self.draw_snapshot(ax, self.snapshot())
 
-        ax.clear()  # Clear the previous frame
-        ax.grid(True)  # Add grid for better visualization
-        
-        # Retrieve necessary states
+    def snapshot(self):
+        """
+        Captures the state drawn in a frame as plain data, so it can also be drawn by another process (see
+        Visualizer).
+
+        Returns:
+            dict: The frame state:
+                - "pose": the robot's pose (x, y, theta);
+                - "lidar": the processed LIDAR data, or None when it is not drawn (outside the ToGoal state);
+                - "visited_goals", "current_goal", "goals": the visited, current (or None) and remaining goals;
+                - "gap": the gap goal, or None;
+                - "trajectory": the trajectory points added since the previous frame, here only the current position.
+        """
         pose = self._odometer.get_pose()
-        visited_goals = self._goal_controller.get_visited()
         current_goal = self._goal_controller.get_current_goal()
-        other_goals = self._goal_controller.get_goals()
-        obstacles = self._environment.obstacles
-        lidar_data = self._gap_detector.processed_lidar_data
+        gap = self._gap_detector._gap_goal
+        lidar_data = None
+        if self._state_machine.is_state("ToGoal"):
+            lidar_data = np.array(self._gap_detector.processed_lidar_data, dtype=float)
+        return {
+            "pose": (pose[0], pose[1], pose[2]),
+            "lidar": lidar_data,
+            "visited_goals": [tuple(goal) for goal in self._goal_controller.get_visited()],
+            "current_goal": list(current_goal) if current_goal else None,
+            "goals": list(self._goal_controller.get_goals().queue),
+            "gap": list(gap) if gap else None,
+            "trajectory": [(pose[0], pose[1])],
+        }
+
+    def draw_snapshot(self, ax, snapshot):
+        """
+        Draws a frame from a snapshot, extending the trajectory with the snapshot's new points.
+
+        Parameters:
+            ax (matplotlib.axes.Axes): The matplotlib axis object to draw on.
+            snapshot (dict): The frame state, as returned by snapshot.
+        """
+        for x, y in snapshot["trajectory"]:
+            self._trajectory_x.append(x)
+            self._trajectory_y.append(y)
+        if self.mode == "blit":
+            self._draw_blit(ax, snapshot, len(snapshot["trajectory"]))
+            return
+
+        ax.clear()  # Clear the previous frame
+        ax.grid(True)  # Add grid for better visualization
 
         # Draw
-        if self._state_machine.is_state("ToGoal"):
-            self.plot_lidar(ax, lidar_data, pose)
+        pose = snapshot["pose"]
+        if snapshot["lidar"] is not None:
+            self.plot_lidar(ax, snapshot["lidar"], pose)
         self.plot_odometer(ax, pose)
-        self.plot_goals(ax, visited_goals, current_goal, other_goals)
-        self.plot_gap(ax)
-        self.plot_trajectory(ax, pose)
-        self.plot_environment(ax, obstacles)
+        self.plot_goals(ax, snapshot["visited_goals"], snapshot["current_goal"], snapshot["goals"])
+        self.plot_gap(ax, snapshot["gap"])
+        self.plot_trajectory(ax)
+        self.plot_environment(ax, self._environment.obstacles)
 
         # Limit workspace 
         ax.set_xlim([-5, 5])
         ax.set_ylim([-5, 5])
 
-        plt.pause(0.1)  # Pause to update the display
+        if self.pause:
+            # pyplot is only needed to refresh an interactive window; importing it here keeps Robot importable
+            # without a display or a GUI backend
+            import matplotlib.pyplot as plt
+            with self._profiler.section("pause"):
+                plt.pause(self.pause)  # Pause to update the display
 
     def plot_odometer(self, ax, pose):
         """
@@ -80,6 +142,21 @@ class RenderSystem:
             ax (matplotlib.axes.Axes): The axis to draw the robot on.
             pose (tuple): The pose of the robot (x, y, theta).
         """
+        robot = self.footprint(pose)
+
+        # Plot
+        ax.plot(robot[:, 0], robot[:, 1], 'k-')
+
+    def footprint(self, pose):
+        """
+        Computes the outline of the robot at a pose.
+
+        Parameters:
+            pose (tuple): The pose of the robot (x, y, theta).
+
+        Returns:
+            numpy.ndarray: The corners of the robot, shape (5, 2), the first corner repeated to close the outline.
+        """
         width = self.robot_width
         height = self.robot_height
 
@@ -100,10 +177,7 @@ class RenderSystem:
         corners_new = np.dot(rotmat, corners.T).T + pose[:2]
         
         # Create a closed rectangle for plotting
-        robot = np.vstack([corners_new, corners_new[0, :]])
-
-        # Plot
-        ax.plot(robot[:, 0], robot[:, 1], 'k-')
+        return np.vstack([corners_new, corners_new[0, :]])
 
 
     def plot_goals(self, ax, visited_goals, current_goal, other_goals):
@@ -114,14 +188,14 @@ class RenderSystem:
             ax (matplotlib.axes.Axes): The axis to draw the goals on.
             visited_goals (list): List of visited goals.
             current_goal (tuple): The current goal coordinates.
-            other_goals (queue): Queue of remaining goals.
+            other_goals (list): List of remaining goals.
         """
         # Plot visited goals
         for point in visited_goals:
             ax.scatter(point[0], point[1], c='g', marker='o') 
 
         # Plot the rest of the goals in the queue
-        for point in list(other_goals.queue):
+        for point in other_goals:
             ax.scatter(point[0], point[1], c='r', marker='o') 
         
         # Plot current goal
@@ -134,43 +208,55 @@ class RenderSystem:
 
         Parameters:
             ax (matplotlib.axes.Axes): The axis to plot the LIDAR data on.
-            lidar_data (list): The processed LIDAR data.
+            lidar_data (numpy.ndarray): The processed LIDAR data.
             robot_pose (tuple): The current pose of the robot.
         """
-        # Define angles for processed LIDAR data (-90 to +90 degrees)
-        total_segments = len(lidar_data)
-        angles = np.linspace(-np.pi/2, np.pi/2, total_segments)
+        cos_a, sin_a = self.lidar_directions(len(lidar_data), robot_pose[2])
+        xr = robot_pose[0] + lidar_data * cos_a
+        yr = robot_pose[1] + lidar_data * sin_a
 
         # Plot processed LIDAR data
-        for angle, distance in zip(angles, lidar_data):
-            adjusted_angle = angle + robot_pose[2]  # Adjust the angle based on the robot's orientation
-            xr = robot_pose[0] + distance * np.cos(adjusted_angle)
-            yr = robot_pose[1] + distance * np.sin(adjusted_angle)
-            ax.plot([robot_pose[0], xr], [robot_pose[1], yr], 'y--')
+        for x_end, y_end in zip(xr, yr):
+            ax.plot([robot_pose[0], x_end], [robot_pose[1], y_end], 'y--')
+
+    def lidar_directions(self, total_segments, theta):
+        """
+        Retrieves the unit directions of the processed LIDAR segments (-90 to +90 degrees around the
+        robot's heading). The angle tables are computed once per number of segments and only rotated per frame.
+
+        Parameters:
+            total_segments (int): The number of processed LIDAR segments.
+            theta (float): The robot's heading.
 
-    def plot_gap(self, ax):
+        Returns:
+            tuple: The cosine and sine of each segment's global angle.
+        """
+        if self._lidar_tables is None or len(self._lidar_tables[0]) != total_segments:
+            angles = np.linspace(-np.pi/2, np.pi/2, total_segments)
+            self._lidar_tables = (np.cos(angles), np.sin(angles))
+        cos_t, sin_t = self._lidar_tables
+        c, s = np.cos(theta), np.sin(theta)
+        return cos_t * c - sin_t * s, sin_t * c + cos_t * s
+
+    def plot_gap(self, ax, gap):
         """
         Draws the best gap detected by the gap detector.
 
         Parameters:
             ax (matplotlib.axes.Axes): The axis to draw the gap on.
+            gap (list): The gap goal, or None.
         """
-        gap = self._gap_detector._gap_goal
         if gap:
             ax.scatter(gap[0], gap[1], c='y', marker='o') 
 
 
-    def plot_trajectory(self, ax, pose):
+    def plot_trajectory(self, ax):
         """
         Draws the trajectory of the robot based on its movement history.
 
         Parameters:
             ax (matplotlib.axes.Axes): The axis to draw the trajectory on.
-            pose (tuple): The current pose of the robot.
         """
-        self._trajectory_x.append(pose[0])
-        self._trajectory_y.append(pose[1])
-        
         # Plot the robot's trajectory
         ax.plot(self._trajectory_x, self._trajectory_y, 'g-', label='Trajectory')
 
@@ -183,4 +269,146 @@ class RenderSystem:
             obstacles (list): List of obstacles in the environment.
         """
         for obstacle in obstacles:
-            obstacle.draw(ax)
\ No newline at end of file
+            obstacle.draw(ax)
+
+    def _draw_blit(self, ax, snapshot, new_points):
+        """
+        Internal method drawing a frame in the "blit" mode: the cached background is restored, the newest trajectory
+        segments are drawn into it, and the moving artists are updated and drawn on top.
+
+        Parameters:
+            ax (matplotlib.axes.Axes): The matplotlib axis object to draw on.
+            snapshot (dict): The frame state, as returned by snapshot.
+            new_points (int): The number of trajectory points added by this frame.
+        """
+        canvas = ax.figure.canvas
+        if self._artists_ax is not ax or self._artists_version != self._environment.static_version:
+            self._create_artists(ax, snapshot)
+            canvas.draw()  # Caches the background and draws the moving artists through _on_draw
+        else:
+            canvas.restore_region(self._background)
+            if new_points:
+                tail = self._artists["trajectory_tail"]
+                tail.set_data(self._trajectory_x[-new_points - 1:], self._trajectory_y[-new_points - 1:])
+                ax.draw_artist(tail)
+                self._background = canvas.copy_from_bbox(ax.bbox)
+            self._update_artists(snapshot)
+            self._draw_moving_artists(ax)
+        canvas.blit(ax.bbox)
+
+        if self.pause:
+            # Only process window events: a full redraw would defeat blitting
+            with self._profiler.section("pause"):
+                canvas.flush_events()
+                canvas.start_event_loop(self.pause)
+
+    def _create_artists(self, ax, snapshot):
+        """
+        Internal method creating the artists of the "blit" mode. Static obstacles are part of the background; every
+        other artist is animated, so it is left out of full redraws and drawn by this system.
+
+        Parameters:
+            ax (matplotlib.axes.Axes): The matplotlib axis object to draw on.
+            snapshot (dict): The frame state the moving artists start from.
+        """
+        from matplotlib.collections import LineCollection, PolyCollection
+
+        ax.clear()
+        ax.grid(True)
+        ax.set_xlim([-5, 5])
+        ax.set_ylim([-5, 5])
+
+        ax.add_collection(PolyCollection(rectangle_vertices(self._environment.get_static_bounds()), linewidths=2,
+                                         edgecolors='k', facecolors='none'))
+
+        empty = np.empty((0, 2))
+        self._artists = {
+            "trajectory": ax.plot([], [], 'g-', label='Trajectory', animated=True)[0],
+            "trajectory_tail": ax.plot([], [], 'g-', animated=True)[0],
+            "lidar": ax.add_collection(LineCollection([], colors='y', linestyles='--', animated=True)),
+            "moving_obstacles": ax.add_collection(PolyCollection([], linewidths=2, edgecolors='k', facecolors='none',
+                                                                 animated=True)),
+            "robot": ax.plot([], [], 'k-', animated=True)[0],
+            "visited_goals": ax.scatter(empty[:, 0], empty[:, 1], c='g', marker='o', animated=True),
+            "goals": ax.scatter(empty[:, 0], empty[:, 1], c='r', marker='o', animated=True),
+            "current_goal": ax.scatter(empty[:, 0], empty[:, 1], c='b', marker='o', animated=True),
+            "gap": ax.scatter(empty[:, 0], empty[:, 1], c='y', marker='o', animated=True),
+        }
+        self._artists_ax = ax
+        self._artists_version = self._environment.static_version
+        self._update_artists(snapshot)
+
+        canvas = ax.figure.canvas
+        if self._draw_connection is None or self._draw_connection[0] is not canvas:
+            if self._draw_connection is not None:
+                self._draw_connection[0].mpl_disconnect(self._draw_connection[1])
+            self._draw_connection = (canvas, canvas.mpl_connect('draw_event', self._on_draw))
+
+    def _on_draw(self, event):
+        """
+        Internal callback run after every full redraw of the figure (first frame, window resize): redraws the whole
+        trajectory, caches the background and draws the moving artists on top.
+
+        Parameters:
+            event (matplotlib.backend_bases.DrawEvent): The draw event.
+        """
+        ax = self._artists_ax
+        if ax is None or not self._artists:
+            return
+        trajectory = self._artists["trajectory"]
+        trajectory.set_data(self._trajectory_x, self._trajectory_y)
+        ax.draw_artist(trajectory)
+        self._background = event.canvas.copy_from_bbox(ax.bbox)
+        self._draw_moving_artists(ax)
+
+    def _update_artists(self, snapshot):
+        """
+        Internal method updating the data of the moving artists.
+
+        Parameters:
+            snapshot (dict): The frame state, as returned by snapshot.
+        """
+        artists = self._artists
+        artists["moving_obstacles"].set_verts(rectangle_vertices(self._environment.get_moving_bounds()))
+        pose = snapshot["pose"]
+        robot = self.footprint(pose)
+        artists["robot"].set_data(robot[:, 0], robot[:, 1])
+
+        lidar_data = snapshot["lidar"]
+        if lidar_data is not None and len(lidar_data):
+            cos_a, sin_a = self.lidar_directions(len(lidar_data), pose[2])
+            segments = np.empty((len(lidar_data), 2, 2))
+            segments[:, 0, 0] = pose[0]
+            segments[:, 0, 1] = pose[1]
+            segments[:, 1, 0] = pose[0] + lidar_data * cos_a
+            segments[:, 1, 1] = pose[1] + lidar_data * sin_a
+            artists["lidar"].set_segments(segments)
+        else:
+            artists["lidar"].set_segments([])
+
+        artists["visited_goals"].set_offsets(np.reshape(snapshot["visited_goals"], (-1, 2)))
+        artists["goals"].set_offsets(np.reshape(snapshot["goals"], (-1, 2)))
+        artists["current_goal"].set_offsets(np.reshape(snapshot["current_goal"] or [], (-1, 2)))
+        artists["gap"].set_offsets(np.reshape(snapshot["gap"] or [], (-1, 2)))
+
+    def _draw_moving_artists(self, ax):
+        """
+        Internal method drawing the moving artists onto the canvas.
+
+        Parameters:
+            ax (matplotlib.axes.Axes): The axis the artists belong to.
+        """
+        for name in ("moving_obstacles", "lidar", "robot", "visited_goals", "goals", "current_goal", "gap"):
+            ax.draw_artist(self._artists[name])
+
+def rectangle_vertices(bounds):
+    """
+    Converts obstacle bounds to the corners of their rectangles, as drawn by a PolyCollection.
+
+    Parameters:
+        bounds (numpy.ndarray): The obstacle bounds, shape (num_obstacles, 4) as (x_min, y_min, x_max, y_max).
+
+    Returns:
+        numpy.ndarray: The corners of each rectangle, shape (num_obstacles, 4, 2).
+    """
+    return np.stack([bounds[:, [0, 1]], bounds[:, [2, 1]], bounds[:, [2, 3]], bounds[:, [0, 3]]], axis=1)
@@ -6,6 +6,7 @@ from .Components.ProportionalController import ProportionalController
 from .Components.GoalController import GoalController
 from .Components.GapDetector import GapDetector
 from .Components.StateMachine import StateMachine
+from .Components.Profiler import Profiler
 
 # Environment
 from .Environment.Environment import Environment
@@ -35,6 +36,7 @@ class Robot:
         navigation (NavigationSystem): The system for managing the robot's navigation.
         render (RenderSystem): The system for rendering and visualizing the robot's state and environment.
         input_system (InputSystem): The system for handling external inputs and updating the robot's state accordingly.
+        profiler (Profiler): The timer of the robot's systems, disabled by default.
     """
     def __init__(self):
         """
@@ -49,6 +51,7 @@ class Robot:
         self.goal_controller = GoalController()
         self.gap_detector = GapDetector()
         self.state_machine = StateMachine(self)
+        self.profiler = Profiler()
 
         # Environment
         self.environment = Environment()
@@ -59,16 +62,37 @@ class Robot:
         self.render = RenderSystem(self)
         self.input_system = InputSystem(self)
 
-    def update(self, dt):
+    def sense(self, lidar):
+        """
+        Runs the sensing step: updates the LIDAR emulator from the robot's current pose and environment, and feeds the
+        resulting scan to the gap detector.
+
+        Parameters:
+            lidar (LidarEmulator): The LIDAR emulator providing scans.
+        """
+        profiler = self.profiler
+        with profiler.section("lidar"):
+            lidar.update(self.odometer.get_pose(), self.environment)
+        with profiler.section("preprocess_lidar"):
+            self.gap_detector.preprocess_lidar(lidar.get_data())
+
+    def update(self, dt, integrate=True):
         """
         Updates the robot's systems based on the given time step. This includes updating navigation and environment sensing.
 
         Parameters:
             dt (float): The time step for updating the robot's systems.
+            integrate (bool): Whether navigation also advances the odometer by dt, defaults to True.
         """
-        self.environment_sensing.update(self.goal_controller.get_current_goal())
-        self.goal_controller.gap_goal = self.gap_detector.get_gap_goal()
-        self.navigation.update(dt)
+        profiler = self.profiler
+        with profiler.section("update"):
+            with profiler.section("environment_sensing"):
+                self.environment_sensing.update(self.goal_controller.get_current_goal())
+                self.goal_controller.gap_goal = self.gap_detector.get_gap_goal()
+            with profiler.section("navigation"):
+                self.navigation.update(dt, integrate)
+        if profiler.enabled:
+            profiler.tick()
 
     def draw(self, ax):
         """
@@ -77,7 +101,8 @@ class Robot:
         Parameters:
             ax (matplotlib.axes.Axes): The matplotlib axis object on which the robot and its environment will be drawn.
         """
-        self.render.draw(ax)
+        with self.profiler.section("draw"):
+            self.render.draw(ax)
 
     def reset(self):
         """
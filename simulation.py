@@ -1,69 +1,60 @@
+import asyncio
 import numpy as np
-import threading
-from GestureRecognition import HandGestureRecognition
-from queue import Queue	 
 ### These 2 lines are for linux
 import matplotlib
 #matplotlib.use('TkAgg')  # Use the TkAgg backend for interactive plots
 ###
-import matplotlib.pyplot as plt
 from robot.robot import Robot
 from robot.LidarEmulator import LidarEmulator
+from robot.Simulation.AsyncRuntime import AsyncRuntime
+from robot.Simulation.Visualizer import Visualizer
 
 # Initial robot position and settings
 x_r = 0
 y_r = 0
 theta = 0
-freq = 20
+freq = 20  # Control loop rate in Hz
+profile_every = 0  # Print a timing summary of the robot's systems every N ticks, 0 to disable
+use_camera = True  # Steer the robot with hand gestures; OpenCV and MediaPipe are only imported when True
+render_in_process = False  # Draw in the control process; when False a separate process draws, never delaying control
+display_freq = 30  # Display rate in Hz of the separate drawing process
 
-def producer(q):
-    gesture_recognition = HandGestureRecognition()
-    gesture_recognition.start(q)
-
-
-def consumer(q):
-    count = 0
+def main():
     robot = Robot()
     if robot.state_machine.is_superstate("Simulation"):
         robot.odometer.set_pose([0, -4, 1.17])
     robot.goal_controller.add_goal([0, 10])
     lidar = LidarEmulator()
-    obstacles = robot.environment.obstacles
-    fig, ax = plt.subplots()
+    ax = None
+    visualizer = None
+    if render_in_process:
+        import matplotlib.pyplot as plt
+        plt.ion()  # Interactive mode, so the window refreshes while the event loop runs
+        fig, ax = plt.subplots()
+        robot.render.mode = "blit"  # Only redraw what moves, so frames stay cheap on long runs
+    else:
+        visualizer = Visualizer(display_freq)
+        visualizer.start()
+    if profile_every:
+        robot.profiler.enable(summary_every=profile_every)
 
     robot.input_system.update('to_goal')
 
-    while True:
-        if not q.empty():
-            gesture = q.get()
-            if gesture:
-                robot.input_system.update(gesture)
-
-        pose = robot.odometer.get_pose()
-        lidar.update(pose, obstacles)
-        robot.gap_detector.preprocess_lidar(lidar.get_data())
-        robot.update(0.1)
-        #print("Pose: ", robot.odometer.get_pose())
-        #print("Linear Velocity: ", linear)
-        #print("Angular Velocity: ", angular)
-        #print("Lidar Data: ", robot.gap_detector.processed_lidar_data)
-        #print("GOAL: ", robot.goal_controller.get_current_goal())
-        robot.draw(ax)
-
-        if count == 200000 or robot.state_machine.is_state("Stop"):
-            robot.gesture_handler.stop()
-            break
-
-
-def main():
-    q = Queue()
-    t1 = threading.Thread(target = producer, args = (q,))
-    t2 = threading.Thread(target = consumer, args = (q,))
-    t1.start()
-    t2.start()
-    t2.join()
-    t1.join()
-    plt.show()  # Keep the plot window open
+    # Gestures, control and rendering run as tasks of one event loop; closing the gesture window
+    # (ESC) or the robot entering the Stop state ends the run
+    gestures = None
+    if use_camera:
+        from GestureRecognition import HandGestureRecognition
+        gestures = HandGestureRecognition()
+    runtime = AsyncRuntime(robot, lidar, ax, gestures, freq, visualizer=visualizer)
+    timing = asyncio.run(runtime.run())
+    print("Loop timing: ", timing)
+    if visualizer is not None:
+        visualizer.wait()  # Keep the plot window open
+        visualizer.close()
+    else:
+        plt.ioff()
+        plt.show()  # Keep the plot window open
 
 if __name__ == "__main__":
     main()